@@ -0,0 +1,124 @@
+import argparse
+import mmap
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+from core import NANOS_PER_SECOND, UNIT_NANOS, detect_unit, drop_stdout, format_timestamp_ns
+
+
+# Bulk log annotator: appends the UTC date after every epoch-looking integer
+# in a log file. The file is memory-mapped, split into line-aligned chunks and
+# the chunks are annotated in a process pool, then written back in order.
+
+CHUNK_SIZE = 16 << 20
+
+# Plausible range for epochs embedded in logs: 2000-01-01 to 2100-01-01.
+DEFAULT_MIN = 946684800
+DEFAULT_MAX = 4102444800
+
+# Seconds, or milliseconds, microseconds and nanoseconds (13, 16 and 19 digits) as tracers emit them.
+EPOCH_PATTERN = re.compile(rb"(?<![\d.])(?:\d{9,10}|\d{13}|\d{16}|\d{19})(?![\d.])")
+
+
+def split_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """Return (start, end) byte ranges covering the file, each ending right after a newline."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    chunks = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            newline = mm.find(b"\n", min(start + chunk_size, size) - 1)
+            end = size if newline == -1 else newline + 1
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+
+def annotate_bytes(data: bytes, minimum: int = DEFAULT_MIN, maximum: int = DEFAULT_MAX) -> bytes:
+    """Append ' (YYYY-MM-DD HH:MM:SS[.fraction] UTC)' after every epoch whose seconds are in [minimum, maximum]."""
+    def replace(match):
+        value = int(match.group())
+        ns = value * UNIT_NANOS[detect_unit(value)]
+        if not minimum <= ns // NANOS_PER_SECOND <= maximum:
+            return match.group()
+        return match.group() + f" ({format_timestamp_ns(ns)} UTC)".encode()
+
+    return EPOCH_PATTERN.sub(replace, data)
+
+
+def annotate_chunk(path: str, start: int, end: int, minimum: int, maximum: int) -> bytes:
+    """Worker entry point: map the file and annotate the byte range [start, end)."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return annotate_bytes(mm[start:end], minimum, maximum)
+
+
+def annotate_file(
+    path: str,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    minimum: int = DEFAULT_MIN,
+    maximum: int = DEFAULT_MAX
+) -> Iterator[bytes]:
+    """
+    Annotate a log file in parallel and yield the annotated chunks in file order.
+
+    At most two chunks per worker are in flight at once, so memory use does not
+    grow with the file size.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_chunks(path, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, end in chunks:
+            pending.append(executor.submit(annotate_chunk, path, start, end, minimum, maximum))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_annotated(path: str, out: BinaryIO, **kwargs) -> int:
+    """Write the annotated file to out and return the number of bytes written."""
+    written = 0
+    for data in annotate_file(path, **kwargs):
+        out.write(data)
+        written += len(data)
+    out.flush()
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Append UTC dates after POSIX timestamps embedded in a log file.")
+    parser.add_argument("file", help="log file to annotate")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="chunk size in bytes (default: %(default)s)")
+    parser.add_argument("--min", dest="minimum", type=int, default=DEFAULT_MIN,
+                        help="smallest value treated as a timestamp (default: %(default)s)")
+    parser.add_argument("--max", dest="maximum", type=int, default=DEFAULT_MAX,
+                        help="largest value treated as a timestamp (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    options = dict(workers=args.workers, chunk_size=args.chunk_size, minimum=args.minimum, maximum=args.maximum)
+    try:
+        if args.output:
+            with open(args.output, "wb") as out:
+                write_annotated(args.file, out, **options)
+        else:
+            write_annotated(args.file, sys.stdout.buffer, **options)
+    except BrokenPipeError:
+        drop_stdout()
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
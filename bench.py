@@ -0,0 +1,218 @@
+import argparse
+import importlib
+import json
+import platform
+import random
+import sys
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import civil
+import core
+
+
+# Benchmark and differential-check suite for the hot functions in core.
+#
+#   python bench.py -o results.json                  time every case
+#   python bench.py --baseline results.json          compare against a stored run
+#   python bench.py --diff                           check candidates against references
+#   python bench.py --diff --candidate seconds_to_text=mymodule:fast_seconds_to_text
+
+ANCHOR = 1700000000
+DAY = 86400
+YEAR = 365 * DAY
+CYCLE = 146097 * DAY  # The Gregorian calendar repeats every 400 years
+
+
+def make_inputs(seed: int = 0, count: int = 2000) -> Dict[str, List[int]]:
+    """Return named, reproducible input sets of durations and timestamps."""
+    rng = random.Random(seed)
+    return {
+        "short": [rng.randint(1, 30 * DAY) for _ in range(count)],
+        "century": [rng.randint(100 * YEAR, 600 * YEAR) for _ in range(count)],
+        "negative": [-rng.randint(1, 50 * YEAR) for _ in range(count)],
+        # Timestamps that mostly share a handful of days, as bookmarks and logs do.
+        "same_day": [ANCHOR + rng.randint(0, 3 * DAY) for _ in range(count)],
+        "spread": [rng.randint(0, 4102444800) for _ in range(count)],
+    }
+
+
+def time_calls(func: Callable, args_list: List[tuple], repeat: int) -> float:
+    """Return the best observed nanoseconds per call of func over args_list."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for args in args_list:
+            func(*args)
+        elapsed = (time.perf_counter_ns() - start) / max(1, len(args_list))
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmarks(repeat: int = 5, seed: int = 0) -> Dict[str, float]:
+    """Time every benchmark case and return nanoseconds per call keyed by case name."""
+    inputs = make_inputs(seed)
+    results = {}
+    for name in ("short", "century", "negative"):
+        for output_format in range(-3, 4):
+            args_list = [(value, output_format, ANCHOR) for value in inputs[name]]
+            results[f"seconds_to_text[{name},fmt={output_format}]"] = time_calls(
+                core.seconds_to_text, args_list, repeat)
+    for name in ("same_day", "spread"):
+        results[f"format_timestamp[{name}]"] = time_calls(
+            core.format_timestamp, [(value,) for value in inputs[name]], repeat)
+    stamps_ns = [(value * core.NANOS_PER_SECOND + 123456789,) for value in inputs["same_day"]]
+    results["format_timestamp_ns[same_day]"] = time_calls(core.format_timestamp_ns, stamps_ns, repeat)
+    results["parse_nanoseconds[ns]"] = time_calls(
+        core.parse_nanoseconds, [(str(value),) for value, in stamps_ns], repeat)
+    results["nanoseconds_to_text[short,fmt=0]"] = time_calls(
+        core.nanoseconds_to_text, [(value * core.NANOS_PER_SECOND + 5, 0, ANCHOR) for value in inputs["short"]], repeat)
+    results["PosixTime.now"] = time_calls(core.PosixTime.now, [()] * len(inputs["short"]), repeat)
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        values = inputs["century"]
+        results["seconds_to_text_many[century,fmt=0]"] = time_calls(
+            core.seconds_to_text_many, [(values, 0, ANCHOR)], repeat) / len(values)
+        values = inputs["spread"]
+        results["format_timestamp_many[spread]"] = time_calls(
+            core.format_timestamp_many, [(values,)], repeat) / len(values)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    """Print a comparison table and return the names of cases slower than baseline by more than threshold."""
+    regressions = []
+    for name, value in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:45s} {value:12.1f} ns      (new)")
+            continue
+        ratio = value / previous if previous else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:45s} {value:12.1f} ns  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def reference_format_timestamp(ts: int) -> str:
+    """
+    The original strftime-based format_timestamp, kept as the differential reference.
+
+    Timestamps outside datetime's years are moved into 2000-2399 by whole 400-year
+    cycles, formatted there and given back the shifted years.
+    """
+    cycles = (ts - 946684800) // CYCLE  # 2000-01-01 starts a cycle
+    text = datetime.fromtimestamp(ts - cycles * CYCLE, tz=timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    year, rest = text.split("-", 1)
+    return f"{int(year) + 400 * cycles}-{rest}"
+
+
+def batch_seconds_to_text(seconds: int, output_format: int, from_timestamp: int) -> Optional[str]:
+    """Adapt seconds_to_text_many to the scalar seconds_to_text signature."""
+    return core.seconds_to_text_many([seconds], output_format, from_timestamp)[0]
+
+
+def load_function(spec: str) -> Callable:
+    """Resolve a 'module:function' specification."""
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def run_differential(candidates: Dict[str, Callable], samples: int, seed: int) -> int:
+    """Compare candidate implementations with the references on random inputs and return the mismatch count."""
+    rng = random.Random(seed)
+    mismatches = 0
+
+    def report(name, args, expected, actual):
+        nonlocal mismatches
+        mismatches += 1
+        if mismatches <= 10:
+            print(f"MISMATCH {name}{args}: expected {expected!r}, got {actual!r}")
+
+    candidate = candidates["seconds_to_text"]
+    for _ in range(samples):
+        magnitude = rng.choice((DAY, 40 * DAY, 5 * YEAR, 700 * YEAR))
+        args = (rng.randint(-magnitude, magnitude), rng.randint(-3, 3), rng.randint(-100 * YEAR, 200 * YEAR))
+        expected = core.seconds_to_text(*args)
+        actual = candidate(*args)
+        if actual != expected:
+            report("seconds_to_text", args, expected, actual)
+
+    candidate = candidates["format_timestamp"]
+    for _ in range(samples):
+        # Mostly datetime's years 1-9999, and some far outside them
+        magnitude = rng.choice((253402300799, 253402300799, 10 ** 15))
+        args = (rng.randint(-magnitude, magnitude),)
+        expected = reference_format_timestamp(*args)
+        actual = candidate(*args)
+        if actual != expected:
+            report("format_timestamp", args, expected, actual)
+
+    first, last = date(1, 1, 1).toordinal(), date(9999, 12, 31).toordinal()
+    offset = date(1970, 1, 1).toordinal()
+    for _ in range(samples):
+        ordinal = rng.randint(first, last)
+        reference = date.fromordinal(ordinal)
+        days = ordinal - offset
+        expected = ((reference.year, reference.month, reference.day), reference.weekday(),
+                    reference.timetuple().tm_yday)
+        actual = civil.civil_from_days(days), civil.weekday(days), civil.day_of_year(days)
+        if actual != expected:
+            report("civil", (days,), expected, actual)
+
+    print(f"{3 * samples} differential checks, {mismatches} mismatches")
+    return mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark and differential checks for core.py.")
+    parser.add_argument("-o", "--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown ratio before a case counts as a regression (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions per case (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for inputs (default: %(default)s)")
+    parser.add_argument("--diff", action="store_true", help="run differential checks instead of benchmarks")
+    parser.add_argument("--samples", type=int, default=10000,
+                        help="random inputs per differential check (default: %(default)s)")
+    parser.add_argument("--candidate", action="append", default=[], metavar="NAME=MODULE:FUNCTION",
+                        help="implementation to check against the NAME reference (seconds_to_text, format_timestamp)")
+    args = parser.parse_args(argv)
+
+    if args.diff:
+        candidates = {"seconds_to_text": batch_seconds_to_text, "format_timestamp": core.format_timestamp}
+        for spec in args.candidate:
+            name, _, target = spec.partition("=")
+            if name not in candidates:
+                parser.error(f"unknown candidate name: {name}")
+            candidates[name] = load_function(target)
+        return 1 if run_differential(candidates, args.samples, args.seed) else 0
+
+    results = run_benchmarks(args.repeat, args.seed)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "created": int(time.time()),
+                "results": results,
+            }, f, indent=2)
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from core import INT64_MAX, INT64_MIN, drop_stdout
+from store import BookmarkStore
+
+
+# Bulk import and export of bookmarks as CSV (timestamp,starred) or JSON lines
+# ({"timestamp": ..., "starred": ...}). Both directions stream: files are read
+# and rows fetched in chunks, so memory use does not grow with the row count.
+#
+#   python bookmark_io.py import bookmarks.csv
+#   python bookmark_io.py export bookmarks.jsonl
+
+CHUNK_ROWS = 10000
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path: str) -> str:
+    """Pick the file format from the extension, defaulting to CSV (also for stdin/stdout)."""
+    extension = os.path.splitext(path)[1].lower()
+    return "jsonl" if extension in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+def parse_starred(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "*")
+    return bool(value)
+
+
+def parse_timestamp(value) -> int:
+    """Return value as an integer SQLite can store, raising ValueError otherwise."""
+    timestamp = int(value)
+    if not INT64_MIN <= timestamp <= INT64_MAX:
+        raise ValueError(f"timestamp {timestamp} does not fit in 64 bits")
+    return timestamp
+
+
+def read_rows(stream: TextIO, file_format: str) -> Iterator[Tuple[int, bool]]:
+    """
+    Yield (timestamp, starred) rows from an open CSV or JSONL stream.
+
+    CSV rows are "timestamp[,starred]" with an optional header line. Blank
+    lines are skipped; unparsable lines and timestamps outside the 64-bit
+    range are skipped with a debug message.
+    """
+    if file_format == "jsonl":
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield parse_timestamp(record["timestamp"]), parse_starred(record.get("starred", False))
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Skipping line {number}: {e}", file=sys.stderr)  # Debug error message
+        return
+    for number, record in enumerate(csv.reader(stream), start=1):
+        if not record or not record[0].strip():
+            continue
+        try:
+            yield parse_timestamp(record[0]), parse_starred(record[1]) if len(record) > 1 else False
+        except ValueError:
+            if number > 1 or record[0].strip().lower() != "timestamp":
+                print(f"Skipping line {number}: {record!r}", file=sys.stderr)  # Debug error message
+
+
+def open_file(path: str, mode: str) -> TextIO:
+    """Open a bookmark file for reading ("r") or writing ("w"); '-' means stdin or stdout."""
+    if path == "-":
+        stream = sys.stdin if mode == "r" else sys.stdout
+        return open(stream.fileno(), mode, newline="", encoding="utf-8", closefd=False)
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def import_rows(
+    conn: sqlite3.Connection,
+    rows: Iterable[Tuple[int, bool]],
+    chunk_rows: int = CHUNK_ROWS
+) -> Tuple[int, int]:
+    """
+    Insert rows with executemany in chunks, within the connection's current transaction.
+
+    Timestamps that are already bookmarked are skipped by the UNIQUE constraint.
+
+    Returns:
+        (rows read, rows inserted)
+    """
+    read = 0
+    before = conn.total_changes
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            break
+        read += len(chunk)
+        conn.executemany("INSERT OR IGNORE INTO timestamps (timestamp, starred) VALUES (?, ?)", chunk)
+    return read, conn.total_changes - before
+
+
+def export_rows(conn: sqlite3.Connection, out: TextIO, file_format: str, chunk_rows: int = CHUNK_ROWS) -> int:
+    """Write every bookmark in timestamp order to out, fetching chunk_rows at a time; return the row count."""
+    cursor = conn.execute("SELECT timestamp, starred FROM timestamps ORDER BY timestamp")
+    writer = csv.writer(out, lineterminator="\n") if file_format == "csv" else None
+    if writer is not None:
+        writer.writerow(("timestamp", "starred"))
+    count = 0
+    while True:
+        chunk = cursor.fetchmany(chunk_rows)
+        if not chunk:
+            break
+        count += len(chunk)
+        if writer is not None:
+            writer.writerows((ts, int(starred)) for ts, starred in chunk)
+        else:
+            out.write("".join(f'{{"timestamp": {ts}, "starred": {"true" if starred else "false"}}}\n'
+                              for ts, starred in chunk))
+    return count
+
+
+def import_file(store: BookmarkStore, path: str, file_format: Optional[str] = None, callback=None, errback=None):
+    """Import a file on the store's worker in one transaction; the result is (read, inserted, seconds)."""
+    file_format = file_format or detect_format(path)
+
+    def run(conn):
+        start = time.perf_counter()
+        with open_file(path, "r") as f:
+            read, inserted = import_rows(conn, read_rows(f, file_format))
+        return read, inserted, time.perf_counter() - start
+
+    return store.submit(run, callback, errback)
+
+
+def export_file(store: BookmarkStore, path: str, file_format: Optional[str] = None, callback=None, errback=None):
+    """Export all bookmarks on the store's worker; the result is (rows, seconds)."""
+    file_format = file_format or detect_format(path)
+
+    def run(conn):
+        start = time.perf_counter()
+        with open_file(path, "w") as f:
+            count = export_rows(conn, f, file_format)
+        return count, time.perf_counter() - start
+
+    return store.submit(run, callback, errback)
+
+
+def rate(rows: int, seconds: float) -> str:
+    return f"{rows / seconds:,.0f} rows/s" if seconds > 0 else "n/a rows/s"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import or export bookmarks as CSV or JSON lines.")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("file", help="file to read or write ('-' for stdin/stdout)")
+    parser.add_argument("--format", dest="file_format", choices=FORMATS, default=None,
+                        help="file format (default: from the extension, else csv)")
+    parser.add_argument("--db", default="timestamps.db", help="bookmark database (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    store = BookmarkStore(args.db)
+    try:
+        if args.command == "import":
+            read, inserted, elapsed = import_file(store, args.file, args.file_format).result()
+        else:
+            count, elapsed = export_file(store, args.file, args.file_format).result()
+    except BrokenPipeError:
+        drop_stdout()
+        return 0
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+
+    if args.command == "import":
+        print(f"Imported {inserted:,} of {read:,} rows ({read - inserted:,} already bookmarked) "
+              f"in {elapsed:.2f} s, {rate(read, elapsed)}", file=sys.stderr)
+    else:
+        print(f"Exported {count:,} rows in {elapsed:.2f} s, {rate(count, elapsed)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+from typing import Tuple
+
+
+# Closed-form proleptic Gregorian calendar arithmetic on POSIX seconds.
+#
+# Every function here is branch-free integer math, so it works the same on
+# plain ints and on NumPy integer arrays, and is not limited to the year range
+# of datetime. Day numbers count days since 1970-01-01.
+
+SECONDS_PER_DAY = 86400
+
+
+def days_from_civil(year, month, day):
+    """Return the day number of a (year, month, day) civil date."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def civil_from_days(days) -> Tuple:
+    """Return the (year, month, day) civil date of a day number."""
+    days = days + 719468
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    shifted_month = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = shifted_month + 3 - 12 * (shifted_month >= 10)
+    return year_of_era + era * 400 + (month <= 2), month, day
+
+
+def weekday(days):
+    """Return the weekday of a day number, Monday being 0 as in datetime.date.weekday()."""
+    return (days + 3) % 7  # 1970-01-01 was a Thursday
+
+
+def day_of_year(days):
+    """Return the 1-based position of a day number within its calendar year."""
+    year, _, _ = civil_from_days(days)
+    return days - days_from_civil(year, 1, 1) + 1
+
+
+def day_bounds(timestamp) -> Tuple:
+    """Return the first and last second of the UTC day containing a timestamp."""
+    start = timestamp // SECONDS_PER_DAY * SECONDS_PER_DAY
+    return start, start + SECONDS_PER_DAY - 1
+
+
+def days_in_month(year, month):
+    """Return the number of days in the given month."""
+    next_year = year + (month == 12)
+    next_month = month % 12 + 1
+    return days_from_civil(next_year, next_month, 1) - days_from_civil(year, month, 1)
+
+
+def add_months(timestamp, months):
+    """
+    Move a timestamp by a number of calendar months, keeping the time of day.
+
+    The day of month is clamped to the length of the resulting month, so
+    January 31st plus one month is the last day of February.
+    """
+    days = timestamp // SECONDS_PER_DAY
+    time_of_day = timestamp - days * SECONDS_PER_DAY
+    year, month, day = civil_from_days(days)
+    month_index = year * 12 + month - 1 + months
+    new_year = month_index // 12
+    new_month = month_index % 12 + 1
+    month_length = days_in_month(new_year, new_month)
+    new_day = day + (month_length - day) * (day > month_length)
+    return days_from_civil(new_year, new_month, new_day) * SECONDS_PER_DAY + time_of_day
+
+
+def calendar_span(anchor, seconds) -> Tuple:
+    """
+    Split a span starting at an anchor timestamp into calendar units.
+
+    Args:
+        anchor: POSIX timestamp the span starts from
+        seconds: Non-negative length of the span in seconds
+
+    Returns:
+        Tuple of (years, months, days, seconds) such that adding the years and
+        months to the anchor with add_months, then the days and seconds, lands
+        exactly on anchor + seconds.
+    """
+    end = anchor + seconds
+    start_year, start_month, _ = civil_from_days(anchor // SECONDS_PER_DAY)
+    end_year, end_month, _ = civil_from_days(end // SECONDS_PER_DAY)
+    months = (end_year * 12 + end_month) - (start_year * 12 + start_month)
+    # Landing in the end month may overshoot the end by less than a month.
+    months = months - (add_months(anchor, months) > end)
+    rest = end - add_months(anchor, months)
+    days = rest // SECONDS_PER_DAY
+    return months // 12, months % 12, days, rest - days * SECONDS_PER_DAY
@@ -0,0 +1,112 @@
+import argparse
+import sys
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from core import NANOS_PER_SECOND, PosixTime, drop_stdout, format_nanoseconds, format_timestamp_ns, \
+    nanoseconds_to_text, parse_nanoseconds
+from zones import Zone, ZoneInfoNotFoundError, get_zone
+
+
+# Headless converter for shell pipelines. Only depends on core, so it can run
+# without tkinter, tkcalendar or babel installed.
+
+CHUNK_SIZE = 1 << 16
+
+
+def read_lines(paths: List[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield input lines one by one from the given files, or stdin when none (or '-') is given."""
+    for path in paths or ["-"]:
+        if path == "-":
+            stream = open(sys.stdin.fileno(), "r", buffering=chunk_size, closefd=False, errors="replace")
+        else:
+            stream = open(path, "r", buffering=chunk_size, errors="replace")
+        with stream:
+            yield from stream
+
+
+def convert_lines(
+    lines: Iterable[str],
+    from_timestamp: int,
+    output_format: int = 0,
+    zone: Optional[Zone] = None
+) -> Iterator[str]:
+    """
+    Convert each line holding a POSIX timestamp into a tab-separated output line.
+
+    Timestamps may be in seconds, milliseconds, microseconds or nanoseconds
+    (guessed from the digit count, or given with a unit suffix such as 'ms')
+    or decimal seconds; fractions of a second are kept exactly.
+
+    Args:
+        lines: Input lines, one timestamp per line
+        from_timestamp: Fixed anchor the durations are measured against
+        output_format: seconds_to_text output format for the duration column
+        zone: Zone to show dates in, with its abbreviation (default: UTC, unmarked)
+
+    Yields:
+        "seconds<TAB>date<TAB>duration from the anchor" for valid lines,
+        and the original text followed by "Invalid timestamp" for the others.
+    """
+    anchor_ns = from_timestamp * NANOS_PER_SECOND
+    for line in lines:
+        text = line.strip()
+        ns = parse_nanoseconds(text)
+        if ns is None:
+            yield f"{text}\tInvalid timestamp\n"
+            continue
+        # Count calendar units forward from whichever end of the span comes first.
+        duration = nanoseconds_to_text(ns - anchor_ns, output_format,
+                                       from_timestamp=min(ns // NANOS_PER_SECOND, from_timestamp))
+        date_text = format_timestamp_ns(ns) if zone is None else zone.format_ns(ns)
+        yield f"{format_nanoseconds(ns)}\t{date_text}\t{duration or '0'}\n"
+
+
+def write_lines(lines: Iterable[str], out: TextIO, chunk_size: int = CHUNK_SIZE) -> int:
+    """Write lines in chunks of roughly chunk_size characters and return the number of lines written."""
+    count = 0
+    pending = []
+    pending_size = 0
+    for line in lines:
+        pending.append(line)
+        pending_size += len(line)
+        count += 1
+        if pending_size >= chunk_size:
+            out.write("".join(pending))
+            pending.clear()
+            pending_size = 0
+    out.write("".join(pending))
+    out.flush()
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m core",
+        description="Convert POSIX timestamps read line by line into UTC dates and durations.")
+    parser.add_argument("files", nargs="*", help="input files (default: stdin)")
+    parser.add_argument("--from", dest="from_timestamp", type=int, default=None,
+                        help="anchor timestamp durations are measured against (default: now)")
+    parser.add_argument("--format", dest="output_format", type=int, default=0, choices=range(-3, 4),
+                        help="seconds_to_text output format (default: 0)")
+    parser.add_argument("--zone", default=None,
+                        help="show dates in this IANA time zone, or 'localtime' (default: UTC)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="read/write buffer size in bytes (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    from_timestamp = PosixTime.now() if args.from_timestamp is None else args.from_timestamp
+    zone = None
+    if args.zone is not None:
+        try:
+            zone = get_zone(args.zone)
+        except ZoneInfoNotFoundError:
+            parser.error(f"unknown time zone: {args.zone}")
+    try:
+        lines = read_lines(args.files, args.chunk_size)
+        write_lines(convert_lines(lines, from_timestamp, args.output_format, zone), sys.stdout, args.chunk_size)
+    except BrokenPipeError:
+        drop_stdout()
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,76 @@
+from typing import Callable, List, Optional, Tuple
+
+from core import format_timestamp, seconds_to_text
+from zones import ZoneInfoNotFoundError, get_zone
+
+
+class Clock:
+    """A named line of the clock panel whose text is derived from the current POSIX time."""
+
+    def __init__(self, name: str, render: Callable[[int], str]):
+        self.name = name
+        self.render = render
+
+
+def utc_clock() -> Clock:
+    return Clock("UTC", lambda now: format_timestamp(now))
+
+
+def zone_clock(zone_name: str) -> Optional[Clock]:
+    """Return a clock for an IANA time zone, or None if the zone is unknown."""
+    try:
+        zone = get_zone(zone_name)
+    except ZoneInfoNotFoundError:
+        print(f"Unknown time zone {zone_name!r}")  # Debug error message
+        return None
+    return Clock(zone_name, zone.format)
+
+
+def relative_text(seconds: int) -> str:
+    """Format a signed distance from now as 'in ...', '... ago' or 'now'."""
+    text = seconds_to_text(abs(seconds), output_format=-2)
+    if text is None:
+        return "now"
+    return f"in {text}" if seconds > 0 else f"{text} ago"
+
+
+def countdown_clock(get_target: Callable[[], Optional[int]]) -> Clock:
+    """Time left until TARGET, read through get_target on every tick."""
+    def render(now):
+        target = get_target()
+        return "" if target is None else relative_text(target - now)
+    return Clock("TARGET", render)
+
+
+def elapsed_clock(timestamp: int) -> Clock:
+    """Time since (or until) a bookmarked timestamp."""
+    return Clock(f"* {timestamp}", lambda now: relative_text(timestamp - now))
+
+
+class ClockBoard:
+    """
+    A list of clocks refreshed together by one periodic tick.
+
+    tick() renders every clock for the given second and returns only the
+    (index, text) pairs whose text differs from the previous tick, so the
+    caller touches just the widgets that actually change.
+    """
+
+    def __init__(self, clocks: Optional[List[Clock]] = None):
+        self.clocks: List[Clock] = []
+        self._texts: List[Optional[str]] = []
+        self.set_clocks(clocks or [])
+
+    def set_clocks(self, clocks: List[Clock]):
+        """Replace the clocks; every one is reported as changed on the next tick."""
+        self.clocks = list(clocks)
+        self._texts = [None] * len(self.clocks)
+
+    def tick(self, now: int) -> List[Tuple[int, str]]:
+        changed = []
+        for index, clock in enumerate(self.clocks):
+            text = clock.render(now)
+            if text != self._texts[index]:
+                self._texts[index] = text
+                changed.append((index, text))
+        return changed
@@ -1,13 +1,38 @@
-from calendar import monthrange
-from datetime import datetime
-from typing import Optional
+import math
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
 
+from civil import SECONDS_PER_DAY, calendar_span, civil_from_days
+
+
+# Range of a 64-bit signed integer: NumPy int64 arrays, SQLite INTEGER columns and service requests
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
 
 # Simple helper to provide the current POSIX timestamp.
 class PosixTime:
     @staticmethod
     def now() -> int:
-        return int(datetime.utcnow().timestamp())
+        return int(time.time())
+
+    @staticmethod
+    def now_ns() -> int:
+        return time.time_ns()
+
+def warn(message: str):
+    """Print a diagnostic to stderr; a closed or missing stderr is ignored, so the caller carries on."""
+    if sys.stderr is None:
+        return  # print(file=None) would fall back to stdout
+    try:
+        print(message, file=sys.stderr)
+    except (OSError, ValueError):
+        pass
+
+def drop_stdout():
+    """Drop stdout after a BrokenPipeError (e.g. piped into head), so the flush at exit stays silent."""
+    sys.stdout = None
 
 def seconds_to_text(
     seconds: int,
@@ -27,6 +52,8 @@ def seconds_to_text(
             -1 = total months and remaining days + time
             -2 = total days + time
             -3 = total hours + minutes and seconds
+        from_timestamp: Anchor the calendar months and years are counted
+            forward from (defaults to the current time)
 
     Returns:
         Formatted string with appropriate units or None if seconds is 0.
@@ -34,36 +61,17 @@ def seconds_to_text(
     if seconds == 0:
         return None
 
-    now_stamp = from_timestamp or PosixTime.now()
-    # Duration is interpreted as the difference between now and the provided seconds.
-    duration = now_stamp - seconds
+    now_stamp = PosixTime.now() if from_timestamp is None else from_timestamp
 
     sign = "-" if seconds < 0 else ""
     abs_seconds = abs(seconds)
 
-    def get_days_in_range(years: int, months: int) -> int:
-        total_days = 0
-        start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        current_date = start_date
-        for _ in range(years * 12 + months):
-            days_in_month = monthrange(current_date.year, current_date.month)[1]
-            total_days += days_in_month
-            if current_date.month == 12:
-                current_date = current_date.replace(year=current_date.year + 1, month=1)
-            else:
-                current_date = current_date.replace(month=current_date.month + 1)
-        return total_days
-
     minutes, secs = divmod(abs_seconds, 60)
     hours, minutes = divmod(minutes, 60)
     days, hours = divmod(hours, 24)
 
-    # Approximate months and years using average days per month (30.44)
-    months = int(days / 30.44)
-    years, months = divmod(months, 12)
-
-    # Adjust days based on actual calendar months.
-    remaining_days = days - get_days_in_range(years, months)
+    # Calendar months and years counted forward from the anchor timestamp.
+    years, months, remaining_days, _ = calendar_span(now_stamp, abs_seconds)
 
     if output_format == -3:
         total_hours = (days * 24) + hours
@@ -96,8 +104,325 @@ def seconds_to_text(
         return "0"
     return sign + ", ".join(parts)
 
+# Sub-second precision. Values are integer nanoseconds throughout; they are
+# never converted through float, so 19-digit epochs stay exact.
+NANOS_PER_SECOND = 1_000_000_000
+
+UNIT_NANOS = {"s": NANOS_PER_SECOND, "ms": 1_000_000, "us": 1_000, "µs": 1_000, "ns": 1}
+
+_NUMBER = re.compile(r"([+-]?)([0-9]*)(?:\.([0-9]*))?\s*(ns|us|µs|ms|s)?")
+
+def detect_unit(value: int) -> str:
+    """
+    Guess the unit of an integer epoch from its digit count.
+
+    Up to 11 digits are seconds (until the year 5138), 12-14 milliseconds,
+    15-17 microseconds and 18 or more nanoseconds.
+    """
+    magnitude = abs(value)
+    if magnitude < 10 ** 11:
+        return "s"
+    if magnitude < 10 ** 14:
+        return "ms"
+    if magnitude < 10 ** 17:
+        return "us"
+    return "ns"
+
+def parse_nanoseconds(text: str, detect: bool = True) -> Optional[int]:
+    """
+    Parse a timestamp or duration into integer nanoseconds.
+
+    Accepts integers ('1700000000'), decimals ('1700000000.25') and an optional
+    unit suffix ('1500ms', '20 us', '7ns', '3s'). Decimals without a suffix
+    are seconds.
+
+    Args:
+        text: The text to parse
+        detect: Pick the unit of plain integers with detect_unit(); otherwise
+            they are seconds (used for durations, where size says nothing
+            about the unit)
+
+    Returns:
+        Integer nanoseconds, or None when the text is empty or not a number.
+        Digits finer than a nanosecond are truncated.
+    """
+    text = text.strip()
+    if text.isdigit() and text.isascii():
+        # Fast path for the common plain integer
+        value = int(text)
+        return value * UNIT_NANOS[detect_unit(value) if detect else "s"]
+    match = _NUMBER.fullmatch(text.lower())
+    if match is None:
+        return None
+    sign, whole, fraction, unit = match.groups()
+    if not whole and not fraction:
+        return None
+    value = int(whole or "0")
+    if unit is None:
+        unit = "s" if fraction is not None or not detect else detect_unit(value)
+    factor = UNIT_NANOS[unit]
+    nanos = value * factor
+    if fraction:
+        nanos += int(fraction) * factor // 10 ** len(fraction)
+    return -nanos if sign == "-" else nanos
+
+def fraction_text(fraction: int) -> str:
+    """Format 0 < fraction < 1e9 nanoseconds as '.5', '.123', '.123456' or '.123456789' (3, 6 or 9 digits)."""
+    digits = f"{fraction:09d}"
+    for size in (3, 6):
+        if digits[size:] == "0" * (9 - size):
+            return "." + digits[:size]
+    return "." + digits
+
+def format_nanoseconds(ns: int, detect: bool = False) -> str:
+    """
+    Format integer nanoseconds as decimal seconds for an entry: '1700000000' or '1700000000.250'.
+
+    With detect, whole seconds that detect_unit() would not read as seconds
+    get an explicit unit ('253402300799s'), so parse_nanoseconds(text) with
+    detection returns ns again.
+    """
+    sign = "-" if ns < 0 else ""
+    seconds, fraction = divmod(abs(ns), NANOS_PER_SECOND)
+    if fraction:
+        return f"{sign}{seconds}{fraction_text(fraction)}"
+    return f"{sign}{seconds}{'s' if detect and detect_unit(seconds) != 's' else ''}"
+
+def nanoseconds_to_text(
+    nanoseconds: int,
+    output_format: int = 0,
+    from_timestamp: Optional[int] = None
+) -> Optional[str]:
+    """
+    seconds_to_text for integer nanoseconds.
+
+    The fraction of a second is appended to the seconds field of the formats
+    that show one (-3 to 0); formats 1 to 3 are not precise to the second and
+    ignore it.
+
+    Args:
+        nanoseconds: Duration in integer nanoseconds (positive or negative)
+        output_format: Same values as seconds_to_text
+        from_timestamp: Anchor in whole seconds, as in seconds_to_text
+
+    Returns:
+        Formatted string or None if nanoseconds is 0.
+    """
+    seconds, fraction = divmod(abs(nanoseconds), NANOS_PER_SECOND)
+    sign = "-" if nanoseconds < 0 else ""
+    text = seconds_to_text(-seconds if sign else seconds, output_format, from_timestamp)
+    if not fraction or output_format > 0:
+        return text if text is not None or not fraction else "0"
+    digits = fraction_text(fraction)
+    if output_format == -3:
+        return f"{text}{digits}" if text is not None else f"{sign}0:00:00{digits}"
+    if text is None:
+        text = sign + {-2: "0 days, 00h00m00s", -1: "0 months, 0 days, 00h00m00s"}.get(output_format, "00h00m00s")
+    elif output_format == 0 and seconds % 86400 == 0:
+        # The time of day part is left out for whole days; bring it back for the fraction
+        return f"{text}, 00h00m00{digits}s"
+    return f"{text[:-1]}{digits}s"
+
+@lru_cache(maxsize=4096)
+def _day_prefix(day: int) -> str:
+    """Return the 'YYYY-MM-DD' text of a day number, cached per day."""
+    year, month, day_of_month = civil_from_days(day)
+    return f"{year}-{month:02d}-{day_of_month:02d}"
+
 def format_timestamp(ts: int) -> str:
     try:
-        return datetime.utcfromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+        # Any year works, including those before 1 and after 9999 that datetime rejects
+        day, second = divmod(math.floor(ts), SECONDS_PER_DAY)
+        hours, second = divmod(second, 3600)
+        minutes, second = divmod(second, 60)
+        return f"{_day_prefix(day)} {hours:02d}:{minutes:02d}:{second:02d}"
     except Exception:
-        return "Invalid timestamp"
\ No newline at end of file
+        return "Invalid timestamp"
+
+def format_timestamp_ns(ns: int) -> str:
+    """Format integer nanoseconds like format_timestamp, adding the fraction of a second when there is one."""
+    seconds, fraction = divmod(ns, NANOS_PER_SECOND)
+    text = format_timestamp(seconds)
+    if fraction and text != "Invalid timestamp":
+        text += fraction_text(fraction)
+    return text
+
+def format_cache_info():
+    """Return hit/miss counters of the per-day date prefix cache used by format_timestamp."""
+    return _day_prefix.cache_info()
+
+_TWO_DIGITS = [f"{i:02d}" for i in range(100)]  # Indexing is several times faster than :02d per field
+# add_months may land up to a month past the end of a span before stepping back
+_SPAN_MARGIN = 32 * SECONDS_PER_DAY
+
+def format_timestamp_many(timestamps) -> List[str]:
+    """
+    Batch version of format_timestamp for large arrays of POSIX seconds.
+
+    The civil date of every element is computed at once with the same
+    closed-form arithmetic on NumPy arrays; only the final string
+    formatting runs per element.
+    """
+    import numpy as np
+
+    values = np.asarray(timestamps, dtype=np.int64)
+    days = values // SECONDS_PER_DAY
+    seconds = values - days * SECONDS_PER_DAY
+    years, months, days_of_month = civil_from_days(days)
+    columns = (years, months, days_of_month, seconds // 3600, seconds // 60 % 60, seconds % 60)
+    pad = _TWO_DIGITS
+    return [f"{y}-{pad[mo]}-{pad[d]} {pad[h]}:{pad[mi]}:{pad[s]}" for y, mo, d, h, mi, s in
+            zip(*(column.tolist() for column in columns))]
+
+def _span_limit(anchor: int) -> int:
+    """Return the largest |seconds| whose calendar breakdown from anchor stays within int64 (negative if none)."""
+    if abs(anchor) > INT64_MAX - _SPAN_MARGIN:
+        return -1
+    return INT64_MAX - max(anchor, 0) - _SPAN_MARGIN
+
+def seconds_to_components_many(seconds, from_timestamp: Optional[int] = None) -> Dict[str, "np.ndarray"]:
+    """
+    Break an array of durations into the same components seconds_to_text uses.
+
+    The calendar breakdown runs the closed-form civil arithmetic directly on
+    the arrays, so every element costs the same regardless of its length.
+
+    Args:
+        seconds: Array-like of integer seconds (positive or negative)
+        from_timestamp: Anchor the calendar months and years are counted
+            forward from (defaults to the current time)
+
+    Returns:
+        Dictionary of int64 arrays keyed by "negative", "years", "months",
+        "days", "remaining_days", "hours", "minutes" and "secs".
+
+    Raises:
+        OverflowError: if a duration is too close to the int64 bounds for the
+            arithmetic to stay within int64 (seconds_to_text handles any size)
+    """
+    import numpy as np
+
+    values = np.asarray(seconds, dtype=np.int64)
+    anchor = PosixTime.now() if from_timestamp is None else from_timestamp
+    limit = _span_limit(anchor)
+    if values.size and (limit < 0 or values.min() < -limit or values.max() > limit):
+        raise OverflowError("durations this long do not fit the int64 calendar arithmetic")
+    abs_seconds = np.abs(values)
+
+    minutes, secs = np.divmod(abs_seconds, 60)
+    hours, minutes = np.divmod(minutes, 60)
+    days, hours = np.divmod(hours, 24)
+
+    years, months, remaining_days, _ = calendar_span(anchor, abs_seconds)
+
+    return {
+        "negative": values < 0,
+        "years": years,
+        "months": months,
+        "days": days,
+        "remaining_days": remaining_days,
+        "hours": hours,
+        "minutes": minutes,
+        "secs": secs,
+    }
+
+def seconds_to_text_many(
+    seconds,
+    output_format: int = 0,
+    from_timestamp: Optional[int] = None
+) -> List[Optional[str]]:
+    """
+    Batch version of seconds_to_text for large arrays of durations.
+
+    Args:
+        seconds: Array-like of integer seconds (positive or negative)
+        output_format: Same values as seconds_to_text (-3..3)
+        from_timestamp: Anchor shared by every element, as in seconds_to_text
+
+    Returns:
+        List of strings matching seconds_to_text element by element, with None
+        for zero durations.
+
+    Durations too long for int64 arithmetic (within about a month of the
+    int64 bounds, or beyond them) are formatted by seconds_to_text instead.
+    """
+    import numpy as np
+
+    anchor = PosixTime.now() if from_timestamp is None else from_timestamp
+    limit = _span_limit(anchor)
+    try:
+        values = np.asarray(seconds, dtype=np.int64)
+    except OverflowError:
+        values = None
+    if values is None or limit < 0:
+        return [seconds_to_text(int(value), output_format, anchor) for value in seconds]
+    in_range = (values >= -limit) & (values <= limit)
+    if not in_range.all():
+        texts = _seconds_to_text_array(np.where(in_range, values, 0), output_format, anchor)
+        for index in np.flatnonzero(~in_range).tolist():
+            texts[index] = seconds_to_text(int(values[index]), output_format, anchor)
+        return texts
+    return _seconds_to_text_array(values, output_format, anchor)
+
+def _seconds_to_text_array(values, output_format: int, anchor: int) -> List[Optional[str]]:
+    """seconds_to_text_many for an int64 array already known to be within the safe range."""
+    import numpy as np
+
+    parts = seconds_to_components_many(values, anchor)
+    zero = (values == 0).tolist()
+    signs = ["-" if negative else "" for negative in parts["negative"].tolist()]
+    days = parts["days"].tolist()
+    hours = parts["hours"].tolist()
+    minutes = parts["minutes"].tolist()
+    secs = parts["secs"].tolist()
+
+    if output_format == -3:
+        total_hours = (parts["days"] * 24 + parts["hours"]).tolist()
+        texts = [f"{s}{th}:{m:02d}:{sc:02d}" for s, th, m, sc in zip(signs, total_hours, minutes, secs)]
+        return [None if z else t for z, t in zip(zero, texts)]
+
+    if output_format == -2:
+        texts = [f"{s}{d} days, {h:02d}h{m:02d}m{sc:02d}s"
+                 for s, d, h, m, sc in zip(signs, days, hours, minutes, secs)]
+        return [None if z else t for z, t in zip(zero, texts)]
+
+    remaining_days = parts["remaining_days"]
+    if output_format == -1:
+        total_months = (parts["years"] * 12 + parts["months"]).tolist()
+        texts = [f"{s}{tm} months, {rd} days, {h:02d}h{m:02d}m{sc:02d}s"
+                 for s, tm, rd, h, m, sc in zip(signs, total_months, remaining_days.tolist(), hours, minutes, secs)]
+        return [None if z else t for z, t in zip(zero, texts)]
+
+    years = parts["years"]
+    months = parts["months"]
+    if output_format == 2:
+        months = months + (remaining_days > 15)
+        years = years + (months == 12)
+        months = np.where(months == 12, 0, months)
+
+    results = []
+    for z, s, y, mo, rd, h, m, sc in zip(zero, signs, years.tolist(), months.tolist(), remaining_days.tolist(),
+                                          hours, minutes, secs):
+        if z:
+            results.append(None)
+            continue
+        text_parts = []
+        if y > 0:
+            text_parts.append(f"{y} years")
+        if output_format <= 2 and mo > 0:
+            text_parts.append(f"{mo} months")
+        if output_format <= 1 and rd > 0:
+            text_parts.append(f"{rd} days")
+        if output_format <= 0:
+            if h > 0 or m > 0 or sc > 0:
+                text_parts.append(f"{h:02d}h{m:02d}m{sc:02d}s")
+        results.append(s + ", ".join(text_parts) if text_parts else "0")
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    from cli import main
+
+    sys.exit(main())
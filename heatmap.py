@@ -0,0 +1,80 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from civil import SECONDS_PER_DAY, civil_from_days, days_from_civil
+
+
+# Bookmark counts per day for the calendar heatmap. Counts are loaded a whole
+# month at a time (one GROUP BY query) and then kept in step with bookmark
+# edits, so moving between months already seen runs no query at all.
+
+MAX_MONTHS = 240  # Cached months; least recently shown ones are dropped first
+
+# (smallest count, tag, background, foreground), lightest first
+HEAT_LEVELS = (
+    (1, "heat1", "#c6e48b", "black"),
+    (2, "heat2", "#7bc96f", "black"),
+    (4, "heat3", "#239a3b", "white"),
+    (8, "heat4", "#196127", "white"),
+)
+
+
+def month_bounds(year: int, month: int) -> Tuple[int, int]:
+    """Return the first and last second of a month, in POSIX seconds."""
+    start = days_from_civil(year, month, 1) * SECONDS_PER_DAY
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return start, days_from_civil(next_year, next_month, 1) * SECONDS_PER_DAY - 1
+
+
+def heat_tag(count: int) -> Optional[str]:
+    """Return the calendar tag for a day with count bookmarks, or None for an empty day."""
+    tag = None
+    for smallest, name, _, _ in HEAT_LEVELS:
+        if count >= smallest:
+            tag = name
+    return tag
+
+
+class DayCountCache:
+    """
+    Per-month {day number: bookmark count}, for the months loaded so far.
+
+    adjust() applies a single bookmark insert or removal to the cached month
+    it falls in; a month that is not cached is left to its next load.
+    clear() drops everything (after a bulk import, say) and bumps version,
+    so that a load started before it can be recognised and thrown away.
+    """
+
+    def __init__(self, max_months: int = MAX_MONTHS):
+        self.max_months = max_months
+        self.months: "OrderedDict[Tuple[int, int], Dict[int, int]]" = OrderedDict()
+        self.version = 0
+
+    def get(self, year: int, month: int) -> Optional[Dict[int, int]]:
+        counts = self.months.get((year, month))
+        if counts is not None:
+            self.months.move_to_end((year, month))
+        return counts
+
+    def put(self, year: int, month: int, counts: Dict[int, int]):
+        self.months[(year, month)] = counts
+        self.months.move_to_end((year, month))
+        while len(self.months) > self.max_months:
+            self.months.popitem(last=False)
+
+    def adjust(self, timestamp: int, delta: int) -> Tuple[int, int]:
+        """Add delta to the count of timestamp's day if its month is cached; return that (year, month)."""
+        day = timestamp // SECONDS_PER_DAY
+        year, month, _ = civil_from_days(day)
+        counts = self.months.get((year, month))
+        if counts is not None:
+            count = counts.get(day, 0) + delta
+            if count > 0:
+                counts[day] = count
+            else:
+                counts.pop(day, None)
+        return year, month
+
+    def clear(self):
+        self.months.clear()
+        self.version += 1
@@ -0,0 +1,283 @@
+from bisect import bisect_left
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+from civil import SECONDS_PER_DAY, civil_from_days, day_bounds, day_of_year, days_from_civil, weekday
+from core import NANOS_PER_SECOND, PosixTime, nanoseconds_to_text
+from zones import UTC, Zone
+
+
+PRESETS = {
+    "DAY": 86400,
+    "WEEK": 604800,
+    "12 DAYS": 1036800,
+    "13 DAYS": 1123200,
+    "2 WEEKS": 1209600,
+    "15 DAYS": 1296000,
+    "28 DAYS": 2419200,
+    "29 DAYS": 2505600,
+    "30 DAYS": 2592000,
+    "31 DAYS": 2678400,
+    "365 DAYS": 31536000,
+}
+
+
+class TimestampModel:
+    """
+    TARGET/HEAD/TAIL state and everything derived from it, independent of Tk.
+
+    Values are exact integer nanoseconds in target_ns, head_ns and tail_ns
+    (None when empty or invalid), mirrored as whole seconds, rounded down, in
+    target, head and tail. Derived values are computed once per change and
+    listeners registered with subscribe() are called with the set of field
+    names that changed ("target", "head", "tail", "zone"). Dates are
+    formatted in zone; the day values stay in UTC.
+
+    Bookmarks are kept as a window of at most bookmark_window rows of
+    (timestamp, starred), sorted by timestamp, starting at position
+    bookmark_offset of the bookmark_total rows in the database. The window is
+    edited in place with bisect. Listeners registered with subscribe_bookmarks()
+    are called with (action, index, row) for each change, where action is
+    "insert", "delete" or "update", ("shift", None, None) when only the
+    offset or total changed, or ("reset", None, None) when the whole window
+    was replaced.
+    """
+
+    def __init__(self, target: Optional[int] = None, head: Optional[int] = None, tail: Optional[int] = None,
+                 zone: Zone = UTC):
+        self.target_ns, self.head_ns, self.tail_ns = (
+            None if value is None else value * NANOS_PER_SECOND for value in (target, head, tail))
+        self.zone = zone
+        self.bookmarks: List[Tuple[int, bool]] = []
+        self._bookmark_keys: List[int] = []
+        self.bookmark_offset = 0
+        self.bookmark_total = 0
+        self.bookmark_window = 100
+        self.bookmark_version = 0  # Bumped on every bookmark change, to detect stale page fetches
+        self._listeners: List[Callable[[Set[str]], None]] = []
+        self._bookmark_listeners: List[Callable[[str, Optional[int], Optional[Tuple[int, bool]]], None]] = []
+        self._recompute()
+
+    def subscribe(self, callback: Callable[[Set[str]], None]):
+        """Register a callback invoked with the names of the fields that changed."""
+        self._listeners.append(callback)
+
+    def subscribe_bookmarks(self, callback: Callable[[str, Optional[int], Optional[Tuple[int, bool]]], None]):
+        """Register a callback invoked with (action, index, row) for each bookmark list change."""
+        self._bookmark_listeners.append(callback)
+
+    def update(self, **values):
+        """
+        Set fields, recompute and notify if something changed.
+
+        Accepts target, head and tail in whole seconds, target_ns, head_ns and
+        tail_ns in integer nanoseconds, and zone.
+        """
+        exact = {}
+        for name, value in values.items():
+            if name in ("target", "head", "tail"):
+                name, value = f"{name}_ns", None if value is None else value * NANOS_PER_SECOND
+            exact[name] = value
+        changed = {name for name, value in exact.items() if getattr(self, name) != value}
+        if not changed:
+            return
+        for name in changed:
+            setattr(self, name, exact[name])
+        self._recompute()
+        self._notify({name[:-3] if name.endswith("_ns") else name for name in changed})
+
+    def set_target(self, value: Optional[int]):
+        self.update(target=value)
+
+    def set_head(self, value: Optional[int]):
+        self.update(head=value)
+
+    def set_tail(self, value: Optional[int]):
+        self.update(tail=value)
+
+    def set_target_ns(self, value: Optional[int]):
+        self.update(target_ns=value)
+
+    def set_zone(self, zone: Zone):
+        self.update(zone=zone)
+
+    def set_bookmarks(self, rows: Iterable[Tuple[int, bool]], offset: int = 0, total: Optional[int] = None):
+        """Replace the loaded window of (timestamp, starred) rows, which starts at position offset of total."""
+        self.bookmarks = sorted(rows)
+        self._bookmark_keys = [ts for ts, _ in self.bookmarks]
+        self.bookmark_offset = offset
+        self.bookmark_total = len(self.bookmarks) if total is None else total
+        self.bookmark_version += 1
+        self._notify_bookmarks("reset", None, None)
+
+    def bookmark_index(self, timestamp: int) -> Optional[int]:
+        """Return the row index of a bookmarked timestamp within the loaded window, or None."""
+        index = bisect_left(self._bookmark_keys, timestamp)
+        if index < len(self._bookmark_keys) and self._bookmark_keys[index] == timestamp:
+            return index
+        return None
+
+    def bookmark_window_short(self) -> bool:
+        """Return True when fewer rows are loaded than the window could show, so it needs a refill."""
+        return len(self.bookmarks) < min(self.bookmark_window, self.bookmark_total)
+
+    def add_bookmark(self, timestamp: int, starred: bool = False):
+        if self.bookmark_index(timestamp) is not None:
+            return
+        self.bookmark_total += 1
+        self.bookmark_version += 1
+        index = bisect_left(self._bookmark_keys, timestamp)
+        at_end = self.bookmark_offset + len(self.bookmarks) == self.bookmark_total - 1
+        if index == 0 and self.bookmark_offset > 0 or index == len(self.bookmarks) and not at_end:
+            # Outside the loaded window (or the window is empty past rows that are not loaded):
+            # only its position within the full list moves
+            if index == 0:
+                self.bookmark_offset += 1
+            self._notify_bookmarks("shift", None, None)
+            return
+        self._bookmark_keys.insert(index, timestamp)
+        self.bookmarks.insert(index, (timestamp, starred))
+        self._notify_bookmarks("insert", index, self.bookmarks[index])
+        if len(self.bookmarks) > self.bookmark_window:
+            self._bookmark_keys.pop()
+            self._notify_bookmarks("delete", len(self.bookmarks) - 1, self.bookmarks.pop())
+
+    def remove_bookmark(self, timestamp: int):
+        self.bookmark_total -= 1
+        self.bookmark_version += 1
+        index = self.bookmark_index(timestamp)
+        if index is None:
+            if self.bookmark_offset > 0 and (not self.bookmarks or timestamp < self._bookmark_keys[0]):
+                self.bookmark_offset -= 1
+            self._notify_bookmarks("shift", None, None)
+            return
+        del self._bookmark_keys[index]
+        row = self.bookmarks.pop(index)
+        self._notify_bookmarks("delete", index, row)
+
+    def toggle_bookmark_star(self, timestamp: int):
+        index = self.bookmark_index(timestamp)
+        if index is None:
+            return
+        self.bookmark_version += 1
+        self.bookmarks[index] = (timestamp, not self.bookmarks[index][1])
+        self._notify_bookmarks("update", index, self.bookmarks[index])
+
+    def move_bookmark(self, old_timestamp: int, new_timestamp: int, starred: bool = False):
+        """Change a bookmark's timestamp, keeping its star (starred is used when it is outside the window)."""
+        index = self.bookmark_index(old_timestamp)
+        if index is not None:
+            starred = self.bookmarks[index][1]
+            new_index = bisect_left(self._bookmark_keys, new_timestamp)
+            # Rows just outside the window are unknown, so only trust neighbours that are loaded
+            lower_known = index > 0 or self.bookmark_offset == 0
+            upper_known = (index < len(self.bookmarks) - 1
+                           or self.bookmark_offset + len(self.bookmarks) == self.bookmark_total)
+            if (new_index in (index, index + 1) and self.bookmark_index(new_timestamp) is None
+                    and (new_timestamp > old_timestamp or lower_known)
+                    and (new_timestamp < old_timestamp or upper_known)):
+                # Sort position unchanged, rewrite the row in place
+                self.bookmark_version += 1
+                self._bookmark_keys[index] = new_timestamp
+                self.bookmarks[index] = (new_timestamp, starred)
+                self._notify_bookmarks("update", index, self.bookmarks[index])
+                return
+        self.remove_bookmark(old_timestamp)
+        self.add_bookmark(new_timestamp, starred)
+
+    def step_target(self, delta: int):
+        """Move TARGET by delta seconds, starting from 0 when it is empty."""
+        self.set_target_ns((self.target_ns or 0) + delta * NANOS_PER_SECOND)
+
+    def use_current(self):
+        self.set_target(PosixTime.now())
+
+    def use_day_start(self):
+        """Move TARGET to the first second of its UTC day."""
+        if self._require_target():
+            self.set_target(self.day_start)
+
+    def use_day_end(self):
+        """Move TARGET to the last second of its UTC day."""
+        if self._require_target():
+            self.set_target(self.day_end)
+
+    def use_date(self, year: int, month: int, day: int):
+        """Move TARGET to another date, preserving its time of day."""
+        if self._require_target():
+            days = days_from_civil(year, month, day) - self.day_start // SECONDS_PER_DAY
+            self.set_target_ns(self.target_ns + days * SECONDS_PER_DAY * NANOS_PER_SECOND)
+
+    def use_day_position(self, position: int, size: int):
+        """Move TARGET to the whole second at position out of size within its UTC day (0 first, size last)."""
+        if self._require_target():
+            position = max(0, min(position, size))
+            self.set_target(self.day_start + (self.day_end - self.day_start) * position // size)
+
+    def apply_head_preset(self, preset: str):
+        if preset in PRESETS:
+            self.set_head(PRESETS[preset])
+
+    def apply_tail_preset(self, preset: str):
+        if preset in PRESETS:
+            self.set_tail(PRESETS[preset])
+
+    def _require_target(self) -> bool:
+        """Return True if TARGET is set; otherwise reset it to the current time."""
+        if self.target is None:
+            self.use_current()
+            return False
+        return True
+
+    def _recompute(self):
+        ns = NANOS_PER_SECOND
+        target_ns = self.target_ns
+        self.target, self.head, self.tail = (
+            None if value is None else value // ns for value in (target_ns, self.head_ns, self.tail_ns))
+        target = self.target
+        if target is None:
+            self.target_date = None
+            self.target_civil = None
+            self.target_weekday = self.target_day_of_year = None
+            self.day_start = self.day_end = None
+            self.day_fraction = None
+            self.day_start_offset = self.day_end_offset = None
+            self.window_start = self.window_end = None
+        else:
+            day = target // SECONDS_PER_DAY
+            self.target_date = self.zone.format_ns(target_ns)
+            self.target_civil = civil_from_days(day)
+            self.target_weekday = weekday(day)
+            self.target_day_of_year = day_of_year(day)
+            self.day_start, self.day_end = day_bounds(target)
+            self.day_fraction = (target_ns - self.day_start * ns) / (SECONDS_PER_DAY * ns)  # Only used for drawing
+            self.day_start_offset = nanoseconds_to_text(target_ns - self.day_start * ns, output_format=-3)
+            self.day_end_offset = nanoseconds_to_text(target_ns - self.day_end * ns, output_format=-3)
+            # HEAD/TAIL window around TARGET, an empty HEAD or TAIL counting as 0
+            start = target_ns - (self.head_ns or 0)
+            end = target_ns + (self.tail_ns or 0)
+            # Bookmarks are whole seconds, so the window holds the seconds from ceil(start) to floor(end)
+            self.window_start, self.window_end = -(-min(start, end) // ns), max(start, end) // ns
+
+        if target is not None and self.head is not None:
+            self.head_timestamp_ns = target_ns - self.head_ns
+            self.head_timestamp = self.head_timestamp_ns // ns
+            self.head_duration = nanoseconds_to_text(self.head_ns, from_timestamp=self.head_timestamp)
+            self.head_date = self.zone.format_ns(self.head_timestamp_ns)
+        else:
+            self.head_timestamp_ns = self.head_timestamp = self.head_duration = self.head_date = None
+
+        if target is not None and self.tail is not None:
+            self.tail_timestamp_ns = target_ns + self.tail_ns
+            self.tail_timestamp = self.tail_timestamp_ns // ns
+            self.tail_duration = nanoseconds_to_text(self.tail_ns, from_timestamp=target)
+            self.tail_date = self.zone.format_ns(self.tail_timestamp_ns)
+        else:
+            self.tail_timestamp_ns = self.tail_timestamp = self.tail_duration = self.tail_date = None
+
+    def _notify(self, changed: Set[str]):
+        for callback in self._listeners:
+            callback(changed)
+
+    def _notify_bookmarks(self, action: str, index: Optional[int], row: Optional[Tuple[int, bool]]):
+        for callback in self._bookmark_listeners:
+            callback(action, index, row)
@@ -0,0 +1,195 @@
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+# Opt-in timing of Tk callbacks, selected TimestampApp methods and bookmark
+# store operations. Nothing is installed unless the environment variable is
+# set, so the normal run pays no overhead.
+#
+#   TIMECALC_PROFILE=1 python ui.py                 dump to profile.json on exit
+#   TIMECALC_PROFILE=/tmp/run.json python ui.py     dump to the given file
+#   TIMECALC_PROFILE_OVERLAY=1                      show the overlay at startup (F12 toggles it)
+#
+# Timings are named "tk:<callback>" for everything Tk dispatches (events,
+# commands, after() callbacks), "app:<method>" for instrumented methods called
+# from those and "db:<operation>" for store operations on the worker thread.
+
+ENV_VAR = "TIMECALC_PROFILE"
+OVERLAY_ENV_VAR = "TIMECALC_PROFILE_OVERLAY"
+DEFAULT_DUMP_PATH = "profile.json"
+
+BUCKETS_PER_OCTAVE = 4  # Bucket bounds grow by 2 ** (1/4), about 19%
+BUCKET_COUNT = 4 * 28  # 1 us up to about 4.5 minutes
+WINDOW = 1000  # Samples per histogram the percentiles are computed over
+
+
+def bucket_index(seconds: float) -> int:
+    """Return the histogram bucket of a duration; bucket i holds durations up to 2 ** ((i + 1) / 4) us."""
+    micros = seconds * 1e6
+    if micros <= 1:
+        return 0
+    return min(int(math.log2(micros) * BUCKETS_PER_OCTAVE), BUCKET_COUNT - 1)
+
+
+def bucket_bound(index: int) -> float:
+    """Return the upper bound of a bucket in seconds."""
+    return 2 ** ((index + 1) / BUCKETS_PER_OCTAVE) / 1e6
+
+
+class RollingHistogram:
+    """
+    Log-bucketed histogram of the last window durations, plus all-time totals.
+
+    Recording is O(1): the bucket of each sample is kept in a ring so the
+    oldest sample's bucket can be decremented when the window is full.
+    Percentiles are read as the upper bound of the bucket they fall in.
+    """
+
+    def __init__(self, window: int = WINDOW):
+        self.buckets = [0] * BUCKET_COUNT
+        self.recent = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        index = bucket_index(seconds)
+        if len(self.recent) == self.recent.maxlen:
+            self.buckets[self.recent[0]] -= 1
+        self.recent.append(index)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Return the duration below which fraction of the windowed samples fall, in seconds."""
+        rank = max(1, math.ceil(fraction * len(self.recent)))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return bucket_bound(index)
+        return 0.0
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1e3, 3),
+            "max_ms": round(self.max * 1e3, 3),
+            "p50_ms": round(self.percentile(0.5) * 1e3, 3),
+            "p90_ms": round(self.percentile(0.9) * 1e3, 3),
+            "p99_ms": round(self.percentile(0.99) * 1e3, 3),
+            "buckets": [[round(bucket_bound(index) * 1e3, 4), count]
+                        for index, count in enumerate(self.buckets) if count],
+        }
+
+
+def callback_name(func: Callable) -> str:
+    """A readable name for a callback: its function name, or file:line for lambdas."""
+    func = getattr(func, "__func__", func)
+    if isinstance(func, functools.partial):
+        func = func.func
+    name = getattr(func, "__name__", type(func).__name__)
+    code = getattr(func, "__code__", None)
+    if name == "<lambda>" and code is not None:
+        name = f"lambda@{os.path.basename(code.co_filename)}:{code.co_firstlineno}"
+    return name
+
+
+class Profiler:
+    """Named rolling histograms, fed by the wrappers installed below; safe to record from any thread."""
+
+    def __init__(self, enabled: bool = True, dump_path: str = DEFAULT_DUMP_PATH):
+        self.enabled = enabled
+        self.dump_path = dump_path
+        self.histograms: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "Profiler":
+        """Enabled when TIMECALC_PROFILE is set to anything but '' or '0'; a value other than '1' is the dump path."""
+        value = os.environ.get(ENV_VAR, "")
+        if value in ("", "0"):
+            return cls(enabled=False)
+        return cls(dump_path=DEFAULT_DUMP_PATH if value == "1" else value)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = RollingHistogram()
+            histogram.record(seconds)
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Return func timed under name."""
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        return timed
+
+    def instrument(self, obj, method_names: Iterable[str], prefix: str = "app"):
+        """Replace the named methods on one instance with timed versions."""
+        for method_name in method_names:
+            setattr(obj, method_name, self.wrap(f"{prefix}:{method_name}", getattr(obj, method_name)))
+
+    def install_tk(self):
+        """Time every callback Tk dispatches from now on, by swapping tkinter's CallWrapper."""
+        import tkinter
+
+        profiler = self
+        base = getattr(tkinter, "CallWrapper", None)
+        if base is None or getattr(base, "profiler", None) is not None:
+            return
+
+        class TimedCallWrapper(base):
+            def __init__(self, func, subst, widget):
+                super().__init__(func, subst, widget)
+                self.name = "tk:" + callback_name(func)
+
+            def __call__(self, *args):
+                start = time.perf_counter()
+                try:
+                    return super().__call__(*args)
+                finally:
+                    profiler.record(self.name, time.perf_counter() - start)
+
+        TimedCallWrapper.profiler = profiler
+        tkinter.CallWrapper = TimedCallWrapper
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def report_lines(self, limit: int = 15) -> List[str]:
+        """Overlay text: the limit slowest timings by p99, as 'name count p50 p99'."""
+        with self._lock:
+            rows = [(histogram.percentile(0.99), histogram.percentile(0.5), histogram.count, name)
+                    for name, histogram in self.histograms.items()]
+        rows.sort(reverse=True)
+        lines = [f"{'handler':<32}{'n':>7}{'p50 ms':>9}{'p99 ms':>9}"]
+        for p99, p50, count, name in rows[:limit]:
+            lines.append(f"{name[:31]:<32}{count:>7}{p50 * 1e3:>9.2f}{p99 * 1e3:>9.2f}")
+        return lines
+
+    def dump(self, path: Optional[str] = None):
+        """Write the summary of every histogram to a JSON file."""
+        path = path or self.dump_path
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"created": time.time(), "window": WINDOW, "timings": self.summary()}, f, indent=1)
+        except OSError as e:
+            print(f"Failed to write profile {path}: {e}", file=sys.stderr)  # Debug error message
+            return
+        print(f"Profile written to {path}", file=sys.stderr)
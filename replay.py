@@ -0,0 +1,315 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Dict, List, Optional
+
+
+# Record and replay user interaction with TimestampApp, reporting how long the
+# UI takes to settle after each event.
+#
+#   python replay.py record session.jsonl              use the app; actions are saved on close
+#   python replay.py replay session.jsonl -o run.json  replay under Xvfb when there is no display
+#   python replay.py replay session.jsonl --baseline run.json
+#
+# Both modes run the app in a fresh temporary directory, so the bookmark
+# database and settings start empty and a replay sees the same state the
+# recording did. A session is JSON lines of {"delay": seconds since the
+# previous action, "action": [kind, ...]}, where kind is one of:
+#
+#   ["type", "target"|"head"|"tail", text]    entry text after a key release
+#   ["preset", "head"|"tail", name]           head_combo/tail_combo selection
+#   ["click", x, y], ["drag", x, y]           day progress bar
+#   ["calendar", "YYYY-MM-DD"]                calendar pick
+#   ["add"]                                   bookmark the TARGET
+#   ["select", timestamp]                     bookmark list selection
+#   ["star"], ["delete"], ["edit", timestamp] selected bookmark actions
+
+SCREEN = "1280x1024x24"
+
+
+class ReplayError(Exception):
+    pass
+
+
+class Recorder:
+    """Hooks into a TimestampApp's widgets and collects the actions the user performs."""
+
+    def __init__(self, app):
+        self.app = app
+        self.actions: List[dict] = []
+        self.last = time.perf_counter()
+        for name in ("target", "head", "tail"):
+            entry = getattr(app, f"{name}_entry")
+            if entry.get():
+                self.record(["type", name, entry.get()])  # Starting state, since TARGET defaults to today
+            entry.bind("<KeyRelease>", lambda e, name=name, entry=entry: self.record(["type", name, entry.get()]),
+                       add="+")
+        for name in ("head", "tail"):
+            combo = getattr(app, f"{name}_combo")
+            combo.bind("<<ComboboxSelected>>", lambda e, name=name, combo=combo: self.record(
+                ["preset", name, combo.get()]), add="+")
+        app.day_progress_canvas.bind("<Button-1>", lambda e: self.record(["click", e.x, e.y]), add="+")
+        app.day_progress_canvas.bind("<B1-Motion>", lambda e: self.record(["drag", e.x, e.y]), add="+")
+        app.timestamp_listbox.bind("<<ListboxSelect>>", self.record_selection, add="+")
+        self.wrap_command(app.add_button, ["add"])
+        self.wrap_command(app.star_button, ["star"])
+        self.wrap_command(app.delete_button, ["delete"])
+        self.hook_edit()
+        self.hook_calendar()
+
+    def record(self, action: list):
+        now = time.perf_counter()
+        self.actions.append({"delay": round(now - self.last, 4), "action": action})
+        self.last = now
+
+    def record_selection(self, event):
+        selection = self.app.timestamp_listbox.curselection()
+        if selection and selection[0] < len(self.app.model.bookmarks):
+            self.record(["select", self.app.model.bookmarks[selection[0]][0]])
+
+    def wrap_command(self, button, action: list):
+        command = str(button.cget("command"))
+
+        def recorded():
+            self.record(action)
+            self.app.tk.call(command)
+        button.configure(command=recorded)
+
+    def hook_edit(self):
+        """The edit dialog is built on demand, so its result is taken from the store call it makes."""
+        update = self.app.store.update
+
+        def recorded(old_timestamp, new_timestamp, callback=None):
+            self.record(["edit", new_timestamp])
+            return update(old_timestamp, new_timestamp, callback)
+        self.app.store.update = recorded
+
+    def hook_calendar(self):
+        """The calendar is built after the first paint; bind it once it exists."""
+        if self.app.calendar is None:
+            self.app.after(100, self.hook_calendar)
+            return
+        self.app.calendar.bind("<<CalendarSelected>>", lambda e: self.record(
+            ["calendar", self.app.calendar.get_date()]), add="+")
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for entry in self.actions:
+                f.write(json.dumps(entry) + "\n")
+        print(f"Recorded {len(self.actions)} actions to {path}", file=sys.stderr)
+
+
+def load_session(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def perform(app, action: list):
+    """Apply one recorded action through the same widgets and events the user would use."""
+    import tkinter as tk
+
+    kind = action[0]
+    if kind == "type":
+        entry = getattr(app, f"{action[1]}_entry")
+        entry.focus_force()
+        entry.delete(0, tk.END)
+        entry.insert(0, action[2])
+        entry.event_generate("<KeyRelease>")
+    elif kind == "preset":
+        combo = getattr(app, f"{action[1]}_combo")
+        combo.set(action[2])
+        combo.event_generate("<<ComboboxSelected>>")
+    elif kind in ("click", "drag"):
+        sequence = "<Button-1>" if kind == "click" else "<B1-Motion>"
+        app.day_progress_canvas.event_generate(sequence, x=action[1], y=action[2])
+    elif kind == "calendar":
+        year, month, day = (int(part) for part in action[1].split("-"))
+        app.calendar.selection_set(date(year, month, day))
+        app.calendar.event_generate("<<CalendarSelected>>")
+    elif kind == "add":
+        app.add_button.invoke()
+    elif kind == "select":
+        index = app.model.bookmark_index(action[1])
+        if index is None:
+            raise ReplayError(f"bookmark {action[1]} is not in the list")
+        app.timestamp_listbox.selection_clear(0, tk.END)
+        app.timestamp_listbox.selection_set(index)
+        app.timestamp_listbox.event_generate("<<ListboxSelect>>")
+    elif kind == "star":
+        app.star_button.invoke()
+    elif kind == "delete":
+        app.delete_button.invoke()
+    elif kind == "edit":
+        app.edit_button.invoke()
+        dialog = [widget for widget in app.winfo_children() if isinstance(widget, tk.Toplevel)][-1]
+        entry, button = (next(child for child in dialog.winfo_children() if child.winfo_class() == widget_class)
+                         for widget_class in ("TEntry", "TButton"))
+        entry.delete(0, tk.END)
+        entry.insert(0, str(action[1]))
+        button.invoke()
+    else:
+        raise ReplayError(f"unknown action {kind!r}")
+
+
+def settle(app, timeout: float = 10.0):
+    """
+    Run the event loop until the app is idle: no pending Tk events or idle
+    callbacks, no throttled drag waiting and no store operation unfinished.
+
+    Store results are dispatched here directly rather than by the app's 20 ms
+    poll, so the measured latency does not include the polling jitter.
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        app.update()
+        if app.drag_event is None and not app.store.busy():
+            return
+        if time.perf_counter() > deadline:
+            raise ReplayError("the app did not settle")
+        app.store.dispatch()
+        time.sleep(0.0002)
+
+
+def replay(session: List[dict], realtime: bool = False) -> List[dict]:
+    """Replay a session in a fresh app and directory; return one {"index", "action", "ms"} per event."""
+    from ui import TimestampApp
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        app = TimestampApp()
+        try:
+            while app.calendar is None:  # Startup finishes after the first paint
+                app.update()
+            settle(app)
+            events = []
+            for index, entry in enumerate(session):
+                if realtime:
+                    time.sleep(entry["delay"])
+                start = time.perf_counter()
+                perform(app, entry["action"])
+                settle(app)
+                events.append({"index": index, "action": entry["action"],
+                               "ms": round((time.perf_counter() - start) * 1e3, 3)})
+        finally:
+            app.on_close()
+            os.chdir(cwd)
+    return events
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(events: List[dict]) -> Dict[str, dict]:
+    """Per action kind: count and p50/p90/p99/max latency in milliseconds."""
+    by_kind: Dict[str, List[float]] = {}
+    for event in events:
+        by_kind.setdefault(event["action"][0], []).append(event["ms"])
+    by_kind["all"] = [event["ms"] for event in events]
+    summary = {}
+    for kind, values in by_kind.items():
+        ordered = sorted(values)
+        summary[kind] = {"count": len(ordered), "p50": percentile(ordered, 0.5), "p90": percentile(ordered, 0.9),
+                         "p99": percentile(ordered, 0.99), "max": ordered[-1]}
+    return summary
+
+
+def compare(summary: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Return the action kinds whose p50 latency grew by more than threshold times the baseline."""
+    regressions = []
+    for kind, row in sorted(summary.items()):
+        before = baseline.get(kind)
+        if before is None:
+            continue
+        ratio = row["p50"] / before["p50"] if before["p50"] else 1.0
+        marker = "  REGRESSION" if ratio > threshold else ""
+        print(f"{kind:<10}{before['p50']:>10.2f} ms ->{row['p50']:>10.2f} ms  x{ratio:.2f}{marker}")
+        if marker:
+            regressions.append(kind)
+    return regressions
+
+
+def start_xvfb() -> subprocess.Popen:
+    """Start a virtual X server on a free display and point DISPLAY at it."""
+    read_fd, write_fd = os.pipe()
+    try:
+        server = subprocess.Popen(["Xvfb", "-displayfd", str(write_fd), "-screen", "0", SCREEN, "-nolisten", "tcp"],
+                                  pass_fds=(write_fd,), stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        raise ReplayError("no $DISPLAY and Xvfb is not installed (apt install xvfb)") from None
+    finally:
+        os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        display = f.readline().strip()
+    if not display:
+        server.kill()
+        raise ReplayError("Xvfb failed to start")
+    os.environ["DISPLAY"] = f":{display}"
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Record and replay TimestampApp sessions, measuring latency.")
+    parser.add_argument("command", choices=("record", "replay"))
+    parser.add_argument("session", help="session file (JSON lines)")
+    parser.add_argument("--repeat", type=int, default=3, help="replays to run, after one warm-up (default: 3)")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded pauses between actions")
+    parser.add_argument("-o", "--output", help="write per-event latencies and the summary to this JSON file")
+    parser.add_argument("--baseline", help="compare with a JSON file written by -o")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="p50 slowdown ratio reported as a regression (default: 1.25)")
+    args = parser.parse_args(argv)
+
+    xvfb = None
+    try:
+        if args.command == "record":
+            from ui import TimestampApp
+
+            session_path = os.path.abspath(args.session)
+            with tempfile.TemporaryDirectory() as directory:
+                os.chdir(directory)
+                app = TimestampApp()
+                recorder = Recorder(app)
+                app.mainloop()
+            recorder.save(session_path)
+            return 0
+
+        session = load_session(args.session)
+        if not os.environ.get("DISPLAY"):
+            xvfb = start_xvfb()
+        replay(session)  # Warm-up: imports, font and theme caches
+        events = []
+        for run in range(args.repeat):
+            events.extend(dict(event, run=run) for event in replay(session, args.realtime))
+    except (OSError, ReplayError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+
+    summary = summarize(events)
+    print(f"{'action':<10}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind, row in sorted(summary.items()):
+        print(f"{kind:<10}{row['count']:>7}{row['p50']:>10.2f}{row['p90']:>10.2f}{row['p99']:>10.2f}{row['max']:>10.2f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"session": args.session, "repeat": args.repeat, "summary": summary, "events": events}, f,
+                      indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["summary"]
+        if compare(summary, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
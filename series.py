@@ -0,0 +1,187 @@
+import argparse
+import sys
+import time
+from itertools import count as count_from, islice
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from core import INT64_MAX, drop_stdout, format_timestamp, format_timestamp_many
+from model import PRESETS
+from zones import Zone, ZoneInfoNotFoundError, get_zone
+
+
+# Timestamp series: TARGET, TARGET + step, TARGET + 2 * step, ... where the step
+# is a HEAD/TAIL preset (or any number of seconds, negative to go back in
+# time), up to an inclusive bound and/or a number of points.
+#
+#   python series.py 1700000000 --step "28 DAYS" --count 1000000 -o periods.txt
+#   python series.py 1700000000 --step=-DAY --until 1600000000 --dates
+
+CHUNK_POINTS = 65536
+
+
+def parse_step(text: str) -> Optional[int]:
+    """Return the step in seconds for a preset name or an integer, either with an optional leading '-'."""
+    text = text.strip()
+    sign = -1 if text.startswith("-") else 1
+    name = text.lstrip("+-").strip().upper()
+    if name in PRESETS:
+        return sign * PRESETS[name]
+    try:
+        step = int(text)
+    except ValueError:
+        return None
+    return step or None
+
+
+def series_length(start: int, step: int, until: Optional[int] = None, count: Optional[int] = None) -> Optional[int]:
+    """
+    Return the number of points in a series, or None when it is unbounded.
+
+    Args:
+        start: First timestamp
+        step: Nonzero distance between consecutive points in seconds
+        until: Inclusive bound in the direction of step, or None
+        count: Maximum number of points, or None
+    """
+    length = None
+    if until is not None:
+        distance = (until - start) // step  # Floor division works for both directions
+        length = max(0, distance + 1)
+    if count is not None:
+        length = max(0, count) if length is None else min(length, max(0, count))
+    return length
+
+
+def iter_series(start: int, step: int, until: Optional[int] = None, count: Optional[int] = None) -> Iterator[int]:
+    """Lazily yield the points of a series; without until and count it never ends."""
+    length = series_length(start, step, until, count)
+    indexes = count_from() if length is None else range(length)
+    return (start + index * step for index in indexes)
+
+
+def series_array(start: int, step: int, until: Optional[int] = None, count: Optional[int] = None,
+                 offset: int = 0, limit: Optional[int] = None) -> "np.ndarray":
+    """
+    Return points offset to offset + limit of a bounded series as an int64 NumPy array.
+
+    Raises:
+        ValueError: if the series is unbounded
+        OverflowError: if a point does not fit in int64
+    """
+    import numpy as np
+
+    length = series_length(start, step, until, count)
+    if length is None:
+        raise ValueError("an unbounded series cannot be materialized")
+    stop = length if limit is None else min(length, offset + limit)
+    if stop <= offset:
+        return np.empty(0, dtype=np.int64)
+    first, last = start + offset * step, start + (stop - 1) * step
+    if max(abs(first), abs(last)) > INT64_MAX:
+        raise OverflowError("series points do not fit in 64-bit integers")
+    return first + step * np.arange(stop - offset, dtype=np.int64)
+
+
+def preview(start: int, step: int, until: Optional[int] = None, count: Optional[int] = None,
+            size: int = 10) -> Tuple[List[int], List[int], Optional[int]]:
+    """
+    Return (first points, last points, length) for display without generating the series.
+
+    The first and last lists hold up to size points each and do not overlap;
+    last is empty when the series is unbounded or already fully in first.
+    """
+    length = series_length(start, step, until, count)
+    first = list(islice(iter_series(start, step, until, count), size))
+    if length is None or length <= size:
+        return first, [], length
+    tail_start = max(size, length - size)
+    return first, [start + index * step for index in range(tail_start, length)], length
+
+
+def format_chunk(points, dates: bool, zone: Optional[Zone]) -> str:
+    """Format a list (or int64 array, for UTC dates in bulk) of points as output lines."""
+    values = points.tolist() if hasattr(points, "tolist") else points
+    if not dates:
+        return "\n".join(map(str, values)) + "\n"
+    if zone is None and values is not points:
+        texts = format_timestamp_many(points)
+    else:
+        texts = map(format_timestamp if zone is None else zone.format, values)
+    return "".join(f"{point}\t{text}\n" for point, text in zip(values, texts))
+
+
+def write_series(out: TextIO, start: int, step: int, until: Optional[int] = None, count: Optional[int] = None,
+                 dates: bool = False, zone: Optional[Zone] = None, chunk_points: int = CHUNK_POINTS) -> int:
+    """
+    Stream a bounded series to out, one point per line ('timestamp' or 'timestamp<TAB>date').
+
+    Points are generated chunk_points at a time, with NumPy when it is
+    installed, so memory stays flat however long the series is.
+
+    Returns:
+        The number of points written
+    """
+    length = series_length(start, step, until, count)
+    if length is None:
+        raise ValueError("give an end (until) or a count to write a series")
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        numpy = None
+    for offset in range(0, length, chunk_points):
+        limit = min(chunk_points, length - offset)
+        try:
+            if numpy is None:
+                raise OverflowError
+            points = series_array(start, step, until, count, offset, limit)
+        except OverflowError:
+            points = [start + index * step for index in range(offset, offset + limit)]
+        out.write(format_chunk(points, dates, zone))
+    return length
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Write the timestamps from START stepping by a preset.")
+    parser.add_argument("start", type=int, help="first timestamp (POSIX seconds)")
+    parser.add_argument("--step", required=True,
+                        help=f"preset ({', '.join(PRESETS)}) or seconds, with a leading '-' to go back in time")
+    parser.add_argument("--until", type=int, default=None, help="inclusive bound (POSIX seconds)")
+    parser.add_argument("--count", type=int, default=None, help="number of points")
+    parser.add_argument("--dates", action="store_true", help="add the date after each timestamp")
+    parser.add_argument("--zone", default=None, help="time zone for --dates (default: UTC)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    step = parse_step(args.step)
+    if step is None:
+        parser.error(f"invalid step: {args.step}")
+    if args.until is None and args.count is None:
+        parser.error("give --until or --count")
+    zone = None
+    if args.zone is not None:
+        try:
+            zone = get_zone(args.zone)
+        except ZoneInfoNotFoundError:
+            parser.error(f"unknown time zone: {args.zone}")
+
+    start = time.perf_counter()
+    try:
+        if args.output == "-":
+            written = write_series(sys.stdout, args.start, step, args.until, args.count, args.dates, zone)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                written = write_series(f, args.start, step, args.until, args.count, args.dates, zone)
+    except BrokenPipeError:
+        drop_stdout()
+        return 0
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.output != "-":
+        elapsed = time.perf_counter() - start
+        print(f"Wrote {written:,} points in {elapsed:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core import INT64_MAX, INT64_MIN, format_timestamp, format_timestamp_ns, parse_nanoseconds, seconds_to_text, \
+    seconds_to_text_many
+from zones import Zone, ZoneInfoNotFoundError, get_zone
+
+
+# Local conversion service: core's conversions over a Unix domain socket or
+# localhost TCP, one JSON object per line in each direction.
+#
+#   python service.py --socket /tmp/posixtime.sock
+#   python service.py --port 8765
+#
+# Requests (every field but "op" is optional, "id" is echoed back):
+#   {"id": 1, "op": "format_timestamp", "value": 1700000000, "zone": "Europe/Paris"}
+#   {"id": 2, "op": "seconds_to_text", "value": 90061, "format": 0, "from": 1700000000}
+#   {"id": 3, "op": "parse", "value": "1700000000123"}
+#   {"id": 4, "op": "batch", "method": "format_timestamp", "values": [1700000000, ...]}
+#   {"id": 5, "op": "stats"}
+#
+# Responses are {"id": ..., "result": ...} or {"id": ..., "error": "..."}. A
+# client may send any number of requests before reading (pipelining); each
+# connection's responses come back in request order.
+
+DEFAULT_PORT = 8765
+LINE_LIMIT = 64 << 20  # Longest request line, large enough for batches of millions of values
+OFFLOAD_BYTES = 64 << 10  # Request lines this long or longer are answered on a worker thread
+LATENCY_SAMPLES = 10000  # Most recent latencies kept per op for the percentiles
+NUMPY_BATCH_MIN = 256  # Smallest seconds_to_text batch worth handing to seconds_to_text_many
+
+
+def _is_int64(value) -> bool:
+    return type(value) is int and INT64_MIN <= value <= INT64_MAX
+
+
+def _int(request: dict, key: str, default: Optional[int] = None) -> int:
+    value = request.get(key, default)
+    if not _is_int64(value):
+        raise ValueError(f"{key!r} must be a 64-bit integer")
+    return value
+
+
+def _zone(request: dict) -> Optional[Zone]:
+    """Return the zone named in "zone", or None for plain UTC."""
+    if request.get("zone") is None:
+        return None
+    try:
+        return get_zone(str(request["zone"]))
+    except ZoneInfoNotFoundError:
+        raise ValueError(f"unknown time zone: {request['zone']}") from None
+
+
+def _duration_options(request: dict) -> tuple:
+    output_format = _int(request, "format", 0)
+    if not -3 <= output_format <= 3:
+        raise ValueError("'format' must be between -3 and 3")
+    from_timestamp = request.get("from")
+    return output_format, None if from_timestamp is None else _int(request, "from")
+
+
+def _parse(value) -> Optional[int]:
+    """Parse text (or an integer) to nanoseconds as the UI does for TARGET."""
+    return parse_nanoseconds(str(value))
+
+
+def op_format_timestamp(request: dict):
+    """Format "value" in seconds, or "ns" in integer nanoseconds."""
+    zone = _zone(request)
+    if "ns" in request:
+        ns = _int(request, "ns")
+        return format_timestamp_ns(ns) if zone is None else zone.format_ns(ns)
+    value = _int(request, "value")
+    return format_timestamp(value) if zone is None else zone.format(value)
+
+
+def op_seconds_to_text(request: dict):
+    output_format, from_timestamp = _duration_options(request)
+    return seconds_to_text(_int(request, "value"), output_format, from_timestamp)
+
+
+def op_parse(request: dict):
+    return _parse(request.get("value"))
+
+
+def batch_format_timestamp(request: dict, values: List[int]) -> list:
+    zone = _zone(request)
+    formatter = format_timestamp if zone is None else zone.format
+    return [formatter(value) for value in values]
+
+
+def batch_seconds_to_text(request: dict, values: List[int]) -> list:
+    output_format, from_timestamp = _duration_options(request)
+    if len(values) >= NUMPY_BATCH_MIN:
+        try:
+            return seconds_to_text_many(values, output_format, from_timestamp)
+        except ImportError:
+            pass
+    return [seconds_to_text(value, output_format, from_timestamp) for value in values]
+
+
+def batch_parse(request: dict, values: list) -> list:
+    return [_parse(value) for value in values]
+
+
+BATCH_METHODS: Dict[str, Callable[[dict, list], list]] = {
+    "format_timestamp": batch_format_timestamp,
+    "seconds_to_text": batch_seconds_to_text,
+    "parse": batch_parse,
+}
+
+
+def op_batch(request: dict):
+    method = BATCH_METHODS.get(request.get("method"))
+    if method is None:
+        raise ValueError(f"'method' must be one of {', '.join(BATCH_METHODS)}")
+    values = request.get("values")
+    if not isinstance(values, list):
+        raise ValueError("'values' must be a list")
+    if method is not batch_parse and not all(map(_is_int64, values)):
+        raise ValueError("'values' must be 64-bit integers")
+    return method(request, values)
+
+
+class LatencyStats:
+    """Per-op request counts and the latencies of the most recent requests, in seconds."""
+
+    def __init__(self, samples: int = LATENCY_SAMPLES):
+        self.samples = samples
+        self.counts: Dict[str, int] = {}
+        self.latencies: Dict[str, deque] = {}
+
+    def record(self, op: str, seconds: float):
+        self.counts[op] = self.counts.get(op, 0) + 1
+        if op not in self.latencies:
+            self.latencies[op] = deque(maxlen=self.samples)
+        self.latencies[op].append(seconds)
+
+    def summary(self) -> Dict[str, dict]:
+        """Return {op: {"count", "p50_us", "p90_us", "p99_us", "max_us"}} over the kept samples."""
+        result = {}
+        for op, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            result[op] = {"count": self.counts[op]}
+            for name, quantile in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+                result[op][f"{name}_us"] = round(ordered[int(quantile * (len(ordered) - 1))] * 1e6, 1)
+            result[op]["max_us"] = round(ordered[-1] * 1e6, 1)
+        return result
+
+    def report(self) -> str:
+        lines = [f"{'op':<18}{'count':>10}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}{'max us':>10}"]
+        for op, row in sorted(self.summary().items()):
+            lines.append(f"{op:<18}{row['count']:>10}{row['p50_us']:>10}{row['p90_us']:>10}"
+                         f"{row['p99_us']:>10}{row['max_us']:>10}")
+        return "\n".join(lines)
+
+
+class ConversionService:
+    """
+    The request dispatcher and its asyncio connection handler.
+
+    Each connection is served by one coroutine that reads request lines as
+    they arrive and writes each response as soon as it is computed, so
+    pipelined requests are answered without a round trip per request. A
+    request's latency runs from reading its line to queueing its response.
+    Long lines (big batches) are answered on the loop's default executor,
+    so one large conversion does not hold up the other connections.
+    """
+
+    def __init__(self):
+        self.stats = LatencyStats()
+        self.ops: Dict[str, Callable[[dict], object]] = {
+            "format_timestamp": op_format_timestamp,
+            "seconds_to_text": op_seconds_to_text,
+            "parse": op_parse,
+            "batch": op_batch,
+            "stats": lambda request: self.stats.summary(),
+        }
+
+    def handle_line(self, line: bytes) -> bytes:
+        """Answer one request line with one response line."""
+        start = time.perf_counter()
+        op, data = self.answer(line)
+        self.stats.record(op, time.perf_counter() - start)
+        return data
+
+    def answer(self, line: bytes) -> Tuple[str, bytes]:
+        """Return (op name for the stats, response line) for one request line; safe to run on any thread."""
+        request_id = op = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id, op = request.get("id"), request.get("op")
+            handler = self.ops.get(op)
+            if handler is None:
+                raise ValueError(f"unknown op: {op!r}")
+            response = {"id": request_id, "result": handler(request)}
+        except (ValueError, TypeError, KeyError) as e:
+            response = {"id": request_id, "error": str(e)}
+        except Exception as e:
+            # Answer anything else too; letting it escape would drop the connection and its pipeline
+            response = {"id": request_id, "error": f"internal error: {type(e).__name__}: {e}"}
+        return op if op in self.ops else "invalid", json.dumps(response, separators=(",", ":")).encode() + b"\n"
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than LINE_LIMIT; the stream cannot be resynchronised, so drop the client
+                    writer.write(b'{"id":null,"error":"request line too long"}\n')
+                    break
+                if not line:
+                    break
+                if len(line) >= OFFLOAD_BYTES:
+                    start = time.perf_counter()
+                    op, data = await asyncio.get_running_loop().run_in_executor(None, self.answer, line)
+                    self.stats.record(op, time.perf_counter() - start)  # Stats stay on the loop thread
+                    writer.write(data)
+                elif line.strip():
+                    writer.write(self.handle_line(line))
+                await writer.drain()  # Only waits when the client is not reading its responses
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client went away, or the server is shutting down
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+
+def _remove_stale_socket(socket_path: str):
+    """
+    Remove a socket left behind by a server that did not shut down cleanly.
+
+    Raises:
+        OSError: if the path is not a socket, or a server is still listening on it
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise OSError(f"{socket_path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"another server is listening on {socket_path}")
+
+
+async def serve(service: ConversionService, socket_path: Optional[str] = None, port: int = DEFAULT_PORT,
+                report_interval: float = 0.0):
+    """Serve until cancelled, on socket_path if given, otherwise on 127.0.0.1:port."""
+    if socket_path is not None:
+        _remove_stale_socket(socket_path)
+        server = await asyncio.start_unix_server(service.handle_connection, path=socket_path, limit=LINE_LIMIT)
+        os.chmod(socket_path, 0o600)
+        where = socket_path
+    else:
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", port, limit=LINE_LIMIT)
+        where = f"127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    print(f"Serving conversions on {where}", file=sys.stderr)
+    try:
+        async with server:
+            if report_interval > 0:
+                while True:
+                    await asyncio.sleep(report_interval)
+                    print(service.stats.report(), file=sys.stderr)
+            else:
+                await server.serve_forever()
+    finally:
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class Client:
+    """
+    Minimal blocking client for scripts.
+
+    call() sends one request and waits for its response; call_many() writes
+    all its requests before reading any response, so a whole list costs one
+    round trip. Both return results and raise ValueError for the first error
+    response, after all the responses to the call have been read.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, port: int = DEFAULT_PORT):
+        if socket_path is not None:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(socket_path)
+        else:
+            self.sock = socket.create_connection(("127.0.0.1", port))
+        self.file = self.sock.makefile("rwb")
+        self.next_id = 0
+
+    def call_many(self, requests: Iterable[dict]) -> list:
+        count = 0
+        for request in requests:
+            self.next_id += 1
+            self.file.write(json.dumps({"id": self.next_id, **request}).encode() + b"\n")
+            count += 1
+        self.file.flush()
+        # Read every response before raising, so none is left on the connection for the next call
+        responses = [json.loads(self.file.readline()) for _ in range(count)]
+        for response in responses:
+            if "error" in response:
+                raise ValueError(response["error"])
+        return [response["result"] for response in responses]
+
+    def call(self, op: str, **fields):
+        return self.call_many([{"op": op, **fields}])[0]
+
+    def batch(self, method: str, values: list, **fields) -> list:
+        return self.call("batch", method=method, values=values, **fields)
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve timestamp conversions as line-delimited JSON.")
+    where = parser.add_mutually_exclusive_group()
+    where.add_argument("--socket", dest="socket_path", default=None, help="listen on this Unix domain socket")
+    where.add_argument("--port", type=int, default=DEFAULT_PORT,
+                       help="listen on 127.0.0.1 at this TCP port (default: %(default)s)")
+    parser.add_argument("--report", type=float, default=0.0, metavar="SECONDS",
+                        help="print latency percentiles to stderr at this interval")
+    args = parser.parse_args(argv)
+
+    service = ConversionService()
+
+    async def run():
+        # Stop on SIGINT/SIGTERM by cancelling; asyncio.run then cancels the open connections too
+        task = asyncio.current_task()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            asyncio.get_running_loop().add_signal_handler(signum, task.cancel)
+        await serve(service, args.socket_path, args.port, args.report)
+
+    try:
+        asyncio.run(run())
+    except asyncio.CancelledError:
+        pass
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(service.stats.report(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from bisect import bisect_right
+from concurrent.futures import Future
+from itertools import accumulate
+from typing import Callable, List, Optional, Tuple
+
+from civil import SECONDS_PER_DAY
+from core import INT64_MAX, INT64_MIN, warn
+
+
+POSITION_BLOCK = 1024  # Bookmarks per block of the position index, see PositionIndex
+
+# Schema migrations, applied in order; PRAGMA user_version records how many have run.
+MIGRATIONS = [
+    # 1: original schema
+    ("""CREATE TABLE IF NOT EXISTS timestamps (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp INTEGER UNIQUE, starred BOOLEAN DEFAULT 0)""",
+     """CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)"""),
+    # 2: starred bookmarks newest first (range queries on timestamp use its UNIQUE index)
+    ("""CREATE INDEX IF NOT EXISTS idx_timestamps_starred_id ON timestamps (starred, id)""",),
+]
+
+
+class PositionIndex:
+    """
+    Positions of bookmarks in timestamp order, so that jumping to a row or
+    counting a range never walks all the rows before it.
+
+    The timestamp range is cut into blocks at boundary keys, each with a
+    count of its bookmarks. A timestamp's position is the sum of the counts
+    before its block plus a walk of at most one block, and the row at a
+    position is found the same way. The index is built with one pass over
+    the timestamp index on first use, then kept in step by the store's
+    add, update and delete, which report what they moved. Any other write
+    (an import, say) shows up as an unreported change in the connection's
+    total_changes and drops the index, to be rebuilt when next needed. A
+    block grown past twice the block size is split the next time the index
+    is used. Only the store's worker thread may touch it.
+    """
+
+    def __init__(self, block_size: int = POSITION_BLOCK):
+        self.block_size = block_size
+        self.bounds: Optional[List[int]] = None  # Smallest timestamp of each block; None until built
+        self.counts: List[int] = []
+        self._starts: Optional[List[int]] = None  # Position of each block's first row, and the total
+        self._split_needed = False
+        self.changes = 0  # The connection's total_changes the index accounts for
+
+    def reset(self):
+        """Forget the index; the next use rebuilds it."""
+        self.bounds = None
+
+    def moved(self, conn: sqlite3.Connection, old: Optional[int], new: Optional[int]):
+        """Record a bookmark removed from old and/or inserted at new, as the connection's latest change."""
+        if self.bounds is not None:
+            if old is not None:
+                self.counts[bisect_right(self.bounds, old) - 1] -= 1
+            if new is not None:
+                block = bisect_right(self.bounds, new) - 1
+                self.counts[block] += 1
+                self._split_needed = self._split_needed or self.counts[block] > 2 * self.block_size
+            self._starts = None
+        self.settled(conn)
+
+    def settled(self, conn: sqlite3.Connection):
+        """Record that the connection's changes so far moved no bookmark (or were reported to moved())."""
+        self.changes = conn.total_changes
+
+    def sync(self, conn: sqlite3.Connection):
+        """Drop the index if the connection changed rows that were not reported."""
+        if conn.total_changes != self.changes:
+            self.reset()
+            self.changes = conn.total_changes
+
+    def _ready(self, conn: sqlite3.Connection) -> List[int]:
+        if self.bounds is None:
+            self._build(conn)
+        elif self._split_needed:
+            self._split(conn)
+        if self._starts is None:
+            self._starts = list(accumulate(self.counts, initial=0))
+        return self._starts
+
+    def _build(self, conn: sqlite3.Connection):
+        # Each step skips block_size rows inside SQLite, so the pass costs one walk of the index
+        bounds, counts, key = [INT64_MIN], [], INT64_MIN
+        while True:
+            row = conn.execute("SELECT timestamp FROM timestamps WHERE timestamp >= ? ORDER BY timestamp "
+                               "LIMIT 1 OFFSET ?", (key, self.block_size)).fetchone()
+            if row is None:
+                break
+            key = row[0]
+            bounds.append(key)
+            counts.append(self.block_size)
+        counts.append(conn.execute("SELECT COUNT(*) FROM timestamps WHERE timestamp >= ?", (key,)).fetchone()[0])
+        self.bounds, self.counts, self._starts, self._split_needed = bounds, counts, None, False
+
+    def _split(self, conn: sqlite3.Connection):
+        block = 0
+        while block < len(self.counts):
+            count = self.counts[block]
+            if count > 2 * self.block_size:
+                middle = conn.execute("SELECT timestamp FROM timestamps WHERE timestamp >= ? ORDER BY timestamp "
+                                      "LIMIT 1 OFFSET ?", (self.bounds[block], count // 2)).fetchone()[0]
+                self.bounds.insert(block + 1, middle)
+                self.counts[block:block + 1] = [count // 2, count - count // 2]
+            else:
+                block += 1
+        self._starts, self._split_needed = None, False
+
+    def total(self, conn: sqlite3.Connection) -> int:
+        """Return the number of bookmarks."""
+        return self._ready(conn)[-1]
+
+    def position(self, conn: sqlite3.Connection, timestamp: int, inclusive: bool = False) -> int:
+        """Return the number of bookmarks before timestamp (or up to and including it, when inclusive)."""
+        starts = self._ready(conn)
+        block = bisect_right(self.bounds, timestamp) - 1
+        within = conn.execute(f"SELECT COUNT(*) FROM timestamps WHERE timestamp >= ? AND timestamp "
+                              f"{'<=' if inclusive else '<'} ?", (self.bounds[block], timestamp)).fetchone()[0]
+        return starts[block] + within
+
+    def locate(self, conn: sqlite3.Connection, offset: int) -> Tuple[int, int]:
+        """Return (key, skip): the row at offset is the skip-th bookmark (from 0) at or after key."""
+        starts = self._ready(conn)
+        offset = max(offset, 0)
+        block = min(bisect_right(starts, offset), len(self.counts)) - 1
+        return self.bounds[block], offset - starts[block]
+
+
+class BookmarkStore:
+    """
+    SQLite storage for bookmarks and settings, run on a dedicated worker thread.
+
+    The worker owns the connection, keeps the database in WAL mode and runs
+    every operation queued within a short window in a single transaction, so a
+    burst of edits costs one commit. Each operation is a function taking the
+    connection; its result is returned through a Future and, when a callback
+    is given, handed back to the owning thread by dispatch() (the UI calls it
+    from an after() loop), so no commit ever runs on the Tk main thread. An
+    errback is handed a failed operation's exception the same way.
+
+    With a profiler, each operation's run time on the worker is recorded as
+    "db:<operation>", the time from submit() to its result as "db:latency"
+    and every commit as "db:commit".
+
+    Jumps to a position (page_at) and range counts (bookmarks_between) go
+    through a PositionIndex, so their cost does not grow with the position
+    or the size of the range.
+    """
+
+    def __init__(self, path: str = "timestamps.db", batch_window: float = 0.01, profiler=None):
+        self.path = path
+        self.batch_window = batch_window
+        self.profiler = profiler
+        self._ops = queue.Queue()
+        self._results = queue.Queue()
+        self._positions = PositionIndex()  # Worker side only
+        self._thread = threading.Thread(target=self._run, name="BookmarkStore", daemon=True)
+        self._thread.start()
+        self.submit(self._migrate)
+
+    # Worker side
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        running = True
+        while running:
+            batch = [self._ops.get()]
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                try:
+                    batch.append(self._ops.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            size = len(batch)
+            if None in batch:
+                running = False
+                batch = [op for op in batch if op is not None]
+            self._run_batch(conn, batch)
+            for _ in range(size):
+                self._ops.task_done()  # Only now, so busy() stays True until the results are queued
+        conn.close()
+
+    def _run_batch(self, conn: sqlite3.Connection,
+                   batch: List[Tuple[Callable, Future, Optional[Callable], Optional[Callable], float]]):
+        if not batch:
+            return
+        profiler = self.profiler
+        conn.execute("BEGIN")
+        for func, future, callback, errback, submitted in batch:
+            # A savepoint per operation keeps one failure from undoing the rest of the batch
+            conn.execute("SAVEPOINT op")
+            changes = conn.total_changes
+            start = time.perf_counter()
+            try:
+                result = func(conn)
+            except Exception as e:
+                conn.execute("ROLLBACK TO op")
+                conn.execute("RELEASE op")
+                if conn.total_changes != changes:
+                    self._positions.reset()  # It may count changes the rollback undid
+                self._positions.sync(conn)
+                future.set_exception(e)
+                if profiler is not None:
+                    self._record(func, start, submitted)
+                warn(f"Bookmark store operation failed: {e}")  # Debug error message
+                if errback is not None:
+                    self._results.put((errback, e))
+                continue
+            conn.execute("RELEASE op")
+            self._positions.sync(conn)
+            if profiler is not None:
+                self._record(func, start, submitted)
+            future.set_result(result)
+            if callback is not None:
+                self._results.put((callback, result))
+        start = time.perf_counter()
+        conn.execute("COMMIT")
+        if profiler is not None:
+            profiler.record("db:commit", time.perf_counter() - start)
+
+    def _record(self, func: Callable, start: float, submitted: float):
+        now = time.perf_counter()
+        # "BookmarkStore.page_at.<locals>.<lambda>" is recorded as "db:page_at"
+        name = getattr(func, "__qualname__", type(func).__name__).split(".<locals>")[0].rsplit(".", 1)[-1]
+        self.profiler.record(f"db:{name}", now - start)
+        self.profiler.record("db:latency", now - submitted)
+
+    # Caller side
+
+    def submit(self, func: Callable[[sqlite3.Connection], object], callback: Optional[Callable] = None,
+               errback: Optional[Callable] = None) -> Future:
+        """Queue func(connection) on the worker; callback(result) or errback(exception) is later run by dispatch()."""
+        future = Future()
+        self._ops.put((func, future, callback, errback, time.perf_counter()))
+        return future
+
+    def dispatch(self, limit: int = 100, report: Optional[Callable] = None):
+        """
+        Run up to limit pending result callbacks on the calling thread.
+
+        A callback that raises does not stop the ones after it: the exception
+        goes to report(type, value, traceback), the signature of Tk's
+        report_callback_exception, or else is printed to stderr.
+        """
+        for _ in range(limit):
+            try:
+                callback, result = self._results.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback(result)
+            except Exception:
+                if report is not None:
+                    report(*sys.exc_info())
+                else:
+                    warn(traceback.format_exc().rstrip())  # Debug error message
+
+    def busy(self) -> bool:
+        """Return True while submitted operations are unfinished or results are waiting for dispatch()."""
+        return self._ops.unfinished_tasks > 0 or not self._results.empty()
+
+    def close(self):
+        """Flush pending operations and stop the worker."""
+        self._ops.put(None)
+        self._thread.join()
+        self.dispatch(limit=self._results.qsize())
+
+    # Operations
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+
+    def get_setting(self, key: str, default: Optional[str] = None, callback: Optional[Callable] = None) -> Future:
+        def get(conn):
+            row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else default
+        return self.submit(get, callback)
+
+    def set_setting(self, key: str, value: str, callback: Optional[Callable] = None) -> Future:
+        def set_setting(conn):
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+            self._positions.settled(conn)
+        return self.submit(set_setting, callback)
+
+    def count_bookmarks(self, callback: Optional[Callable] = None) -> Future:
+        return self.submit(lambda conn: self._positions.total(conn), callback)
+
+    # Pages of (timestamp, starred) rows in timestamp order. page_after and page_before walk the
+    # UNIQUE index on timestamp from a known key (keyset pagination); page_at jumps to a position,
+    # starting from the nearest block boundary of the position index rather than the first row.
+
+    def page_at(self, offset: int, limit: int, callback: Optional[Callable] = None) -> Future:
+        def page_at(conn):
+            key, skip = self._positions.locate(conn, offset)
+            return [(ts, bool(starred)) for ts, starred in conn.execute(
+                "SELECT timestamp, starred FROM timestamps WHERE timestamp >= ? ORDER BY timestamp LIMIT ? OFFSET ?",
+                (key, limit, skip))]
+        return self.submit(page_at, callback)
+
+    def page_after(self, timestamp: int, limit: int, callback: Optional[Callable] = None) -> Future:
+        return self.submit(lambda conn: [(ts, bool(starred)) for ts, starred in conn.execute(
+            "SELECT timestamp, starred FROM timestamps WHERE timestamp > ? ORDER BY timestamp LIMIT ?",
+            (timestamp, limit))], callback)
+
+    def page_before(self, timestamp: int, limit: int, callback: Optional[Callable] = None) -> Future:
+        return self.submit(lambda conn: [(ts, bool(starred)) for ts, starred in conn.execute(
+            "SELECT timestamp, starred FROM timestamps WHERE timestamp < ? ORDER BY timestamp DESC LIMIT ?",
+            (timestamp, limit))][::-1], callback)
+
+    def bookmarks_between(self, start: int, end: int, limit: int = 100, callback: Optional[Callable] = None,
+                          errback: Optional[Callable] = None) -> Future:
+        """
+        Return (count, rows) for bookmarks with start <= timestamp <= end, rows capped at limit.
+
+        The bounds may lie outside the 64-bit range bookmarks are stored in.
+        """
+        start, end = max(start, INT64_MIN), min(end, INT64_MAX)
+
+        def between(conn):
+            if start > end:
+                return 0, []
+            # Two positions rather than a COUNT(*) over every row in the range
+            positions = self._positions
+            count = max(0, positions.position(conn, end, inclusive=True) - positions.position(conn, start))
+            rows = [(ts, bool(starred)) for ts, starred in conn.execute(
+                "SELECT timestamp, starred FROM timestamps WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp LIMIT ?",
+                (start, end, limit))]
+            return count, rows
+        return self.submit(between, callback, errback)
+
+    def nearest_bookmarks(self, timestamp: int, count: int, callback: Optional[Callable] = None,
+                          errback: Optional[Callable] = None) -> Future:
+        """Return the count bookmarks closest to timestamp, nearest first; timestamp may lie outside 64 bits."""
+        timestamp = min(max(timestamp, INT64_MIN), INT64_MAX)  # All bookmarks lie inside, so their order by distance is kept
+
+        def nearest(conn):
+            after = conn.execute(
+                "SELECT timestamp, starred FROM timestamps WHERE timestamp >= ? ORDER BY timestamp LIMIT ?",
+                (timestamp, count)).fetchall()
+            before = conn.execute(
+                "SELECT timestamp, starred FROM timestamps WHERE timestamp < ? ORDER BY timestamp DESC LIMIT ?",
+                (timestamp, count)).fetchall()
+            rows = sorted(after + before, key=lambda row: abs(row[0] - timestamp))[:count]
+            return [(ts, bool(starred)) for ts, starred in rows]
+        return self.submit(nearest, callback, errback)
+
+    def starred_bookmarks(self, limit: int, callback: Optional[Callable] = None) -> Future:
+        """Return up to limit starred timestamps, most recently added first."""
+        return self.submit(lambda conn: [ts for ts, in conn.execute(
+            "SELECT timestamp FROM timestamps WHERE starred = 1 ORDER BY id DESC LIMIT ?", (limit,))], callback)
+
+    def day_counts(self, start: int, end: int, callback: Optional[Callable] = None) -> Future:
+        """
+        Return {day number: bookmark count} for the days between start and end with any bookmarks.
+
+        start must be the first second of a day; the whole range is one
+        GROUP BY over the timestamp index. Offsetting by start keeps the
+        integer division non-negative, so it floors for dates before 1970 too.
+        """
+        first_day = start // SECONDS_PER_DAY
+        return self.submit(lambda conn: {first_day + offset: count for offset, count in conn.execute(
+            "SELECT (timestamp - ?) / ? AS day, COUNT(*) FROM timestamps WHERE timestamp BETWEEN ? AND ? "
+            "GROUP BY day", (start, SECONDS_PER_DAY, start, end))}, callback)
+
+    def add(self, timestamp: int, callback: Optional[Callable] = None) -> Future:
+        """Insert a bookmark; the result is False if it already exists."""
+        def add(conn):
+            try:
+                conn.execute("INSERT INTO timestamps (timestamp) VALUES (?)", (timestamp,))
+            except sqlite3.IntegrityError:
+                return False
+            self._positions.moved(conn, None, timestamp)
+            return True  # No output here: a print that fails would roll the insert back
+        return self.submit(add, callback)
+
+    def toggle_star(self, timestamp: int, callback: Optional[Callable] = None) -> Future:
+        def toggle_star(conn):
+            toggled = conn.execute("UPDATE timestamps SET starred = NOT starred WHERE timestamp = ?",
+                                   (timestamp,)).rowcount > 0
+            self._positions.settled(conn)
+            return toggled
+        return self.submit(toggle_star, callback)
+
+    def update(self, old_timestamp: int, new_timestamp: int, callback: Optional[Callable] = None) -> Future:
+        """Change a bookmark's value; the result is False if the new value is already bookmarked."""
+        def update(conn):
+            try:
+                updated = conn.execute("UPDATE timestamps SET timestamp = ? WHERE timestamp = ?",
+                                       (new_timestamp, old_timestamp)).rowcount > 0
+            except sqlite3.IntegrityError:
+                return False
+            if updated:
+                self._positions.moved(conn, old_timestamp, new_timestamp)
+            return updated
+        return self.submit(update, callback)
+
+    def delete(self, timestamp: int, callback: Optional[Callable] = None) -> Future:
+        def delete(conn):
+            deleted = conn.execute("DELETE FROM timestamps WHERE timestamp = ?", (timestamp,)).rowcount > 0
+            if deleted:
+                self._positions.moved(conn, timestamp, None)
+            return deleted
+        return self.submit(delete, callback)
@@ -0,0 +1,33 @@
+import io
+
+from bookmark_io import export_file, import_file, main, read_rows
+from store import BookmarkStore
+
+
+def test_read_rows_skips_bad_lines(capsys):
+    text = "timestamp,starred\n1,1\n\nabc\n99999999999999999999999\n-9223372036854775808,0\n2\n"
+    assert list(read_rows(io.StringIO(text), "csv")) == [(1, True), (-2 ** 63, False), (2, False)]
+    errors = capsys.readouterr().err
+    assert "line 4" in errors and "line 5" in errors
+
+
+def test_read_rows_jsonl(capsys):
+    text = '{"timestamp": 5, "starred": true}\n{"timestamp": 1e30}\n{"starred": 1}\n{"timestamp": "6"}\n'
+    assert list(read_rows(io.StringIO(text), "jsonl")) == [(5, True), (6, False)]
+    assert "64 bits" in capsys.readouterr().err
+
+
+def test_import_skips_out_of_range_rows(tmp_path):
+    source = tmp_path / "bookmarks.csv"
+    source.write_text("1700000000\n99999999999999999999999\n1700000001,1\n1700000000\n")
+    assert main(["import", str(source), "--db", str(tmp_path / "timestamps.db")]) == 0
+    store = BookmarkStore(str(tmp_path / "timestamps.db"))
+    try:
+        assert store.page_at(0, 10).result() == [(1700000000, False), (1700000001, True)]
+        exported = tmp_path / "out.jsonl"
+        assert export_file(store, str(exported)).result()[0] == 2
+        assert list(read_rows(exported.open(), "jsonl")) == [(1700000000, False), (1700000001, True)]
+        read, inserted, _ = import_file(store, str(exported)).result()
+        assert (read, inserted) == (2, 0)
+    finally:
+        store.close()
@@ -0,0 +1,90 @@
+import calendar
+import random
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from civil import (SECONDS_PER_DAY, add_months, calendar_span, civil_from_days, day_bounds, day_of_year,
+                   days_from_civil, days_in_month, weekday)
+
+EPOCH = date(1970, 1, 1)
+FIRST_DAY = (date.min - EPOCH).days
+LAST_DAY = (date.max - EPOCH).days
+EDGE_DAYS = [FIRST_DAY, FIRST_DAY + 1, -141428, -1, 0, 1, 11016, 11017, 11077, 11078, 2932896, LAST_DAY]
+
+
+def sample_days(count=5000, seed=0):
+    rng = random.Random(seed)
+    return EDGE_DAYS + [rng.randint(FIRST_DAY, LAST_DAY) for _ in range(count)]
+
+
+def test_days_match_datetime():
+    for days in sample_days():
+        expected = EPOCH + timedelta(days=days)
+        assert civil_from_days(days) == (expected.year, expected.month, expected.day)
+        assert days_from_civil(expected.year, expected.month, expected.day) == days
+        assert weekday(days) == expected.weekday()
+        assert day_of_year(days) == expected.timetuple().tm_yday
+        assert days_in_month(expected.year, expected.month) == calendar.monthrange(expected.year, expected.month)[1]
+
+
+def test_arrays_match_scalars():
+    days = np.array(sample_days(), dtype=np.int64)
+    years, months, month_days = civil_from_days(days)
+    assert list(zip(years.tolist(), months.tolist(), month_days.tolist())) == [civil_from_days(d)
+                                                                               for d in days.tolist()]
+    assert days_from_civil(years, months, month_days).tolist() == days.tolist()
+    assert weekday(days).tolist() == [weekday(d) for d in days.tolist()]
+    assert day_of_year(days).tolist() == [day_of_year(d) for d in days.tolist()]
+
+
+def test_beyond_datetime_years_round_trip():
+    assert civil_from_days(-719468) == (0, 3, 1)  # Start of the algorithm's era 0, before date.min
+    for year in (-10 ** 9, -4713, 0, 10000, 292277026596):
+        for month, day in ((1, 1), (2, 28), (2, 29), (12, 31)):
+            if day > days_in_month(year, month):
+                continue
+            assert civil_from_days(days_from_civil(year, month, day)) == (year, month, day)
+    assert days_in_month(0, 2) == 29 and days_in_month(-100, 2) == 28 and days_in_month(-400, 2) == 29
+
+
+@pytest.mark.parametrize("timestamp", [-62135596800, -86401, -86400, -1, 0, 1, 86399, 86400, 1709164799,
+                                       253402300799])
+def test_day_bounds(timestamp):
+    start = datetime.fromtimestamp(timestamp, timezone.utc).replace(hour=0, minute=0, second=0)
+    assert day_bounds(timestamp) == (int(start.timestamp()), int(start.timestamp()) + SECONDS_PER_DAY - 1)
+
+
+def reference_add_months(timestamp, months):
+    moment = datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=timestamp)
+    index = moment.year * 12 + moment.month - 1 + months
+    year, month = divmod(index, 12)
+    day = min(moment.day, calendar.monthrange(year, month + 1)[1])
+    return int((moment.replace(year=year, month=month + 1, day=day) - datetime(1970, 1, 1, tzinfo=timezone.utc))
+               .total_seconds())
+
+
+def test_add_months_matches_datetime():
+    rng = random.Random(1)
+    low, high = -59000000000, 250000000000  # Years 100 to 9892, so datetime can follow 50 years either way
+    cases = [(int(datetime(2024, 1, 31, 12, tzinfo=timezone.utc).timestamp()), 1),
+             (int(datetime(2023, 3, 31, tzinfo=timezone.utc).timestamp()), -1),
+             (int(datetime(2024, 2, 29, 23, 59, 59, tzinfo=timezone.utc).timestamp()), 12)]
+    cases += [(rng.randint(low, high), rng.randint(-600, 600)) for _ in range(3000)]
+    for timestamp, months in cases:
+        assert add_months(timestamp, months) == reference_add_months(timestamp, months), (timestamp, months)
+
+
+def test_calendar_span_lands_on_the_end():
+    rng = random.Random(2)
+    for _ in range(3000):
+        anchor = rng.randint(-62000000000, 250000000000)
+        seconds = rng.choice([0, 1, 86399, 86400, rng.randint(0, 40 * SECONDS_PER_DAY), rng.randint(0, 2 * 10 ** 9)])
+        years, months, days, rest = calendar_span(anchor, seconds)
+        assert 0 <= months < 12 and days >= 0 and 0 <= rest < SECONDS_PER_DAY
+        moved = add_months(anchor, years * 12 + months)
+        assert moved <= anchor + seconds < add_months(anchor, years * 12 + months + 1)
+        assert moved + days * SECONDS_PER_DAY + rest == anchor + seconds
+    assert calendar_span(int(datetime(2024, 1, 31, tzinfo=timezone.utc).timestamp()), 29 * SECONDS_PER_DAY) == \
+        (0, 1, 0, 0)  # January 31st plus one month is clamped to February 29th
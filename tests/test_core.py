@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from core import (INT64_MAX, INT64_MIN, format_nanoseconds, format_timestamp, format_timestamp_many,
+                  parse_nanoseconds, seconds_to_components_many, seconds_to_text, seconds_to_text_many)
+
+np = pytest.importorskip("numpy")
+
+ANCHORS = (1700000000, 0, -86400 * 365 * 3000, 951782400, 10 ** 15)
+EXTREMES = [INT64_MIN, INT64_MIN + 1, INT64_MAX, INT64_MAX - 1, INT64_MAX - 32 * 86400 - 1700000000,
+            INT64_MAX - 32 * 86400 - 1700000000 + 1, 1, -1, 0, 59, 86399, 86400, 31 * 86400, 10 ** 18, -10 ** 18]
+
+
+def sample(seed, count=300):
+    rng = random.Random(seed)
+    return [rng.choice((rng.randint(-10 ** 6, 10 ** 6), rng.randint(-10 ** 10, 10 ** 10),
+                        rng.randint(-10 ** 17, 10 ** 17))) for _ in range(count)]
+
+
+@pytest.mark.parametrize("output_format", range(-3, 4))
+@pytest.mark.parametrize("anchor", ANCHORS)
+def test_seconds_to_text_many_matches_scalar(output_format, anchor):
+    values = EXTREMES + sample(output_format * 31 + anchor)
+    expected = [seconds_to_text(value, output_format, anchor) for value in values]
+    assert seconds_to_text_many(values, output_format, anchor) == expected
+    assert seconds_to_text_many(np.array(values, dtype=np.int64), output_format, anchor) == expected
+
+
+@pytest.mark.parametrize("output_format", (0, -2))
+def test_seconds_to_text_many_beyond_int64(output_format):
+    values = [2 ** 70, -2 ** 64, 5]
+    assert seconds_to_text_many(values, output_format, 1700000000) == [
+        seconds_to_text(value, output_format, 1700000000) for value in values]
+    far_anchor = INT64_MAX - 10
+    assert seconds_to_text_many([1, 2], output_format, far_anchor) == [
+        seconds_to_text(value, output_format, far_anchor) for value in (1, 2)]
+
+
+def test_components_refuse_what_they_cannot_compute():
+    with pytest.raises(OverflowError):
+        seconds_to_components_many([INT64_MIN + 1], 1700000000)
+    parts = seconds_to_components_many([-90061], 1700000000)
+    assert (parts["negative"][0], parts["days"][0], parts["hours"][0], parts["secs"][0]) == (True, 1, 1, 1)
+
+
+def test_format_timestamp_many_matches_scalar():
+    values = [0, -1, 86399, 951782400, -62135596800, 253402300799, 10 ** 15, -10 ** 15] + sample(7)
+    assert format_timestamp_many(values) == [format_timestamp(value) for value in values]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1700000000", 1700000000 * 10 ** 9),
+    ("1700000000123", 1700000000123 * 10 ** 6),
+    ("1700000000.5", 1700000000500000000),
+    ("-1.5s", -1500000000),
+    ("250ms", 250000000),
+    ("", None),
+    ("abc", None),
+])
+def test_parse_nanoseconds(text, expected):
+    assert parse_nanoseconds(text) == expected
+
+
+@pytest.mark.parametrize("seconds", [0, 1, -1, 99999999999, 100000000000, -100000000000, 253402300799,
+                                     10 ** 15, INT64_MAX, INT64_MIN])
+def test_entry_text_round_trips_through_unit_detection(seconds):
+    for ns in (seconds * 10 ** 9, seconds * 10 ** 9 + 250000000):
+        assert parse_nanoseconds(format_nanoseconds(ns, detect=True)) == ns
+    assert format_nanoseconds(99999999999 * 10 ** 9, detect=True) == "99999999999"
+    assert format_nanoseconds(100000000000 * 10 ** 9, detect=True) == "100000000000s"
+    assert format_nanoseconds(100000000000 * 10 ** 9) == "100000000000"
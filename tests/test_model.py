@@ -0,0 +1,111 @@
+import random
+from bisect import bisect_left
+
+import pytest
+
+from model import TimestampModel
+
+
+class FakeView:
+    """Mirrors the bookmark side of TimestampApp: a sorted table and the refill rule of on_bookmarks_changed."""
+
+    def __init__(self, stored, window=5):
+        self.stored = sorted(stored)
+        self.model = TimestampModel(target=0)
+        self.model.bookmark_window = window
+        self.model.subscribe_bookmarks(self.changed)
+        self.load(0)
+
+    def load(self, first):
+        model = self.model
+        first = max(0, min(first, len(self.stored) - model.bookmark_window))
+        rows = [(ts, False) for ts in self.stored[first:first + model.bookmark_window]]
+        model.set_bookmarks(rows, first, len(self.stored))
+
+    def changed(self, action, index, row):
+        if action != "reset" and self.model.bookmark_window_short():
+            self.load(self.model.bookmark_offset)
+
+    def add(self, timestamp):
+        if timestamp not in self.stored:
+            self.stored.insert(bisect_left(self.stored, timestamp), timestamp)
+            self.model.add_bookmark(timestamp)
+
+    def remove(self, timestamp):
+        self.stored.remove(timestamp)
+        self.model.remove_bookmark(timestamp)
+
+    def check(self):
+        model = self.model
+        offset = model.bookmark_offset
+        assert model.bookmark_total == len(self.stored)
+        assert [ts for ts, _ in model.bookmarks] == self.stored[offset:offset + len(model.bookmarks)]
+        assert not model.bookmark_window_short()
+
+
+def test_window_follows_adds_and_removes():
+    view = FakeView(range(0, 200, 10))
+    view.add(35)
+    view.add(-5)
+    view.add(1000)
+    view.remove(0)
+    view.check()
+    assert [ts for ts, _ in view.model.bookmarks] == [-5, 10, 20, 30, 35]
+
+
+def test_delete_all_on_last_page_then_add():
+    view = FakeView(range(10, 130, 10), window=5)  # 12 rows, the last page starts at 7
+    view.load(7)
+    for timestamp, _ in list(view.model.bookmarks):
+        view.remove(timestamp)
+        view.check()
+    assert [ts for ts, _ in view.model.bookmarks] == [30, 40, 50, 60, 70]
+    view.add(33)
+    view.check()
+    assert view.model.bookmark_index(33) == 1
+
+
+def test_empty_window_past_the_end_is_outside():
+    model = TimestampModel(target=0)
+    model.set_bookmarks([], 12, 12)
+    changes = []
+    model.subscribe_bookmarks(lambda action, index, row: changes.append(action))
+    model.add_bookmark(33)
+    assert changes == ["shift"]
+    assert model.bookmarks == [] and (model.bookmark_offset, model.bookmark_total) == (13, 13)
+    assert model.bookmark_window_short()
+
+
+def test_move_bookmark_keeps_star():
+    model = TimestampModel(target=0)
+    model.set_bookmarks([(10, False), (20, True), (30, False)])
+    model.move_bookmark(20, 25)
+    assert model.bookmarks == [(10, False), (25, True), (30, False)]
+    model.move_bookmark(25, 40)
+    assert model.bookmarks == [(10, False), (30, False), (40, True)]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edits_match_the_table(seed):
+    rng = random.Random(seed)
+    view = FakeView(rng.sample(range(1000), 30), window=rng.randint(1, 8))
+    view.load(rng.randint(0, 30))
+    for _ in range(200):
+        operation = rng.random()
+        if operation < 0.45 or not view.stored:
+            view.add(rng.randrange(1000))
+        elif operation < 0.9:
+            view.remove(rng.choice(view.stored))
+        else:
+            view.load(rng.randint(0, len(view.stored)))
+        view.check()
+
+
+def test_day_values():
+    model = TimestampModel(target=1700000000)
+    assert model.target_civil == (2023, 11, 14)
+    assert (model.day_start, model.day_end) == (1699920000, 1700006399)
+    model.use_date(2024, 2, 29)
+    assert (model.target, model.target_civil) == (1709164800 + 80000, (2024, 2, 29))  # Same time of day
+    model.set_target(-1)
+    assert (model.day_start, model.target_civil) == (-86400, (1969, 12, 31))
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from core import format_timestamp
+import service
+from service import Client, ConversionService, _remove_stale_socket, serve
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = str(tmp_path / "service.sock")
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(serve(ConversionService(), socket_path=path))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        loop.close()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path):
+        assert time.monotonic() < deadline, "the server did not start"
+        time.sleep(0.01)
+    yield path
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(5)
+
+
+def call(service, **request):
+    return json.loads(service.handle_line(json.dumps(request).encode()))
+
+
+def test_ops():
+    service = ConversionService()
+    assert call(service, id=1, op="format_timestamp", value=1700000000) == {
+        "id": 1, "result": format_timestamp(1700000000)}
+    assert call(service, op="parse", value="1700000000123")["result"] == 1700000000123000000
+    assert call(service, op="batch", method="format_timestamp", values=[0, 86400])["result"] == [
+        format_timestamp(0), format_timestamp(86400)]
+
+
+@pytest.mark.parametrize("request_", [
+    {"op": "nope"},
+    {"op": "format_timestamp", "value": "x"},
+    {"op": "format_timestamp", "value": 1, "zone": "Mars/Base"},
+    {"op": "batch", "method": "x", "values": []},
+    {"op": "batch", "method": "format_timestamp", "values": [1, "2"]},
+    {"op": "batch", "method": "seconds_to_text", "values": [2 ** 70] * 300},
+    {"op": "format_timestamp", "value": -2 ** 63 - 1},
+])
+def test_invalid_requests_get_error_responses(request_):
+    response = call(ConversionService(), id=9, **request_)
+    assert response["id"] == 9 and "error" in response
+
+
+def test_invalid_lines_get_error_responses():
+    service = ConversionService()
+    for line in (b"not json\n", b"[1]\n"):
+        assert "error" in json.loads(service.handle_line(line))
+    assert "invalid" in service.stats.summary()
+
+
+def test_unexpected_exceptions_get_error_responses(monkeypatch):
+    service = ConversionService()
+    monkeypatch.setitem(service.ops, "parse", lambda request: 1 // 0)
+    assert call(service, id=3, op="parse") == {"id": 3, "error": "internal error: ZeroDivisionError: "
+                                                                  "integer division or modulo by zero"}
+
+
+def test_call_many_reads_every_response_before_raising(socket_path):
+    client = Client(socket_path)
+    try:
+        with pytest.raises(ValueError):
+            client.call_many([{"op": "nope"}, {"op": "parse", "value": "5ms"}])
+        assert client.call("parse", value="7") == 7000000000
+    finally:
+        client.close()
+
+
+def test_serve_refuses_a_path_that_is_not_a_socket(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("keep me")
+    with pytest.raises(OSError, match="not a socket"):
+        asyncio.run(serve(ConversionService(), socket_path=str(path)))
+    assert path.read_text() == "keep me"
+
+
+def test_serve_refuses_the_socket_of_a_running_server(socket_path):
+    with pytest.raises(OSError, match="another server"):
+        asyncio.run(serve(ConversionService(), socket_path=socket_path))
+    client = Client(socket_path)
+    assert client.call("parse", value="1") == 1000000000
+    client.close()
+
+
+def test_stale_socket_is_removed(tmp_path):
+    path = str(tmp_path / "stale.sock")
+    left_behind = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    left_behind.bind(path)
+    left_behind.close()
+    _remove_stale_socket(path)
+    assert not os.path.exists(path)
+
+
+def test_large_batch_does_not_block_other_connections(socket_path, monkeypatch):
+    release, started = threading.Event(), threading.Event()
+
+    def slow_format(request, values):
+        started.set()
+        assert release.wait(10), "a small request was held up behind the batch"
+        return [len(values)]
+
+    monkeypatch.setitem(service.BATCH_METHODS, "format_timestamp", slow_format)
+    big_client, small_client = Client(socket_path), Client(socket_path)
+    results = []
+    batch = threading.Thread(target=lambda: results.append(big_client.batch("format_timestamp", [1] * 100000)))
+    batch.start()
+    try:
+        assert started.wait(5)
+        assert small_client.call("parse", value="2") == 2000000000  # Answered while the batch is running
+        assert batch.is_alive()
+    finally:
+        release.set()
+        batch.join(10)
+        big_client.close()
+        small_client.close()
+    assert results == [[100000]]
@@ -0,0 +1,135 @@
+import io
+import random
+import sqlite3
+import sys
+
+import pytest
+
+from profiling import Profiler
+from store import BookmarkStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BookmarkStore(str(tmp_path / "timestamps.db"), profiler=Profiler())
+    yield store
+    store.close()
+
+
+def stored(store):
+    return store.submit(lambda conn: [ts for ts, in conn.execute(
+        "SELECT timestamp FROM timestamps ORDER BY timestamp")]).result()
+
+
+def test_add_survives_a_closed_stdout(store, monkeypatch):
+    closed = io.StringIO()
+    closed.close()
+    monkeypatch.setattr(sys, "stdout", closed)
+    assert store.add(1700000000).result() is True
+    assert store.add(1700000000).result() is False
+    assert stored(store) == [1700000000]
+
+
+def test_operations_queued_together_share_one_commit(tmp_path):
+    profiler = Profiler()
+    store = BookmarkStore(str(tmp_path / "timestamps.db"), batch_window=0.5, profiler=profiler)
+    futures = [store.add(ts) for ts in range(50)]
+    store.close()
+    assert all(future.result() for future in futures)
+    assert profiler.histograms["db:commit"].count == 1  # Migrations and all the adds
+    with sqlite3.connect(str(tmp_path / "timestamps.db")) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM timestamps").fetchone()[0] == 50
+
+
+def test_failed_operation_is_rolled_back_alone(store):
+    def half_done(conn):
+        conn.execute("INSERT INTO timestamps (timestamp) VALUES (2)")
+        raise RuntimeError("boom")
+
+    first = store.add(1)
+    failed = store.submit(half_done)
+    last = store.add(3)
+    assert first.result() and last.result()
+    with pytest.raises(RuntimeError):
+        failed.result()
+    assert stored(store) == [1, 3]
+
+
+def test_callbacks_and_errbacks_run_in_dispatch(store):
+    results = []
+    store.add(5, callback=results.append)
+    store.submit(lambda conn: 1 / 0, errback=lambda e: results.append(type(e).__name__))
+    store.count_bookmarks(callback=results.append).result()
+    assert results == []
+    while store.busy():
+        store.dispatch()
+    assert results == [True, "ZeroDivisionError", 1]
+
+
+def test_queries(store):
+    for ts in (10, 20, 30, 40, 86400 * 3 + 5):
+        store.add(ts)
+    store.toggle_star(20)
+    store.update(30, 35)
+    store.delete(40)
+    assert store.page_at(1, 2).result() == [(20, True), (35, False)]
+    assert store.page_after(20, 5).result() == [(35, False), (86400 * 3 + 5, False)]
+    assert store.page_before(35, 5).result() == [(10, False), (20, True)]
+    assert store.starred_bookmarks(3).result() == [20]
+    assert store.day_counts(0, 86400 * 4 - 1).result() == {0: 3, 3: 1}
+    assert store.count_bookmarks().result() == 4
+
+
+def test_positions_follow_every_kind_of_write(store):
+    from bookmark_io import import_rows
+
+    store._positions.block_size = 4  # Many blocks, splits and empty blocks from a few hundred rows
+    rng = random.Random(0)
+    for step in range(300):
+        choice = rng.random()
+        ts = rng.randrange(-500, 500)
+        if choice < 0.5:
+            store.add(ts)
+        elif choice < 0.7:
+            store.delete(ts)
+        elif choice < 0.8:
+            store.update(ts, rng.randrange(-500, 500))
+        elif choice < 0.85:
+            store.submit(lambda conn: import_rows(conn, [(rng.randrange(-500, 500), False) for _ in range(20)]))
+        elif choice < 0.9:
+            store.submit(lambda conn: (conn.execute("INSERT OR IGNORE INTO timestamps (timestamp) VALUES (?)",
+                                                    (ts,)), 1 / 0))  # Rolled back
+        if step % 10 == 0:
+            expected = stored(store)
+            start, end = sorted(rng.randrange(-600, 600) for _ in range(2))
+            inside = [t for t in expected if start <= t <= end]
+            assert store.count_bookmarks().result() == len(expected)
+            assert store.bookmarks_between(start, end, limit=3).result() == (
+                len(inside), [(t, False) for t in inside[:3]])
+            for offset in (0, rng.randrange(len(expected) + 1), len(expected) - 2, len(expected) + 5):
+                assert [t for t, _ in store.page_at(offset, 5).result()] == expected[max(offset, 0):offset + 5]
+
+
+def test_failing_callback_does_not_stop_dispatch(store, capsys):
+    results, reported = [], []
+    store.add(1, callback=lambda added: 1 / 0)
+    store.add(2, callback=results.append)
+    store.add(3, callback=lambda added: [][0])
+    store.add(4, callback=results.append).result()
+    while store.busy():
+        store.dispatch(report=lambda kind, value, tb: reported.append(kind))
+    assert results == [True, True] and reported == [ZeroDivisionError, IndexError]
+    store.add(5, callback=lambda added: 1 / 0).result()
+    while store.busy():
+        store.dispatch()
+    assert "ZeroDivisionError" in capsys.readouterr().err
+
+
+def test_range_queries_accept_bounds_beyond_64_bits(store):
+    for ts in (-2 ** 63, -5, 7, 2 ** 63 - 1):
+        store.add(ts)
+    assert store.bookmarks_between(-10 ** 19, 5).result() == (2, [(-2 ** 63, False), (-5, False)])
+    assert store.bookmarks_between(-10, 10 ** 30, limit=1).result() == (3, [(-5, False)])
+    assert store.bookmarks_between(10 ** 19, 10 ** 20).result() == (0, [])
+    assert store.nearest_bookmarks(10 ** 19, 2).result() == [(2 ** 63 - 1, False), (7, False)]
+    assert store.nearest_bookmarks(-10 ** 19, 1).result() == [(-2 ** 63, False)]
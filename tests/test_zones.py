@@ -0,0 +1,53 @@
+import random
+import time
+
+import pytest
+
+from zones import PosixRule, get_zone, local_zone
+
+RULES = ["EST5EDT,M3.2.0,M11.1.0", "CET-1CEST,M3.5.0,M10.5.0/3", "AEST-10AEDT,M10.1.0,M4.1.0/3",
+         "<+0330>-3:30", "JST-9"]
+
+
+@pytest.fixture
+def set_tz(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+
+    def set_tz(value):
+        monkeypatch.setenv("TZ", value)
+        time.tzset()
+        local_zone.cache_clear()
+
+    yield set_tz
+    monkeypatch.undo()
+    time.tzset()
+    local_zone.cache_clear()
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_tz_rule_matches_the_c_library(set_tz, rule):
+    set_tz(rule)
+    zone = local_zone()
+    assert zone.rule is not None and zone.rule.text == rule
+    rng = random.Random(rule)
+    samples = [rng.randrange(-2 ** 33, 2 ** 33) for _ in range(2000)]
+    expected = [(local.tm_gmtoff, local.tm_zone) for local in map(time.localtime, samples)]
+    assert [zone.lookup(ts) for ts in samples] == expected
+    assert zone.utcoffset_many(samples).tolist() == [offset for offset, _ in expected]
+
+
+def test_tz_zone_key_is_not_taken_for_a_rule(set_tz):
+    set_tz("EST5EDT")  # Both a zone key and a valid rule; the key wins, as in the C library
+    assert local_zone().times == get_zone("EST5EDT").times
+
+
+def test_unusable_tz_falls_back(set_tz):
+    set_tz("Nowhere/Zone")
+    assert local_zone().name == "localtime"
+
+
+@pytest.mark.parametrize("text", ["EST", "Europe/Nowhere", "EST5EDT,M3.2.0", "EST5EDT,M3.2.0,M11.1.0junk"])
+def test_invalid_rules_are_rejected(text):
+    with pytest.raises((ValueError, IndexError)):
+        PosixRule(text)
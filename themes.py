@@ -1,4 +1,5 @@
 from tkinter.ttk import Style
+from typing import Dict, Optional, Tuple
 
 
 class BaseTheme:
@@ -16,38 +17,45 @@ class BaseTheme:
     }
 
     @classmethod
-    def apply_style(cls, style: Style):
-        """Apply a consistent theme style using the theme's color set."""
+    def style_spec(cls) -> Dict[Tuple[str, str], Dict[str, object]]:
+        """Return the theme's ttk settings as {(method, style name): options}, method being "configure" or "map"."""
         colors = cls.colors
+        return {
+            # Frame and Label
+            ("configure", "TFrame"): dict(background=colors["background"]),
+            ("configure", "TLabel"): dict(background=colors["background"], foreground=colors["text"]),
+
+            # Button
+            ("configure", "TButton"): dict(background=colors["primary"], foreground="white", padding=(10, 5)),
+
+            # Entry
+            ("configure", "TEntry"): dict(fieldbackground=colors["light_bg"], foreground=colors["text"]),
+
+            # Combobox
+            ("configure", "TCombobox"): dict(fieldbackground=colors["background"], background=colors["primary"],
+                                             foreground=colors["text"], arrowcolor=colors["secondary"]),
+
+            # Label frame and its label
+            ("configure", "TLabelframe"): dict(background=colors["background"], foreground=colors["text"]),
+            ("configure", "TLabelframe.Label"): dict(background=colors["background"], foreground=colors["text"],
+                                                     font=("Helvetica", 10, "bold")),  # Bolder font for labels
+
+            # Progress bar
+            ("configure", "Horizontal.TProgressbar"): dict(troughcolor=colors["progress_trough"],
+                                                           background=colors["progress_bg"]),
+
+            # Button state configuration
+            ("map", "TButton"): dict(
+                background=[('active', colors["highlight"]), ('pressed', colors["secondary"]),
+                            ('disabled', '#CCCCCC')],
+                foreground=[('active', colors["primary"]), ('pressed', 'white'), ('disabled', '#666666')]),
+        }
 
-        # Frame and Label
-        style.configure("TFrame", background=colors["background"])
-        style.configure("TLabel", background=colors["background"], foreground=colors["text"])
-
-        # Button
-        style.configure("TButton", background=colors["primary"], foreground="white", padding=(10, 5))
-
-        # Entry
-        style.configure("TEntry", fieldbackground=colors["light_bg"], foreground=colors["text"])
-
-        # Combobox
-        style.configure("TCombobox", fieldbackground=colors["background"], background=colors["primary"],
-                        foreground=colors["text"], arrowcolor=colors["secondary"])
-
-        # Label frame and its label
-        style.configure("TLabelframe", background=colors["background"], foreground=colors["text"])
-        style.configure("TLabelframe.Label", background=colors["background"], foreground=colors["text"],
-                        font=("Helvetica", 10, "bold"))  # Bolder font for labels
-
-        # Progress bar
-        style.configure("Horizontal.TProgressbar", troughcolor=colors["progress_trough"],
-                        background=colors["progress_bg"])
-
-        # Button state configuration
-        style.map("TButton",
-                  background=[('active', colors["highlight"]), ('pressed', colors["secondary"]),
-                              ('disabled', '#CCCCCC')],
-                  foreground=[('active', colors["primary"]), ('pressed', 'white'), ('disabled', '#666666')])
+    @classmethod
+    def apply_style(cls, style: Style):
+        """Apply a consistent theme style using the theme's color set."""
+        for (method, name), options in cls.style_spec().items():
+            getattr(style, method)(name, **options)
 
     @classmethod
     def get_colors(cls):
@@ -221,7 +229,41 @@ class ThemeManager:
         "AI NSPIRED": aiNSPIREDTheme,
     }
 
+    _compiled = {}  # Theme name -> (style spec, colors), built on first use
+
     @classmethod
     def get_theme(cls, theme_name):
         """Retrieve a theme class by name from the available themes."""
         return cls.THEMES.get(theme_name)
+
+    @classmethod
+    def compile(cls, theme_name):
+        """Return the cached (style spec, colors) of a theme."""
+        if theme_name not in cls._compiled:
+            theme = cls.get_theme(theme_name)
+            cls._compiled[theme_name] = (theme.style_spec(), theme.get_colors())
+        return cls._compiled[theme_name]
+
+    @classmethod
+    def switch(cls, style: Style, theme_name: str, previous: Optional[str] = None) -> Dict[str, str]:
+        """
+        Apply a theme's ttk styles and return its widget colors.
+
+        Args:
+            style: The Style to configure.
+            theme_name: Theme to switch to.
+            previous: Theme currently applied to style, if any; only the options
+                whose values differ from it are sent to Tk.
+
+        Returns:
+            The theme's color dictionary, as returned by get_colors().
+        """
+        spec, colors = cls.compile(theme_name)
+        applied = cls.compile(previous)[0] if previous in cls.THEMES else {}
+        for key, options in spec.items():
+            before = applied.get(key, {})
+            changed = {option: value for option, value in options.items() if before.get(option) != value}
+            if changed:
+                method, name = key
+                getattr(style, method)(name, **changed)
+        return colors
@@ -1,89 +1,275 @@
+import time
+
+_START = time.perf_counter()  # Reference point for --startup-profile
+
+import argparse
+import os
+import re
+import sys
 import tkinter.font as tkFont
-import sqlite3
 import tkinter as tk
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import MAXYEAR, MINYEAR, date
 from tkinter import ttk, messagebox
 from tkinter.ttk import Style
 
-from tkcalendar import Calendar
-
-from core import PosixTime, seconds_to_text
+from bookmark_io import export_file, import_file, rate
+from civil import civil_from_days
+from clocks import ClockBoard, countdown_clock, elapsed_clock, utc_clock, zone_clock
+from core import INT64_MAX, INT64_MIN, NANOS_PER_SECOND, PosixTime, format_nanoseconds, format_timestamp, \
+    parse_nanoseconds, seconds_to_text, warn
+from heatmap import HEAT_LEVELS, DayCountCache, heat_tag, month_bounds
+from model import PRESETS, TimestampModel
+from profiling import OVERLAY_ENV_VAR, Profiler
+from series import preview, series_length, write_series
+from store import BookmarkStore
+from widgets import VirtualListbox
+from zones import UTC, ZoneInfoNotFoundError, get_zone
 from themes import ThemeManager
 
+DEFAULT_CLOCK_ZONES = "America/New_York,Europe/London,Asia/Tokyo"
+BOOKMARK_FILE_TYPES = [("CSV files", "*.csv"), ("JSON lines", "*.jsonl"), ("All files", "*.*")]
+SERIES_PREVIEW = 10  # Points shown from each end of a series
+SERIES_FILE_TYPES = [("Text files", "*.txt"), ("All files", "*.*")]
+MAX_STARRED_CLOCKS = 3  # Most recently added starred bookmarks shown in the clock panel
+WEEKDAY_NAMES = ("MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN")
+# Methods timed as "app:<name>" when profiling; Tk-dispatched callbacks are timed as "tk:<name>" anyway
+PROFILED_METHODS = ("update_labels", "update_head_tail_labels", "update_day_progress", "update_calendar",
+                    "update_timestamp_list", "update_clocks", "refresh_near_target", "show_near_target",
+                    "apply_theme", "apply_widget_colors", "on_bookmarks_changed", "sync_entry",
+                    "show_calendar_heat")
+PARTIAL_NUMBER = re.compile(r"[+-]?[0-9]*(\.[0-9]*)?\s*(n|ns|u|us|µ|µs|m|ms|s)?")
+
 
 class TimestampApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, startup_profile=False):
+        self.profiler = Profiler.from_environment()
+        if self.profiler.enabled:
+            self.profiler.install_tk()  # Before any widget registers a callback
         super().__init__()
         self.title("POSIX Timestamp Converter")
         self.geometry("1100x650")
         self.resizable(False, False)
-        self.preset_options = ["DAY", "WEEK", "12 DAYS", "13 DAYS", "2 WEEKS", "15 DAYS", "28 DAYS", "29 DAYS", "30 DAYS", "31 DAYS", "365 DAYS"]
-        self.preset_mapping = {
-            "DAY": 86400,
-            "WEEK": 604800,
-            "12 DAYS": 1036800,
-            "13 DAYS": 1123200,
-            "2 WEEKS": 1209600,
-            "15 DAYS": 1296000,
-            "28 DAYS": 2419200, "29 DAYS": 2505600,
-                               "30 DAYS": 2592000, "31 DAYS": 2678400, "365 DAYS": 31536000}
-        self.db_conn = sqlite3.connect("timestamps.db")
-        self.create_table()
-        self.load_timestamps()
+        self.startup_profile = startup_profile
+        self.preset_options = list(PRESETS)
+        self.model = TimestampModel(target=PosixTime.now())
+        # self.model.use_current()  # Use the current timestamp as TARGET on startup instead
+        self.model.use_day_start()  # Set today's first second as the default TARGET
+        self.calendar = None  # Built after the first paint, see finish_startup
+        self.bookmark_request = None  # Pending (first row, reload) for the bookmark view
+        self.bookmark_fetching = False
+        self.window_rows = []  # Bookmarks shown in the NEAR TARGET panel
+        self.nearest_rows = []
+        self.near_query_pending = False
+        self.near_query_dirty = False
+        self.refresh_scheduled = False
+        self.refresh_requested = 0  # Refreshes asked for by model changes...
+        self.refresh_performed = 0  # ...and the coalesced passes that actually ran
+        self.label_texts = {}  # Last text pushed to each label, see set_text
+        self.calendar_date = None  # Date last selected on the calendar
+        self.day_counts = DayCountCache()  # Bookmarks per day for the calendar, by month
+        self.day_counts_pending = set()  # Months whose counts are being queried
+        self.heat_month = None  # (year, month) whose counts the calendar currently shows
+        self.progress_items = None  # Persistent day progress canvas items, see update_day_progress
+        self.progress_layout = None  # (width, hour ticks shown) the items were laid out for
+        self.progress_colors = None
+        self.drag_event = None  # Latest progress bar drag not yet applied
+        self.active_theme = None  # Theme whose styles are applied (possibly a hover preview)
+        self.pending_theme = None
+        self.theme_save_job = None
+        self.theme_popdown = None  # Listbox of the theme combobox's dropdown, once hooked up
+        self.clock_zones = []  # Time zones shown in the clock panel, from the "clock_zones" setting
+        self.starred_clocks = []  # Starred bookmarks shown in the clock panel
+        self.clock_board = ClockBoard()
+        self.last_tick = None
+        self.starred_query_pending = False
+        self.starred_query_dirty = False
+        self.series_dialog = None  # Series preview window, see open_series_dialog
+        self.series_executor = None  # Writes series files off the Tk thread
+        self.profile_overlay = None  # Label showing the slowest handlers, see toggle_profile_overlay
+        self.profile_overlay_job = None
+        if self.profiler.enabled:
+            self.profiler.instrument(self, PROFILED_METHODS)
+            self.profiler.instrument(self.model, ("_recompute",), prefix="model")
+            self.bind("<F12>", self.toggle_profile_overlay)
+        self.store = BookmarkStore("timestamps.db", profiler=self.profiler if self.profiler.enabled else None)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.create_widgets()
         saved_theme = self.load_theme()
-        self.apply_theme(saved_theme)
+        self.apply_theme(saved_theme, refresh=False)
         self.theme_combo.set(saved_theme)
-        self.update_timer()
-        # self.use_current_timestamp()  # Add this line to call paste_current_timestamp on startup
-        self.use_days_first_second()  # Set today's first second as the default TARGET
-        self.update_timestamp_list()
-
-    def create_table(self):
-        cursor = self.db_conn.cursor()
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS timestamps (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp INTEGER UNIQUE, starred BOOLEAN DEFAULT 0)""")
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)""")
-        self.db_conn.commit()
+        self.update_labels()
+        self.model.subscribe(self.on_model_changed)
+        self.model.subscribe_bookmarks(self.on_bookmarks_changed)
+        self.tick()
+        self.poll_store()
+        # Build the calendar and load bookmarks once the TARGET/HEAD/TAIL panes are on screen
+        self.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        self.update_idletasks()
+        first_paint = time.perf_counter()
+        self.create_calendar()
+        self.load_timestamps()
+        self.refresh_near_target()
+        self.store.get_setting("clock_zones", DEFAULT_CLOCK_ZONES, callback=self.set_clock_zones)
+        self.store.get_setting("display_zone", "UTC", callback=lambda name: self.set_display_zone(name, save=False))
+        self.refresh_starred_clocks()
+        if self.profiler.enabled and os.environ.get(OVERLAY_ENV_VAR, "") not in ("", "0"):
+            self.toggle_profile_overlay()
+        if self.startup_profile:
+            ready = time.perf_counter()
+            print(f"Startup: first paint {1000 * (first_paint - _START):.1f} ms, "
+                  f"calendar and bookmarks ready {1000 * (ready - _START):.1f} ms", file=sys.stderr)
+
+    def create_calendar(self):
+        """Import tkcalendar (and babel's locale data) and build the calendar widget."""
+        from tkcalendar import Calendar
+
+        self.calendar = Calendar(self.calendar_frame, selectmode='day', date_pattern='yyyy-mm-dd',
+                                 showweeknumbers=False, width=20, height=5, firstweekday='monday',
+                                 disabledforeground='black', showothermonthdays=False,
+                                 state='normal')  # Reenable the calendar
+        self.calendar.pack(pady=5)
+
+        for _, tag, background, foreground in HEAT_LEVELS:
+            self.calendar.tag_config(tag, background=background, foreground=foreground)
+
+        # Bind calendar selection to update the target
+        self.calendar.bind("<<CalendarSelected>>", lambda e: self.use_calendar_date())
+        self.calendar.bind("<<CalendarMonthChanged>>", lambda e: self.update_calendar_heat())
+        self.update_calendar()
+        self.update_calendar_heat()
+
+    def poll_store(self):
+        """Run the callbacks of finished bookmark store operations on the Tk thread."""
+        try:
+            self.store.dispatch(report=self.report_callback_exception)
+        finally:
+            self.after(20, self.poll_store)  # Keep polling even if reporting a failed callback fails
+
+    def on_close(self):
+        self.flush_theme_save()
+        if self.startup_profile:
+            print(f"Refreshes: {self.refresh_requested} requested, {self.refresh_performed} performed",
+                  file=sys.stderr)
+        self.store.close()  # Flush pending writes before exiting
+        if self.profiler.enabled:
+            self.profiler.dump()
+        self.destroy()
+
+    def toggle_profile_overlay(self, event=None):
+        """Show or hide the per-handler p50/p99 overlay in the top right corner (F12 when profiling)."""
+        if self.profile_overlay_job is not None:
+            self.after_cancel(self.profile_overlay_job)
+            self.profile_overlay_job = None
+            self.profile_overlay.place_forget()
+            return
+        if self.profile_overlay is None:
+            self.profile_overlay = tk.Label(self, font="TkFixedFont", justify=tk.LEFT, anchor="nw",
+                                            bg="#000000", fg="#00ff00", padx=4, pady=2)
+        self.profile_overlay.place(relx=1.0, x=-4, y=4, anchor="ne")
+        self.profile_overlay.lift()
+        self.refresh_profile_overlay()
+
+    def refresh_profile_overlay(self):
+        self.profile_overlay.config(text="\n".join(self.profiler.report_lines()))
+        self.profile_overlay_job = self.after(1000, self.refresh_profile_overlay)
 
     def save_theme(self, theme_name):
-        cursor = self.db_conn.cursor()
-        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
-                       ("theme", theme_name))
-        self.db_conn.commit()
+        self.store.set_setting("theme", theme_name)
+
+    def schedule_theme_save(self, theme_name):
+        """Save the theme after a short pause, so flicking through themes writes the setting once."""
+        self.pending_theme = theme_name
+        if self.theme_save_job is not None:
+            self.after_cancel(self.theme_save_job)
+        self.theme_save_job = self.after(1000, self.flush_theme_save)
+
+    def flush_theme_save(self):
+        """Write a scheduled theme save now, if there is one."""
+        if self.theme_save_job is None:
+            return
+        self.after_cancel(self.theme_save_job)
+        self.theme_save_job = None
+        self.save_theme(self.pending_theme)
 
     def load_theme(self):
-        cursor = self.db_conn.cursor()
-        cursor.execute("SELECT value FROM settings WHERE key = 'theme'")
-        result = cursor.fetchone()
-        return result[0] if result else 'SHIBA INU'
+        # Needed before the first paint; a read never waits on an fsync in WAL mode
+        return self.store.get_setting("theme", 'SHIBA INU').result()
 
     def load_timestamps(self):
-        cursor = self.db_conn.cursor()
-        cursor.execute("SELECT timestamp FROM timestamps WHERE starred = 1 ORDER BY id DESC")
-        starred_rows = cursor.fetchall()
-        cursor.execute("SELECT timestamp FROM timestamps WHERE starred = 0 ORDER BY id DESC LIMIT ?",
-                       (max(0, 100 - len(starred_rows)),))
-        regular_rows = cursor.fetchall()
-        self.saved_timestamps = []
-        self.starred_timestamps = set()
-        for (ts,) in starred_rows:
-            self.saved_timestamps.append(str(ts))
-            self.starred_timestamps.add(str(ts))
-        for (ts,) in regular_rows:
-            self.saved_timestamps.append(str(ts))
+        """Recount the bookmarks and reload the rows at the current scroll position in the background."""
+        self.request_bookmarks(self.bookmark_view.first, reload=True)
+
+    def request_bookmarks(self, first, reload=False):
+        """Show the bookmark rows starting at position first; fetches are serialized, the latest request wins."""
+        reload = reload or (self.bookmark_request is not None and self.bookmark_request[1])
+        self.bookmark_request = (first, reload)
+        if not self.bookmark_fetching:
+            self.fetch_bookmarks()
+
+    def fetch_bookmarks(self):
+        first, reload = self.bookmark_request
+        self.bookmark_request = None
+        model = self.model
+        visible = self.bookmark_view.visible_rows
+        model.bookmark_window = visible
+        version = model.bookmark_version
+
+        def done(rows, offset):
+            self.bookmark_fetching = False
+            if model.bookmark_version != version:
+                # A write changed the window while fetching; plan again from the updated window
+                self.request_bookmarks(first)
+            elif self.bookmark_request is None and (rows, offset) != (model.bookmarks, model.bookmark_offset):
+                model.set_bookmarks(rows, offset, model.bookmark_total)
+                if len(rows) < min(visible, model.bookmark_total - offset):
+                    self.request_bookmarks(offset)  # Still short of a full window, fill the rest
+            if self.bookmark_request is not None:
+                self.fetch_bookmarks()
+
+        self.bookmark_fetching = True
+        if reload:
+            def counted(total):
+                model.bookmark_total = total
+                start = max(0, min(first, total - visible))
+                self.store.page_at(start, visible, callback=lambda page: done(page, start))
+            self.store.count_bookmarks(callback=counted)
+            return
+
+        if model.bookmark_total == 0:
+            done([], 0)  # Nothing stored (or not counted yet)
+            return
+        first = max(0, min(first, model.bookmark_total - visible))
+        rows, offset = model.bookmarks, model.bookmark_offset
+        wanted = min(visible, model.bookmark_total - first)
+        if rows and offset <= first < offset + len(rows):
+            # Keep the loaded rows still in view and walk the index forward for the rest
+            keep = rows[first - offset:first - offset + visible]
+            missing = wanted - len(keep)
+            if missing > 0:
+                self.store.page_after(keep[-1][0], missing, callback=lambda page: done(keep + page, first))
+            else:
+                done(keep, first)
+        elif rows and first < offset <= first + visible:
+            # Walk the index backward from the first loaded row
+            self.store.page_before(rows[0][0], offset - first,
+                                   callback=lambda page: done((page + rows)[:visible], offset - len(page)))
+        else:
+            # Jump (scrollbar drag or first load)
+            self.store.page_at(first, visible, callback=lambda page: done(page, first))
 
     def save_timestamp(self, timestamp):
-        try:
-            cursor = self.db_conn.cursor()
-            cursor.execute("INSERT INTO timestamps (timestamp) VALUES (?)", (timestamp,))
-            self.db_conn.commit()
-            print(f"Timestamp {timestamp} successfully saved.")  # Debug output
-            self.load_timestamps()
-            self.update_timestamp_list()
-        except sqlite3.IntegrityError as e:
-            print(f"Failed to save timestamp {timestamp}: {e}")  # Debug error message
+        def saved(added):
+            if not added:
+                warn(f"Failed to save timestamp {timestamp}: already bookmarked")  # Debug error message
+                return
+            # Model and counts first; the debug line must not be able to lose a stored bookmark
+            self.model.add_bookmark(timestamp)
+            self.adjust_day_counts((timestamp, 1))
+            warn(f"Timestamp {timestamp} successfully saved.")  # Debug output
+        self.store.add(timestamp, callback=saved)
 
     def create_widgets(self):
         main_frame = ttk.Frame(self)
@@ -92,11 +278,20 @@ class TimestampApp(tk.Tk):
         # Theme selection frame
         theme_frame = ttk.Frame(main_frame)
         theme_frame.pack(fill=tk.X, pady=(0, 5))
+        zone_container = ttk.Frame(theme_frame)
+        zone_container.pack(side=tk.LEFT)
+        ttk.Label(zone_container, text="Zone:").pack(side=tk.LEFT, padx=(0, 5))
+        self.zone_combo = ttk.Combobox(zone_container, values=["UTC", "localtime"] + DEFAULT_CLOCK_ZONES.split(","),
+                                       width=20)
+        self.zone_combo.pack(side=tk.LEFT)
+        self.zone_combo.set("UTC")
+        self.zone_combo.bind("<<ComboboxSelected>>", lambda e: self.set_display_zone(self.zone_combo.get()))
+        self.zone_combo.bind("<Return>", lambda e: self.set_display_zone(self.zone_combo.get()))
         theme_container = ttk.Frame(theme_frame)
         theme_container.pack(side=tk.RIGHT)
         ttk.Label(theme_container, text="Theme:").pack(side=tk.LEFT, padx=(0, 5))
         self.theme_combo = ttk.Combobox(theme_container, values=list(ThemeManager.THEMES.keys()), state="readonly",
-                                        width=15)
+                                        width=15, postcommand=self.hook_theme_preview)
         self.theme_combo.pack(side=tk.LEFT)
         self.theme_combo.set('SHIBA INU')
         self.theme_combo.bind('<<ComboboxSelected>>', lambda e: self.apply_theme(self.theme_combo.get()))
@@ -121,10 +316,11 @@ class TimestampApp(tk.Tk):
         vcmd = (self.register(self.validate_number), '%P')
         self.target_entry = ttk.Entry(target_frame, validate="key", validatecommand=vcmd, width=20)
         self.target_entry.pack(side=tk.LEFT, expand=True, fill=tk.X)
-        current_ts = PosixTime.now()
-        self.target_entry.insert(0, str(current_ts))
+        self.target_entry.insert(0, format_nanoseconds(self.model.target_ns, detect=True))
         self.add_button = ttk.Button(target_frame, text="+", width=3, command=self.add_current_target)
         self.add_button.pack(side=tk.LEFT, padx=(2, 0))
+        ttk.Button(target_frame, text="Series", width=6, command=self.open_series_dialog).pack(side=tk.LEFT,
+                                                                                              padx=(2, 0))
 
         # Target date label
         self.target_date_label = ttk.Label(target_group, text="Date: ")
@@ -149,16 +345,9 @@ class TimestampApp(tk.Tk):
         )
         self.use_last_second_button.pack(side=tk.LEFT, expand=True, fill=tk.X)
 
-        # Enable and pack the calendar widget
-        calendar_frame = ttk.Frame(target_group)
-        calendar_frame.pack(pady=5, expand=True)
-        self.calendar = Calendar(calendar_frame, selectmode='day', date_pattern='yyyy-mm-dd', showweeknumbers=False,
-                                 width=20, height=5, firstweekday='monday', disabledforeground='black',
-                                 showothermonthdays=False, state='normal')  # Reenable the calendar
-        self.calendar.pack(pady=5)
-
-        # Bind calendar selection to update the target
-        self.calendar.bind("<<CalendarSelected>>", lambda e: self.use_calendar_date())
+        # Frame for the calendar widget, filled in by create_calendar after the first paint
+        self.calendar_frame = ttk.Frame(target_group)
+        self.calendar_frame.pack(pady=5, expand=True)
 
         # POSITION IN DAY group for day progress
         self.month_progress_group = ttk.LabelFrame(target_group, text="POSITION IN DAY", relief="groove", borderwidth=2)
@@ -179,6 +368,10 @@ class TimestampApp(tk.Tk):
         right_frame.pack_propagate(False)
         right_frame.pack(side=tk.LEFT, padx=2)
 
+        self.show_hour_ticks = tk.BooleanVar(value=False)
+        ttk.Checkbutton(progress_container, text="Hour ticks", variable=self.show_hour_ticks,
+                        command=self.update_day_progress).pack(side=tk.LEFT, padx=2)
+
         self.start_day_label = ttk.Label(left_frame, text="", anchor='center')
         self.start_day_label.pack(expand=False)
 
@@ -195,7 +388,9 @@ class TimestampApp(tk.Tk):
 
         # Enable mouse interaction on the day progress canvas
         self.day_progress_canvas.bind("<Button-1>", self.set_target_from_progress)  # Handle single click
-        self.day_progress_canvas.bind("<B1-Motion>", self.set_target_from_progress)  # Handle click and drag
+        self.day_progress_canvas.bind("<B1-Motion>", self.drag_progress)  # Handle click and drag
+        # Redraw once the canvas has its real width (and whenever it changes)
+        self.day_progress_canvas.bind("<Configure>", lambda e: self.update_day_progress())
 
         # BOOKMARKS group
         bookmarks_group = ttk.LabelFrame(upper_frame, text="BOOKMARKS", relief="groove", borderwidth=2)
@@ -204,8 +399,11 @@ class TimestampApp(tk.Tk):
         # Define a monospace font for timestamps listbox
         monospace_font = tkFont.Font(family="Courier", size=10)
 
-        self.timestamp_listbox = tk.Listbox(bookmarks_group, width=20, font=monospace_font)
-        self.timestamp_listbox.pack(pady=5, padx=5, fill=tk.BOTH, expand=True)
+        # Only the visible rows are loaded; scrolling fetches pages from the store
+        self.bookmark_view = VirtualListbox(bookmarks_group, on_scroll=self.request_bookmarks, width=20,
+                                            font=monospace_font)
+        self.bookmark_view.pack(pady=5, padx=5, fill=tk.BOTH, expand=True)
+        self.timestamp_listbox = self.bookmark_view.listbox
 
         # Buttons below the Listbox in BOOKMARKS group
         buttons_frame = ttk.Frame(bookmarks_group)
@@ -216,6 +414,10 @@ class TimestampApp(tk.Tk):
         self.edit_button.pack(side=tk.LEFT, padx=2)
         self.delete_button = ttk.Button(buttons_frame, text="Del", width=3, command=self.delete_timestamp)
         self.delete_button.pack(side=tk.LEFT, padx=2)
+        transfer_frame = ttk.Frame(bookmarks_group)
+        transfer_frame.pack(pady=(0, 5), padx=5)
+        ttk.Button(transfer_frame, text="Import", width=6, command=self.import_bookmarks).pack(side=tk.LEFT, padx=2)
+        ttk.Button(transfer_frame, text="Export", width=6, command=self.export_bookmarks).pack(side=tk.LEFT, padx=2)
         self.delete_button.state(['disabled'])
 
         # Bind Listbox selection
@@ -249,85 +451,169 @@ class TimestampApp(tk.Tk):
         self.tail_combo = ttk.Combobox(tail_output_frame, values=self.preset_options, width=15, state="readonly")
         self.tail_combo.pack(anchor=tk.W, padx=5, pady=(5, 5))
 
-        self.head_entry.bind("<KeyRelease>", lambda e: self.update_labels())
-        self.target_entry.bind("<KeyRelease>", lambda e: self.update_labels())
-        self.tail_entry.bind("<KeyRelease>", lambda e: self.update_labels())
-        self.head_combo.bind("<<ComboboxSelected>>",
-                             lambda e: (self.set_head_from_preset(), self.update_head_tail_labels()))
-        self.tail_combo.bind("<<ComboboxSelected>>",
-                             lambda e: (self.set_tail_from_preset(), self.update_head_tail_labels()))
-        self.update_labels()
+        # NEAR TARGET group: bookmarks inside [TARGET-HEAD, TARGET+TAIL] and the nearest ones to TARGET
+        near_group = ttk.LabelFrame(lower_frame, text="NEAR TARGET", relief="groove", borderwidth=2)
+        near_group.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        self.window_count_label = ttk.Label(near_group, text="In window: ")
+        self.window_count_label.pack(anchor=tk.W, padx=5)
+        self.window_listbox = tk.Listbox(near_group, height=4, width=34, font=monospace_font)
+        self.window_listbox.pack(fill=tk.X, padx=5)
+        ttk.Label(near_group, text="Nearest:").pack(anchor=tk.W, padx=5)
+        self.nearest_listbox = tk.Listbox(near_group, height=3, width=34, font=monospace_font)
+        self.nearest_listbox.pack(fill=tk.X, padx=5, pady=(0, 5))
+        self.window_listbox.bind("<<ListboxSelect>>",
+                                 lambda e: self.select_near_row(self.window_listbox, self.window_rows))
+        self.nearest_listbox.bind("<<ListboxSelect>>",
+                                  lambda e: self.select_near_row(self.nearest_listbox, self.nearest_rows))
+
+        # CLOCKS group: rows are added as clocks are configured, see show_clocks
+        self.clocks_group = ttk.LabelFrame(lower_frame, text="CLOCKS", relief="groove", borderwidth=2)
+        self.clocks_group.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        self.clock_rows = []
+
+        self.head_entry.bind("<KeyRelease>", lambda e: self.read_entry("head", self.head_entry))
+        self.target_entry.bind("<KeyRelease>", lambda e: self.read_entry("target", self.target_entry))
+        self.tail_entry.bind("<KeyRelease>", lambda e: self.read_entry("tail", self.tail_entry))
+        self.head_combo.bind("<<ComboboxSelected>>", self.set_head_from_preset)
+        self.tail_combo.bind("<<ComboboxSelected>>", self.set_tail_from_preset)
+
+    def read_entry(self, name, entry):
+        """Push one entry's text into the model (the others may not be synced yet, see refresh_views)."""
+        # TARGET guesses s/ms/us/ns from the digit count; HEAD and TAIL durations default to seconds
+        self.model.update(**{f"{name}_ns": parse_nanoseconds(entry.get(), detect=name == "target")})
+
+    def on_model_changed(self, changed):
+        """Refresh the widgets that depend on the fields the model reports as changed."""
+        if changed & {"target", "head", "tail", "zone"}:
+            self.schedule_refresh()
+        if "zone" in changed:
+            self.update_timestamp_list()
 
-    def update_day_progress(self, timestamp):
+    def schedule_refresh(self):
+        """Refresh the views once pending events are handled, so a burst of changes costs one pass."""
+        self.refresh_requested += 1
+        if not self.refresh_scheduled:
+            self.refresh_scheduled = True
+            self.after_idle(self.refresh_views)
+
+    def refresh_views(self):
+        self.refresh_scheduled = False
+        self.refresh_performed += 1
+        self.sync_entry(self.target_entry, self.model.target_ns, detect=True)
+        self.sync_entry(self.head_entry, self.model.head_ns)
+        self.sync_entry(self.tail_entry, self.model.tail_ns)
+        self.update_labels()
+        self.refresh_near_target()
+        self.update_clocks()  # The TARGET countdown
+        if self.series_dialog is not None:
+            self.update_series_preview()
+
+    def set_text(self, widget, text):
+        """Configure a widget's text only when it differs from what was last set."""
+        if self.label_texts.get(widget) != text:
+            self.label_texts[widget] = text
+            widget.config(text=text)
+
+    @staticmethod
+    def sync_entry(entry, value, detect=False):
+        """Rewrite an entry only when its text does not already hold the model value (in nanoseconds)."""
+        if parse_nanoseconds(entry.get(), detect) != value:
+            entry.delete(0, tk.END)
+            entry.insert(0, "" if value is None else format_nanoseconds(value, detect))
+
+    def update_day_progress(self):
         if not hasattr(self, 'theme_colors'):  # Prevents access issues
             print("Theme colors not set. Please apply a theme first.")
             return
 
-        # Get UTC date
-        date = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-
-        # Calculate start and end of UTC day
-        start_of_day = datetime(date.year, date.month, date.day,
-                                tzinfo=timezone.utc).timestamp()
-        end_of_day = start_of_day + 86399  # Last second of the day
-
-        try:
-            target = int(self.target_entry.get()) if self.target_entry.get() else timestamp
-        except ValueError:
-            target = timestamp
+        model = self.model
+        if model.target is None:
+            return
 
-        start_str = f"{format(int(start_of_day), ',')}\n{seconds_to_text(target - int(start_of_day), output_format=-3)}"
-        end_str = f"{format(int(end_of_day), ',')}\n{seconds_to_text(target - int(end_of_day), output_format=-3)}"
+        start_str = f"{format(model.day_start, ',')}\n{model.day_start_offset}"
+        end_str = f"{format(model.day_end, ',')}\n{model.day_end_offset}"
 
-        self.start_day_label.config(text=start_str)
-        self.end_day_label.config(text=end_str)
+        self.set_text(self.start_day_label, start_str)
+        self.set_text(self.end_day_label, end_str)
 
         canvas_width = self.day_progress_canvas.winfo_width()
-        if canvas_width > 0:
-            # Calculate the day's progress
-            day_progress = (target - start_of_day) / 86400
-            marker_x = int(canvas_width * day_progress)
-            self.day_progress_canvas.delete('all')
-
-            # Background (progress bar trough)
-            self.day_progress_canvas.create_rectangle(
-                0, 5, canvas_width, 15,
-                fill=self.theme_colors['progress_trough'],  # Theme-specific trough color
-                outline=""
-            )
-
-            # Foreground (progress bar fill)
-            self.day_progress_canvas.create_rectangle(
-                0, 5, marker_x, 15,
-                fill=self.theme_colors['progress_bg'],  # Theme-specific progress color
-                outline=""
-            )
-
-            # Marker
-            marker_size = 5
-            self.day_progress_canvas.create_polygon(
-                marker_x, 10 - marker_size,
-                          marker_x - marker_size, 10,
-                marker_x, 10 + marker_size,
-                          marker_x + marker_size, 10,
-                fill='red'  # Marker color, can also be themed
-            )
-
-    def apply_theme(self, theme_name):
-        # Retrieve the theme class
-        theme_class = ThemeManager.get_theme(theme_name)
-
-        # Create an instance of the retrieved theme
-        current_theme = theme_class()
-        self.theme_colors = current_theme.get_colors()  # Retrieve the color dictionary
-
+        if canvas_width <= 0:
+            return
+        canvas = self.day_progress_canvas
+        if self.progress_items is None:
+            # Created once; later updates only move or recolor them, so the cost does not depend on the tick count
+            self.progress_items = {
+                'trough': canvas.create_rectangle(0, 5, 0, 15, outline=""),
+                'fill': canvas.create_rectangle(0, 5, 0, 15, outline=""),
+                'ticks': [canvas.create_line(0, 3, 0, 17, state='hidden') for _ in range(23)],
+                'marker': canvas.create_polygon(0, 0, 0, 0, 0, 0, 0, 0, fill='red'),  # Marker color, can also be themed
+            }
+        items = self.progress_items
+
+        colors = (self.theme_colors['progress_trough'], self.theme_colors['progress_bg'])
+        if colors != self.progress_colors:
+            self.progress_colors = colors
+            canvas.itemconfig(items['trough'], fill=colors[0])  # Theme-specific trough color
+            canvas.itemconfig(items['fill'], fill=colors[1])  # Theme-specific progress color
+            for tick in items['ticks']:
+                canvas.itemconfig(tick, fill=self.theme_colors.get('fg', 'black'))
+
+        layout = (canvas_width, self.show_hour_ticks.get())
+        if layout != self.progress_layout:
+            self.progress_layout = layout
+            canvas.coords(items['trough'], 0, 5, canvas_width, 15)
+            for hour, tick in enumerate(items['ticks'], start=1):
+                x = canvas_width * hour / 24
+                canvas.coords(tick, x, 3, x, 17)
+                canvas.itemconfig(tick, state='normal' if layout[1] else 'hidden')
+
+        # Fractional coordinates keep the marker moving smoothly between pixels
+        marker_x = canvas_width * model.day_fraction
+        marker_size = 5
+        canvas.coords(items['fill'], 0, 5, marker_x, 15)
+        canvas.coords(items['marker'],
+                      marker_x, 10 - marker_size,
+                      marker_x - marker_size, 10,
+                      marker_x, 10 + marker_size,
+                      marker_x + marker_size, 10)
+
+    def apply_theme(self, theme_name, refresh=True):
+        if theme_name != self.active_theme:
+            # Only the ttk style options that differ from the active theme are sent to Tk
+            self.theme_colors = ThemeManager.switch(Style(), theme_name, self.active_theme)
+            self.active_theme = theme_name
+            self.apply_widget_colors()
+        if refresh:
+            # Save the user's selected theme to the database once the choice settles
+            self.schedule_theme_save(theme_name)
+
+    def hook_theme_preview(self):
+        """Preview themes while hovering over the open theme dropdown (bound the first time it opens)."""
+        if self.theme_popdown is not None:
+            return
+        # The dropdown is created by Tk itself, so it is reached through Tcl rather than tkinter widgets
+        try:
+            popdown = self.tk.call("ttk::combobox::PopdownWindow", self.theme_combo)
+        except tk.TclError:
+            return  # No Tk-drawn dropdown on this platform, so no preview
+        self.theme_popdown = f"{popdown}.f.l"
+        self.tk.call("bind", self.theme_popdown, "<Motion>", f"+{self.register(self.preview_theme)} %y")
+        self.tk.call("bind", popdown, "<Unmap>", f"+{self.register(self.end_theme_preview)}")
+
+    def preview_theme(self, y):
+        index = self.tk.call(self.theme_popdown, "nearest", y)
+        theme_name = self.tk.call(self.theme_popdown, "get", index)
+        if theme_name:
+            self.apply_theme(str(theme_name), refresh=False)
+
+    def end_theme_preview(self):
+        """Return to the chosen theme once the dropdown closes, unless a selection is being made."""
+        self.after_idle(lambda: self.apply_theme(self.theme_combo.get(), refresh=False))
+
+    def apply_widget_colors(self):
         # Apply the background color for the main window
         self.configure(bg=self.theme_colors.get('bg', 'white'))
 
-        # Reinitialize ttk styles based on the selected theme
-        style = Style()
-        current_theme.apply_style(style)  # Applies ttk styles for the current theme
-
         # Apply theme to all widgets
         for widget in self.winfo_children():
             # Handle tk.Listbox
@@ -347,7 +633,6 @@ class TimestampApp(tk.Tk):
             # Handle tk.Canvas for progress bar
             elif isinstance(widget, tk.Canvas):
                 widget.configure(bg=self.theme_colors.get('progress_trough', 'light gray'))
-                self.update_day_progress(int(self.target_entry.get()))
 
             # Generic background configuration (for other non-ttk widgets)
             elif hasattr(widget, 'configure') and not isinstance(widget, ttk.Widget):
@@ -356,52 +641,194 @@ class TimestampApp(tk.Tk):
                 except Exception as e:
                     print(f"Could not configure background for {widget}. Reason: {e}")
 
-        # Save the user's selected theme to the database
-        self.save_theme(theme_name)
-
-        # Refresh the progress bar (ensure correct theme colors)
-        self.update_day_progress(int(self.target_entry.get()))
+        # Recolor the progress bar once it has been drawn; before that (during __init__) its first
+        # draw, from update_labels or <Configure>, picks up the theme colors anyway
+        if self.progress_items is not None:
+            self.update_day_progress()
 
     def add_current_target(self):
-        if self.target_entry.get():
-            try:
-                timestamp = int(self.target_entry.get())
-                self.save_timestamp(timestamp)
-            except ValueError:
-                messagebox.showerror("Error", "Invalid timestamp value")
+        if not self.target_entry.get():
+            return
+        target = self.model.target
+        if target is None:
+            messagebox.showerror("Error", "Invalid timestamp value")
+        elif not INT64_MIN <= target <= INT64_MAX:
+            messagebox.showerror("Error", "Bookmarks must fit in a 64-bit integer of seconds")
+        elif self.model.target_ns % NANOS_PER_SECOND == 0 or messagebox.askyesno(
+                "Bookmark", f"Bookmarks keep whole seconds. Save TARGET rounded down to {target} "
+                            f"({format_timestamp(target)})?"):
+            self.save_timestamp(target)
+
+    def import_bookmarks(self):
+        """Bulk-import bookmarks from a CSV or JSONL file, then reload the list."""
+        from tkinter import filedialog
+
+        path = filedialog.askopenfilename(title="Import bookmarks", filetypes=BOOKMARK_FILE_TYPES)
+        if not path:
+            return
 
-    def validate_number(self, new_value: str) -> bool:
-        if new_value == "" or new_value == "-":
-            return True
+        def imported(result):
+            read, inserted, elapsed = result
+            self.day_counts.clear()  # Too many changes to apply one by one; months reload as they are shown
+            self.heat_month = None
+            self.update_calendar_heat()
+            self.load_timestamps()
+            self.refresh_near_target()
+            self.refresh_starred_clocks()
+            messagebox.showinfo("Import", f"Imported {inserted:,} of {read:,} bookmarks ({read - inserted:,} "
+                                          f"already present) in {elapsed:.2f} s, {rate(read, elapsed)}")
+
+        import_file(self.store, path, callback=imported, errback=lambda e: messagebox.showerror("Error", str(e)))
+
+    def export_bookmarks(self):
+        """Export every bookmark to a CSV or JSONL file."""
+        from tkinter import filedialog
+
+        path = filedialog.asksaveasfilename(title="Export bookmarks", filetypes=BOOKMARK_FILE_TYPES,
+                                            defaultextension=".csv")
+        if not path:
+            return
+
+        def exported(result):
+            count, elapsed = result
+            messagebox.showinfo("Export", f"Exported {count:,} bookmarks in {elapsed:.2f} s, {rate(count, elapsed)}")
+
+        export_file(self.store, path, callback=exported, errback=lambda e: messagebox.showerror("Error", str(e)))
+
+    def open_series_dialog(self):
+        """Preview the timestamps from TARGET stepping by a preset, and save the whole series to a file."""
+        if self.series_dialog is not None:
+            self.series_dialog.lift()
+            return
+        dialog = self.series_dialog = tk.Toplevel(self)
+        dialog.title("Series from TARGET")
+        dialog.transient(self)
+        dialog.protocol("WM_DELETE_WINDOW", self.close_series_dialog)
+        options = ttk.Frame(dialog)
+        options.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Label(options, text="Step:").grid(row=0, column=0, sticky=tk.W)
+        self.series_step_combo = ttk.Combobox(options, values=self.preset_options, width=10, state="readonly")
+        tail_preset = next((name for name, seconds in PRESETS.items() if seconds == self.model.tail), "DAY")
+        self.series_step_combo.set(tail_preset)
+        self.series_step_combo.grid(row=0, column=1, padx=2)
+        self.series_direction_combo = ttk.Combobox(options, values=("Forward", "Backward"), width=9,
+                                                   state="readonly")
+        self.series_direction_combo.set("Forward")
+        self.series_direction_combo.grid(row=0, column=2, padx=2)
+        ttk.Label(options, text="Until:").grid(row=1, column=0, sticky=tk.W)
+        self.series_until_entry = ttk.Entry(options, width=20)
+        self.series_until_entry.grid(row=1, column=1, columnspan=2, sticky=tk.EW, padx=2)
+        ttk.Label(options, text="Count:").grid(row=2, column=0, sticky=tk.W)
+        self.series_count_entry = ttk.Entry(options, width=20)
+        self.series_count_entry.insert(0, "1000")
+        self.series_count_entry.grid(row=2, column=1, columnspan=2, sticky=tk.EW, padx=2)
+        self.series_listbox = tk.Listbox(dialog, height=2 * SERIES_PREVIEW + 1, width=44, font=("Courier", 9))
+        self.series_listbox.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.series_status_label = ttk.Label(dialog, text="")
+        self.series_status_label.pack(fill=tk.X, padx=5)
+        self.series_dates_var = tk.BooleanVar(value=True)
+        save_frame = ttk.Frame(dialog)
+        save_frame.pack(pady=5)
+        ttk.Checkbutton(save_frame, text="Dates", variable=self.series_dates_var).pack(side=tk.LEFT, padx=2)
+        self.series_save_button = ttk.Button(save_frame, text="Save...", command=self.save_series)
+        self.series_save_button.pack(side=tk.LEFT, padx=2)
+        for combo in (self.series_step_combo, self.series_direction_combo):
+            combo.bind("<<ComboboxSelected>>", lambda e: self.update_series_preview())
+        for entry in (self.series_until_entry, self.series_count_entry):
+            entry.bind("<KeyRelease>", lambda e: self.update_series_preview())
+        self.update_series_preview()
+
+    def close_series_dialog(self):
+        self.series_dialog.destroy()
+        self.series_dialog = None
+
+    def series_options(self):
+        """Return (start, step, until, count) from TARGET and the series dialog; fields that don't parse are None."""
+        step = PRESETS[self.series_step_combo.get()]
+        if self.series_direction_combo.get() == "Backward":
+            step = -step
+        until_ns = parse_nanoseconds(self.series_until_entry.get())
+        until = None if until_ns is None else until_ns // NANOS_PER_SECOND
+        count_text = self.series_count_entry.get().strip()
+        count = int(count_text) if count_text.isdigit() else None
+        return self.model.target, step, until, count
+
+    def update_series_preview(self):
+        """Show the first and last points of the series; both are computed directly, whatever its length."""
+        start, step, until, count = self.series_options()
+        self.series_listbox.delete(0, tk.END)
+        if start is None:
+            self.series_status_label.config(text="No TARGET")
+            return
+        first, last, length = preview(start, step, until, count, SERIES_PREVIEW)
+        rows = [self.format_bookmark_row(ts, False) for ts in first]
+        if last:
+            if last[0] != start + len(first) * step:
+                rows.append("  ...")
+            rows.extend(self.format_bookmark_row(ts, False) for ts in last)
+        self.series_listbox.insert(tk.END, *rows)
+        self.series_status_label.config(text="Unbounded: set Until or Count to save" if length is None
+                                        else f"{length:,} points")
+        self.series_save_button.state(["disabled"] if length is None else ["!disabled"])
+
+    def save_series(self):
+        """Stream the whole series to a text file on a worker thread, one 'timestamp[<TAB>date]' line per point."""
+        from tkinter import filedialog
+
+        start, step, until, count = self.series_options()
+        if start is None or series_length(start, step, until, count) is None:
+            return
+        path = filedialog.asksaveasfilename(parent=self.series_dialog, title="Save series",
+                                            filetypes=SERIES_FILE_TYPES, defaultextension=".txt")
+        if not path:
+            return
+        dates = self.series_dates_var.get()
+        zone = None if self.model.zone is UTC else self.model.zone
+
+        def write():
+            began = time.perf_counter()
+            with open(path, "w", encoding="utf-8") as f:
+                written = write_series(f, start, step, until, count, dates, zone)
+            return written, time.perf_counter() - began
+
+        if self.series_executor is None:
+            self.series_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Series")
+        self.series_save_button.state(["disabled"])
+        self.watch_series_write(self.series_executor.submit(write))
+
+    def watch_series_write(self, future):
+        if not future.done():
+            self.after(50, self.watch_series_write, future)
+            return
+        if self.series_dialog is not None:
+            self.series_save_button.state(["!disabled"])
         try:
-            int(new_value)
-            return True
-        except ValueError:
-            return False
+            written, elapsed = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
+        messagebox.showinfo("Series", f"Wrote {written:,} points in {elapsed:.2f} s")
+
+    def validate_number(self, new_value: str) -> bool:
+        # Also lets through what is typed on the way to '-1.5', '1500ms' or '20 us'
+        return PARTIAL_NUMBER.fullmatch(new_value.lower()) is not None
 
     def use_current_timestamp(self):
-        current_ts = PosixTime.now()
-        self.target_entry.delete(0, tk.END)
-        self.target_entry.insert(0, str(current_ts))
-        self.update_labels()
+        self.model.use_current()
 
     def star_timestamp(self):
         selection = self.timestamp_listbox.curselection()
         if selection:
             index = selection[0]
-            timestamp = self.saved_timestamps[index]
-            cursor = self.db_conn.cursor()
-            cursor.execute("UPDATE timestamps SET starred = NOT starred WHERE timestamp = ?", (timestamp,))
-            self.db_conn.commit()
-            self.load_timestamps()
-            self.update_timestamp_list()
-            self.update_delete_button_state(index)
+            timestamp = self.model.bookmarks[index][0]
+            self.store.toggle_star(timestamp, callback=lambda changed: changed and self.model.toggle_bookmark_star(
+                timestamp))
 
     def edit_timestamp(self):
         selection = self.timestamp_listbox.curselection()
         if selection:
             index = selection[0]
-            old_timestamp = self.saved_timestamps[index]
+            old_timestamp = self.model.bookmarks[index][0]
             edit_dialog = tk.Toplevel(self)
             edit_dialog.title("Edit Timestamp")
             edit_dialog.geometry("300x100")
@@ -409,21 +836,36 @@ class TimestampApp(tk.Tk):
             edit_dialog.grab_set()
             ttk.Label(edit_dialog, text="New timestamp value:").pack(pady=5)
             entry = ttk.Entry(edit_dialog)
-            entry.insert(0, old_timestamp)
+            prefilled = format_nanoseconds(old_timestamp * NANOS_PER_SECOND, detect=True)
+            entry.insert(0, prefilled)
             entry.pack(pady=5)
 
             def save_edit():
-                try:
-                    new_timestamp = int(entry.get())
-                    cursor = self.db_conn.cursor()
-                    cursor.execute("UPDATE timestamps SET timestamp = ? WHERE timestamp = ?",
-                                   (new_timestamp, old_timestamp))
-                    self.db_conn.commit()
-                    self.load_timestamps()
-                    self.update_timestamp_list()
-                    edit_dialog.destroy()
-                except ValueError:
+                # Same unit detection as TARGET, so a pasted millisecond epoch is not taken for seconds;
+                # the untouched pre-filled value is the bookmark's own seconds whatever its size
+                text = entry.get()
+                new_ns = old_timestamp * NANOS_PER_SECOND if text == prefilled else parse_nanoseconds(text)
+                if new_ns is None:
                     messagebox.showerror("Error", "Invalid timestamp value")
+                    return
+                new_timestamp, fraction = divmod(new_ns, NANOS_PER_SECOND)
+                if fraction:
+                    messagebox.showerror("Error", f"Bookmarks keep whole seconds, and {entry.get().strip()} "
+                                                  f"is {format_nanoseconds(new_ns)} s")
+                    return
+                if not INT64_MIN <= new_timestamp <= INT64_MAX:
+                    messagebox.showerror("Error", "Bookmarks must fit in a 64-bit integer of seconds")
+                    return
+                self.store.update(old_timestamp, new_timestamp,
+                                  callback=lambda updated: edited(updated, new_timestamp))
+                edit_dialog.destroy()
+
+            def edited(updated, new_timestamp):
+                if updated:
+                    self.model.move_bookmark(old_timestamp, new_timestamp)
+                    self.adjust_day_counts((old_timestamp, -1), (new_timestamp, 1))
+                else:
+                    messagebox.showerror("Error", f"Timestamp {new_timestamp} is already bookmarked")
 
             ttk.Button(edit_dialog, text="Save", command=save_edit).pack(pady=5)
 
@@ -431,128 +873,203 @@ class TimestampApp(tk.Tk):
         selection = self.timestamp_listbox.curselection()
         if selection:
             index = selection[0]
-            timestamp = self.saved_timestamps[index]
-            cursor = self.db_conn.cursor()
-            cursor.execute("DELETE FROM timestamps WHERE timestamp = ?", (timestamp,))
-            self.db_conn.commit()
-            self.load_timestamps()
-            self.update_timestamp_list()
+            timestamp = self.model.bookmarks[index][0]
 
-    def update_labels(self):
-        try:
-            head = int(self.head_entry.get()) if self.head_entry.get() != "" else 0
-        except ValueError:
-            head = None
-        try:
-            target = int(self.target_entry.get()) if self.target_entry.get() != "" else None
-        except ValueError:
-            target = None
-        try:
-            tail = int(self.tail_entry.get()) if self.tail_entry.get() != "" else 0
-        except ValueError:
-            tail = None
+            def deleted(removed):
+                if removed:
+                    self.model.remove_bookmark(timestamp)
+                    self.adjust_day_counts((timestamp, -1))
+            self.store.delete(timestamp, callback=deleted)
 
-        if target is not None:
-            # Convert to UTC date
-            date_utc = datetime.fromtimestamp(target, tz=timezone.utc)
-            formatted_date = date_utc.strftime('%Y-%m-%d %H:%M:%S UTC')
-            self.target_date_label.config(text=f"Date: {formatted_date}")
+    def update_labels(self):
+        model = self.model
+        if model.target is not None:
+            self.set_text(self.target_date_label, f"Date: {model.target_date}")
 
             # Update day position label
-            day_of_month = date_utc.day
-            self.month_progress_group.config(text=f"POSITION IN DAY {day_of_month}")
-            self.update_day_progress(target)
-
-            # Temporarily enable calendar for updates
-            # self.calendar.config(state='normal')
-            self.calendar.selection_set(date_utc)
-            self.calendar.see(date_utc)
-            # self.calendar.config(state='disabled')
+            day_of_month = model.target_civil[2]
+            self.set_text(self.month_progress_group, f"POSITION IN DAY {day_of_month} "
+                          f"({WEEKDAY_NAMES[model.target_weekday]}, DAY {model.target_day_of_year} OF YEAR)")
+            self.update_day_progress()
+            self.update_calendar()
 
             # Update head and tail labels
             self.update_head_tail_labels()
         else:
-            self.target_date_label.config(text="Date: ")
-            self.month_progress_group.config(text="POSITION IN DAY -")
+            self.set_text(self.target_date_label, "Date: ")
+            self.set_text(self.month_progress_group, "POSITION IN DAY -")
 
             # Clear head and tail labels
-            self.head_duration_label.config(text="Duration: ")
-            self.head_date_label.config(text="Date (-HEAD): ")
-            self.tail_duration_label.config(text="Duration: ")
-            self.tail_date_label.config(text="Date (+TAIL): ")
+            self.set_text(self.head_duration_label, "Duration: ")
+            self.set_text(self.head_date_label, "Date (-HEAD): ")
+            self.set_text(self.tail_duration_label, "Duration: ")
+            self.set_text(self.tail_date_label, "Date (+TAIL): ")
+
+    def update_calendar(self):
+        """Select and show the TARGET date on the calendar, once it has been built."""
+        if self.calendar is None or self.model.target is None:
+            return
+        if self.model.target_civil == self.calendar_date:
+            return
+        self.calendar_date = self.model.target_civil
+        year, month, day_of_month = self.calendar_date
+        if not MINYEAR <= year <= MAXYEAR:
+            return  # The calendar widget works on datetime.date; keep its last date for far years
+        # Temporarily enable calendar for updates
+        # self.calendar.config(state='normal')
+        self.calendar.selection_set(date(year, month, day_of_month))
+        self.calendar.see(date(year, month, day_of_month))
+        # self.calendar.config(state='disabled')
+        self.update_calendar_heat()
+
+    def update_calendar_heat(self):
+        """Mark the displayed month's days by bookmark count, querying the month only if it is not cached."""
+        if self.calendar is None:
+            return
+        month, year = self.calendar.get_displayed_month()
+        if (year, month) == self.heat_month:
+            return
+        counts = self.day_counts.get(year, month)
+        if counts is not None:
+            self.show_calendar_heat(year, month, counts)
+        elif (year, month) not in self.day_counts_pending:
+            self.day_counts_pending.add((year, month))
+            version = self.day_counts.version
+            start, end = month_bounds(year, month)
+            self.store.day_counts(start, end, callback=lambda counts: self.day_counts_loaded(
+                year, month, counts, version))
+
+    def day_counts_loaded(self, year, month, counts, version):
+        self.day_counts_pending.discard((year, month))
+        if version == self.day_counts.version:
+            self.day_counts.put(year, month, counts)
+        # Otherwise the cache was cleared while querying and the counts may be stale; query again
+        self.update_calendar_heat()
+
+    def show_calendar_heat(self, year, month, counts):
+        """Replace the calendar's events with one per day of the month that has bookmarks."""
+        self.calendar.calevent_remove('all')
+        for day, count in counts.items():
+            self.calendar.calevent_create(date(*civil_from_days(day)),
+                                          f"{count} bookmark{'s' if count != 1 else ''}", heat_tag(count))
+        self.heat_month = (year, month)
+
+    def adjust_day_counts(self, *changes):
+        """Apply (timestamp, +1 or -1) bookmark changes to the cached counts, redrawing the shown month if needed."""
+        for timestamp, delta in changes:
+            if self.day_counts.adjust(timestamp, delta) == self.heat_month:
+                self.heat_month = None
+        self.update_calendar_heat()
 
     def increment_target(self):
-        try:
-            current = int(self.target_entry.get()) if self.target_entry.get() else 0
-            self.target_entry.delete(0, tk.END)
-            self.target_entry.insert(0, str(current + 1))
-            self.update_labels()
-        except ValueError:
-            pass
+        # An empty TARGET counts as 0; any other unparsable text is left alone
+        if self.model.target is not None or not self.target_entry.get():
+            self.model.step_target(1)
 
     def decrement_target(self):
-        try:
-            current = int(self.target_entry.get()) if self.target_entry.get() else 0
-            self.target_entry.delete(0, tk.END)
-            self.target_entry.insert(0, str(current - 1))
-            self.update_labels()
-        except ValueError:
-            pass
+        if self.model.target is not None or not self.target_entry.get():
+            self.model.step_target(-1)
 
     def update_head_tail_labels(self):
+        model = self.model
+        if model.head_timestamp is not None:
+            self.set_text(self.head_duration_label, f"Duration: {model.head_duration}")
+            self.set_text(self.head_date_label,
+                          f"Date (-HEAD): {model.head_date} | POSIX: {format_nanoseconds(model.head_timestamp_ns)}")
+        else:
+            self.set_text(self.head_duration_label, "Duration: ")
+            self.set_text(self.head_date_label, "Date (-HEAD): ")
+
+        if model.tail_timestamp is not None:
+            self.set_text(self.tail_duration_label, f"Duration: {model.tail_duration}")
+            self.set_text(self.tail_date_label,
+                          f"Date (+TAIL): {model.tail_date} | POSIX: {format_nanoseconds(model.tail_timestamp_ns)}")
+        else:
+            self.set_text(self.tail_duration_label, "Duration: ")
+            self.set_text(self.tail_date_label, "Date (+TAIL): ")
+
+    def tick(self):
+        """Once-a-second tick driving the window title and every clock in the clock panel."""
+        now = int(time.time())
+        if now != self.last_tick:
+            self.last_tick = now
+            self.title(f"POSIX Timestamp Converter - POSIX: {now:,} | Timestamp: {format_timestamp(now)}")
+            self.update_clocks(now)
+        # Aim just past the next second boundary from the wall clock, so lateness never accumulates
+        self.after(1001 - int(time.time() * 1000) % 1000, self.tick)
+
+    def update_clocks(self, now=None):
+        """Render the clocks and configure only the rows whose text changed."""
+        for index, text in self.clock_board.tick(int(time.time()) if now is None else now):
+            self.clock_rows[index][1].config(text=text)
+
+    def set_display_zone(self, name, save=True):
+        """Show TARGET, HEAD, TAIL and bookmark dates in an IANA zone, 'localtime' or 'UTC'."""
+        name = name.strip()
         try:
-            target = int(self.target_entry.get()) if self.target_entry.get() != "" else None
-            head_value = self.head_entry.get()
-            if head_value and target:
-                head_seconds = int(head_value)
-                head_timestamp = target - head_seconds
-                head_date = datetime.fromtimestamp(head_timestamp, tz=timezone.utc)
-                self.head_duration_label.config(text=f"Duration: {seconds_to_text(head_seconds)}")
-                self.head_date_label.config(
-                    text=f"Date (-HEAD): {head_date.strftime('%Y-%m-%d %H:%M:%S UTC')} | POSIX: {head_timestamp}")
-            else:
-                self.head_duration_label.config(text="Duration: ")
-                self.head_date_label.config(text="Date (-HEAD): ")
-
-            tail_value = self.tail_entry.get()
-            if tail_value and target:
-                tail_seconds = int(tail_value)
-                tail_timestamp = target + tail_seconds
-                tail_date = datetime.fromtimestamp(tail_timestamp, tz=timezone.utc)
-                self.tail_duration_label.config(text=f"Duration: {seconds_to_text(tail_seconds)}")
-                self.tail_date_label.config(
-                    text=f"Date (+TAIL): {tail_date.strftime('%Y-%m-%d %H:%M:%S UTC')} | POSIX: {tail_timestamp}")
+            zone = get_zone(name)
+        except ZoneInfoNotFoundError:
+            messagebox.showerror("Error", f"Unknown time zone {name}")
+            self.zone_combo.set(self.model.zone.name)
+            return
+        self.zone_combo.set(name)
+        self.model.set_zone(zone)
+        if save:
+            self.store.set_setting("display_zone", name)
+
+    def set_clock_zones(self, setting):
+        """Apply the "clock_zones" setting, a comma-separated list of IANA zone names."""
+        self.clock_zones = [zone for zone in (name.strip() for name in setting.split(",")) if zone]
+        self.show_clocks()
+
+    def refresh_starred_clocks(self):
+        """Reload the starred bookmarks shown as clocks; bursts of changes collapse into one query."""
+        if self.starred_query_pending:
+            self.starred_query_dirty = True
+            return
+        self.starred_query_pending = True
+
+        def loaded(timestamps):
+            self.starred_query_pending = False
+            if self.starred_query_dirty:
+                self.starred_query_dirty = False
+                self.refresh_starred_clocks()
+            elif timestamps != self.starred_clocks:
+                self.starred_clocks = timestamps
+                self.show_clocks()
+
+        self.store.starred_bookmarks(MAX_STARRED_CLOCKS, callback=loaded)
+
+    def show_clocks(self):
+        """Rebuild the clock list (UTC, zones, TARGET countdown, starred bookmarks) and render it."""
+        clocks = [utc_clock()]
+        clocks += [clock for clock in map(zone_clock, self.clock_zones) if clock is not None]
+        clocks.append(countdown_clock(lambda: self.model.target))
+        clocks += [elapsed_clock(timestamp) for timestamp in self.starred_clocks]
+        self.clock_board.set_clocks(clocks)
+        # Reuse the existing label rows, adding or hiding rows as the clock count changes
+        while len(self.clock_rows) < len(clocks):
+            row = len(self.clock_rows)
+            name_label = ttk.Label(self.clocks_group, text="")
+            value_label = ttk.Label(self.clocks_group, text="")
+            name_label.grid(row=row, column=0, sticky=tk.W, padx=5)
+            value_label.grid(row=row, column=1, sticky=tk.W, padx=(0, 5))
+            self.clock_rows.append((name_label, value_label))
+        for index, (name_label, value_label) in enumerate(self.clock_rows):
+            if index < len(clocks):
+                name_label.grid()
+                value_label.grid()
+                self.set_text(name_label, clocks[index].name)
             else:
-                self.tail_duration_label.config(text="Duration: ")
-                self.tail_date_label.config(text="Date (+TAIL): ")
-        except ValueError:
-            self.head_duration_label.config(text="Duration: ")
-            self.head_date_label.config(text="Date (-HEAD): ")
-            self.tail_duration_label.config(text="Duration: ")
-            self.tail_date_label.config(text="Date (+TAIL): ")
-
-    def update_timer(self):
-        now_dt = datetime.utcnow()
-        ts = int(now_dt.timestamp())
-        formatted_ts = f"{ts:,}"
-        formatted_date = now_dt.strftime("%Y-%m-%d %H:%M:%S")
-        self.title(f"POSIX Timestamp Converter - POSIX: {formatted_ts} | Timestamp: {formatted_date}")
-        delay = 1000 - (now_dt.microsecond // 1000)
-        self.after(delay, self.update_timer)
+                name_label.grid_remove()
+                value_label.grid_remove()
+        self.update_clocks()
 
     def set_head_from_preset(self, event=None):
-        preset = self.head_combo.get()
-        if preset in self.preset_mapping:
-            self.head_entry.delete(0, tk.END)
-            self.head_entry.insert(0, self.preset_mapping[preset])
-            self.update_labels()
+        self.model.apply_head_preset(self.head_combo.get())
 
     def set_tail_from_preset(self, event=None):
-        preset = self.tail_combo.get()
-        if preset in self.preset_mapping:
-            self.tail_entry.delete(0, tk.END)
-            self.tail_entry.insert(0, self.preset_mapping[preset])
-            self.update_labels()
+        self.model.apply_tail_preset(self.tail_combo.get())
 
     def update_timestamp_list(self):
         """
@@ -562,22 +1079,93 @@ class TimestampApp(tk.Tk):
         """
         self.timestamp_listbox.delete(0, tk.END)  # Clear the existing listbox items
 
-        # Combine starred and regular timestamps into a single list with a flag for "starred"
-        timestamps = []
-        for ts in self.starred_timestamps:
-            timestamps.append((int(ts), True))  # Flag as starred
-        for ts in self.saved_timestamps:
-            if ts not in self.starred_timestamps:
-                timestamps.append((int(ts), False))  # Flag as regular
+        # The model keeps rows sorted by timestamp
+        for timestamp, is_starred in self.model.bookmarks:
+            self.timestamp_listbox.insert(tk.END, self.format_bookmark_row(timestamp, is_starred))
 
-        # Sort timestamps numerically in ascending order
-        timestamps.sort(key=lambda x: x[0])  # Sort by numerical POSIX timestamp
+    def format_bookmark_row(self, timestamp, is_starred):
+        """Format a Listbox row as [* or space] [timestamp] [ymd hms], UTC unless another zone is displayed."""
+        prefix = "* " if is_starred else "  "  # Add '*' for starred timestamps
+        zone = self.model.zone
+        return f"{prefix}{timestamp} {format_timestamp(timestamp) if zone is UTC else zone.format(timestamp)}"
 
-        # Populate the Listbox, with each entry formatted as [* or space] [timestamp] [ymd hms UTC]
-        for timestamp, is_starred in timestamps:
-            utc_time = datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
-            prefix = "* " if is_starred else "  "  # Add '*' for starred timestamps
-            self.timestamp_listbox.insert(tk.END, f"{prefix}{timestamp} {utc_time}")
+    def on_bookmarks_changed(self, action, index, row):
+        """Apply a single bookmark change to the Listbox, touching only the affected row."""
+        self.bookmark_view.set_position(self.model.bookmark_offset, self.model.bookmark_total)
+        if action == "reset":
+            self.update_timestamp_list()
+            self.delete_button.state(['disabled'])
+            return
+        # The stored bookmarks changed, not just the scroll position
+        self.refresh_near_target()
+        self.refresh_starred_clocks()
+        if action != "shift":
+            selected = index in self.timestamp_listbox.curselection()
+            if action in ("delete", "update"):
+                self.timestamp_listbox.delete(index)
+            if action in ("insert", "update"):
+                self.timestamp_listbox.insert(index, self.format_bookmark_row(*row))
+            if action == "update" and selected:
+                self.timestamp_listbox.selection_set(index)
+            if selected or action == "delete":
+                self.update_delete_button_state(self.timestamp_listbox.curselection()[0]
+                                                if self.timestamp_listbox.curselection() else -1)
+        if self.model.bookmark_window_short():
+            # Refill rows freed by a delete, from below or, on the last page, from above
+            self.request_bookmarks(self.bookmark_view.first)
+
+    def refresh_near_target(self):
+        """Query the NEAR TARGET panel rows in the background; bursts of changes collapse into one query."""
+        if self.near_query_pending:
+            self.near_query_dirty = True
+            return
+        model = self.model
+        if model.target is None:
+            self.set_text(self.window_count_label, "In window: ")
+            self.window_listbox.delete(0, tk.END)
+            self.nearest_listbox.delete(0, tk.END)
+            self.window_rows, self.nearest_rows = [], []
+            return
+        self.near_query_pending = True
+        target = model.target
+        in_window = []
+
+        def nearest_loaded(rows):
+            self.near_query_pending = False
+            if self.near_query_dirty:
+                self.near_query_dirty = False
+                self.refresh_near_target()
+                return
+            if rows is None or in_window[0] is None:
+                self.show_near_target(target, 0, [], [])  # A query failed; the store has reported why
+                return
+            self.show_near_target(target, *in_window[0], rows)
+
+        # The store clamps the bounds and TARGET to the 64-bit range bookmarks are kept in; the errbacks
+        # make sure a failed query still ends this round, so the panel keeps following TARGET.
+        self.store.bookmarks_between(model.window_start, model.window_end, limit=100, callback=in_window.append,
+                                     errback=lambda e: in_window.append(None))
+        self.store.nearest_bookmarks(target, 3, callback=nearest_loaded, errback=lambda e: nearest_loaded(None))
+
+    def show_near_target(self, target, window_count, window_rows, nearest_rows):
+        more = f" (first {len(window_rows)} shown)" if window_count > len(window_rows) else ""
+        self.set_text(self.window_count_label, f"In window: {window_count}{more}")
+        self.window_listbox.delete(0, tk.END)
+        for timestamp, is_starred in window_rows:
+            self.window_listbox.insert(tk.END, self.format_bookmark_row(timestamp, is_starred))
+        self.nearest_listbox.delete(0, tk.END)
+        for timestamp, is_starred in nearest_rows:
+            delta = timestamp - target
+            offset = "+" + seconds_to_text(delta, output_format=-3) if delta > 0 else seconds_to_text(delta, -3) or "0"
+            prefix = "* " if is_starred else "  "
+            self.nearest_listbox.insert(tk.END, f"{prefix}{timestamp} {offset}")
+        self.window_rows, self.nearest_rows = window_rows, nearest_rows
+
+    def select_near_row(self, listbox, rows):
+        """Set TARGET to the bookmark picked in one of the NEAR TARGET lists."""
+        selection = listbox.curselection()
+        if selection and selection[0] < len(rows):
+            self.model.set_target(rows[selection[0]][0])
 
     def update_delete_button_state(self, index):
         """
@@ -602,38 +1190,22 @@ class TimestampApp(tk.Tk):
             # Invalid index or no selection, disable the 'Delete' button
             self.delete_button.state(['disabled'])
 
-    def set_target_from_progress(self, event):
-        """Update TARGET based on progress bar click/drag, constrained within the TARGET-selected date."""
-        # Get the current TARGET date as the base
-        current_target = self.get_target_datetime()
-        if not current_target:
-            return
+    def drag_progress(self, event):
+        """Apply progress bar drags at most once per frame; in between only the latest position is kept."""
+        if self.drag_event is None:
+            self.after(16, self.apply_drag)  # About 60 Hz
+        self.drag_event = event
 
-        # Calculate the start and end of the day for the TARGET date
-        start_of_day = datetime(current_target.year, current_target.month, current_target.day,
-                                tzinfo=timezone.utc).timestamp()
-        end_of_day = datetime(current_target.year, current_target.month, current_target.day, 23, 59, 59,
-                              tzinfo=timezone.utc).timestamp()
+    def apply_drag(self):
+        event, self.drag_event = self.drag_event, None
+        self.set_target_from_progress(event)
 
-        # Get the click position
+    def set_target_from_progress(self, event):
+        """Update TARGET based on progress bar click/drag, constrained within the TARGET-selected date."""
         canvas_width = self.day_progress_canvas.winfo_width()
         if canvas_width > 0:
-            # Calculate the progress as a decimal (from 0.0 to 1.0)
-            click_x = event.x
-            progress = click_x / canvas_width
-
-            # Map progress to the timestamp range for the current TARGET-selected day
-            target = start_of_day + (progress * (end_of_day - start_of_day))
-
-            # Clamp the value to ensure the target stays within the day
-            target = max(start_of_day, min(target, end_of_day))
-
-            # Update TARGET entry
-            self.target_entry.delete(0, tk.END)
-            self.target_entry.insert(0, str(int(target)))
-
-            # Update labels and other UI elements
-            self.update_labels()
+            # Map the click position to the TARGET-selected day
+            self.model.use_day_position(event.x, canvas_width)
 
     def select_timestamp(self, event):
         """
@@ -650,15 +1222,8 @@ class TimestampApp(tk.Tk):
             # Retrieve the index of the selected item
             index = selection[0]
 
-            # Access the associated saved timestamp
-            selected_timestamp = self.saved_timestamps[index]
-
-            # Set the TARGET entry to the selected timestamp value
-            self.target_entry.delete(0, tk.END)
-            self.target_entry.insert(0, selected_timestamp)
-
-            # Update labels and any dependent UI elements
-            self.update_labels()
+            # Set TARGET to the selected timestamp; the model refreshes dependent UI elements
+            self.model.set_target(self.model.bookmarks[index][0])
 
             # Update the delete button state based on the selected timestamp
             self.update_delete_button_state(index)
@@ -668,62 +1233,23 @@ class TimestampApp(tk.Tk):
 
     def use_days_first_second(self):
         """Set the TARGET entry to the first second of the date in TARGET."""
-        current_target = self.get_target_datetime()
-        if current_target:
-            start_of_day = datetime(current_target.year, current_target.month, current_target.day,
-                                    tzinfo=timezone.utc).timestamp()
-            self.target_entry.delete(0, tk.END)
-            self.target_entry.insert(0, str(int(start_of_day)))
-            self.update_labels()
+        self.model.use_day_start()
 
     def use_days_last_second(self):
         """Set the TARGET entry to the last second of the date in TARGET."""
-        current_target = self.get_target_datetime()
-        if current_target:
-            end_of_day = datetime(current_target.year, current_target.month, current_target.day, 23, 59, 59,
-                                  tzinfo=timezone.utc).timestamp()
-            self.target_entry.delete(0, tk.END)
-            self.target_entry.insert(0, str(int(end_of_day)))
-            self.update_labels()
+        self.model.use_day_end()
 
     def use_calendar_date(self):
         """Update the TARGET when selecting a new date, preserving the current time."""
-        # Get the currently selected time (hour, minute, second) from TARGET
-        current_target = self.get_target_datetime()
-        if not current_target:
-            return  # If TARGET is invalid, do nothing
-
-        # Extract the currently selected hour, minute, and second
-        current_time = (current_target.hour, current_target.minute, current_target.second)
-
-        # Get the new date selected on the calendar
         calendar_date = self.calendar.get_date()  # Returns 'yyyy-mm-dd' string
-        new_date = datetime.strptime(calendar_date, "%Y-%m-%d")  # Convert selected date to datetime object
-
-        # Combine the selected date with the current time
-        new_target = datetime(new_date.year, new_date.month, new_date.day,
-                              current_time[0], current_time[1], current_time[2], tzinfo=timezone.utc).timestamp()
-
-        # Update the TARGET entry with the newly calculated timestamp
-        self.target_entry.delete(0, tk.END)
-        self.target_entry.insert(0, str(int(new_target)))
-
-        # Update labels and refresh the UI
-        self.update_labels()
-
-    def get_target_datetime(self):
-        """Parse the TARGET timestamp into a datetime object."""
-        try:
-            target_timestamp = int(self.target_entry.get().strip())
-            return datetime.fromtimestamp(target_timestamp, tz=timezone.utc)
-        except ValueError:
-            # Handle invalid input gracefully
-            self.target_entry.delete(0, tk.END)
-            self.target_entry.insert(0, str(int(PosixTime.now())))  # Reset to current timestamp
-            self.update_labels()
-            return None
+        year, month, day = (int(part) for part in calendar_date.split("-"))
+        self.model.use_date(year, month, day)
 
 
 if __name__ == "__main__":
-    app = TimestampApp()
+    parser = argparse.ArgumentParser(description="POSIX Timestamp Converter")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="report time to first paint and, on exit, label refresh counts (on stderr)")
+    args = parser.parse_args()
+    app = TimestampApp(startup_profile=args.startup_profile)
     app.mainloop()
@@ -0,0 +1,65 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class VirtualListbox(ttk.Frame):
+    """
+    Listbox that shows a window onto a list too long to load at once.
+
+    Only the rows currently on screen are inserted into the Listbox. Scrolling
+    (scrollbar, mouse wheel, Page Up/Down) calls on_scroll(first) with the
+    index of the first row that should be visible; the owner fetches those
+    rows, fills the Listbox and reports the position back with set_position().
+    """
+
+    def __init__(self, master, on_scroll=None, font=None, **listbox_options):
+        super().__init__(master)
+        self.on_scroll = on_scroll
+        self.font = font
+        self.total = 0
+        self.first = 0
+        self.listbox = tk.Listbox(self, font=font, **listbox_options)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.visible_rows = int(self.listbox.cget("height") or 10)
+
+        self.listbox.bind("<Configure>", self._on_configure)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll_by(-3 if e.delta > 0 else 3))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.listbox.bind("<Prior>", lambda e: self.scroll_by(-self.visible_rows))
+        self.listbox.bind("<Next>", lambda e: self.scroll_by(self.visible_rows))
+
+    def set_position(self, first: int, total: int):
+        """Record which slice of the full list is shown and update the scrollbar."""
+        self.first = first
+        self.total = total
+        if total <= 0:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(first / total, min(1.0, (first + self.visible_rows) / total))
+
+    def scroll_to(self, first: int):
+        first = max(0, min(first, self.total - self.visible_rows))
+        if self.on_scroll is not None:
+            self.on_scroll(first)
+
+    def scroll_by(self, rows: int):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_by(int(args[1]) * step)
+
+    def _on_configure(self, event):
+        # Rows that fit in the Listbox at its current height
+        line_height = self.font.metrics("linespace") if self.font is not None else 16
+        rows = max(1, (event.height - 4) // line_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.scroll_to(self.first)
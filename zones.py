@@ -0,0 +1,338 @@
+import os
+import struct
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from zoneinfo import TZPATH, ZoneInfoNotFoundError
+
+from civil import SECONDS_PER_DAY, civil_from_days, days_from_civil, days_in_month
+from core import NANOS_PER_SECOND, format_timestamp, format_timestamp_ns
+
+
+# Time zone offsets without per-call zoneinfo/datetime overhead.
+#
+# Each zone's TZif file is parsed once into a sorted list of transition times
+# with the UTC offset and abbreviation in effect from each one; the list is
+# extended with the zone's POSIX TZ rule up to TABLE_END_YEAR. Looking up an
+# offset is then a bisect, and batches of timestamps use one searchsorted.
+
+TABLE_END_YEAR = 2100
+
+
+def _parse_offset(text: str, pos: int) -> Tuple[int, int]:
+    """Parse [+-]hh[:mm[:ss]] at pos and return (seconds, end position)."""
+    sign = 1
+    if pos < len(text) and text[pos] in "+-":
+        sign = -1 if text[pos] == "-" else 1
+        pos += 1
+    parts = []
+    while True:
+        start = pos
+        while pos < len(text) and text[pos].isdigit():
+            pos += 1
+        parts.append(int(text[start:pos]))
+        if len(parts) == 3 or pos >= len(text) or text[pos] != ":":
+            break
+        pos += 1
+    hours, minutes, seconds = (parts + [0, 0])[:3]
+    return sign * (hours * 3600 + minutes * 60 + seconds), pos
+
+
+def _parse_name(text: str, pos: int) -> Tuple[str, int]:
+    """Parse a zone abbreviation, plain ('EST') or quoted ('<+03>')."""
+    if text[pos] == "<":
+        end = text.index(">", pos)
+        return text[pos + 1:end], end + 1
+    start = pos
+    while pos < len(text) and text[pos].isalpha():
+        pos += 1
+    return text[start:pos], pos
+
+
+def _parse_date_rule(text: str, pos: int) -> Tuple[tuple, int]:
+    """Parse one ',Jn', ',n' or ',Mm.w.d' rule with its optional '/time' (default 02:00)."""
+    if text[pos] == "M":
+        end = pos + 1
+        while end < len(text) and text[end] not in ",/":
+            end += 1
+        month, week, weekday = (int(part) for part in text[pos + 1:end].split("."))
+        rule, pos = ("M", month, week, weekday), end
+    else:
+        kind = "J" if text[pos] == "J" else "n"
+        start = pos + (kind == "J")
+        end = start
+        while end < len(text) and text[end].isdigit():
+            end += 1
+        rule, pos = (kind, int(text[start:end])), end
+    at = 7200
+    if pos < len(text) and text[pos] == "/":
+        at, pos = _parse_offset(text, pos + 1)
+    return rule + (at,), pos
+
+
+def _rule_day(rule: tuple, year: int) -> int:
+    """Return the day number a date rule falls on in year."""
+    if rule[0] == "M":
+        _, month, week, weekday, _ = rule
+        first = days_from_civil(year, month, 1)
+        day = first + (weekday - (first + 4) % 7) % 7 + (week - 1) * 7  # 1970-01-01 was a Thursday (4)
+        while day >= first + days_in_month(year, month):
+            day -= 7  # Week 5 means the last such weekday of the month
+        return day
+    jan1 = days_from_civil(year, 1, 1)
+    if rule[0] == "J":
+        # 1..365, February 29th is never counted
+        leap = days_in_month(year, 2) == 29
+        return jan1 + rule[1] - 1 + (leap and rule[1] >= 60)
+    return jan1 + rule[1]
+
+
+class PosixRule:
+    """
+    A POSIX TZ string such as 'EST5EDT,M3.2.0,M11.1.0', the rule TZif files
+    use for times after their last listed transition.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.std_name, pos = _parse_name(text, 0)
+        offset, pos = _parse_offset(text, pos)
+        self.std_offset = -offset  # POSIX offsets count hours west of UTC
+        self.dst_name = None
+        self.dst_offset = self.std_offset
+        self.start = self.end = None
+        if pos < len(text):
+            self.dst_name, pos = _parse_name(text, pos)
+            self.dst_offset = self.std_offset + 3600
+            if pos < len(text) and text[pos] != ",":
+                offset, pos = _parse_offset(text, pos)
+                self.dst_offset = -offset
+            if pos < len(text):
+                self.start, pos = _parse_date_rule(text, pos + 1)
+                self.end, pos = _parse_date_rule(text, pos + 1)
+        if pos != len(text):
+            raise ValueError(f"Unexpected text in POSIX TZ rule {text!r} at {pos}")
+
+    def transitions(self, year: int) -> List[Tuple[int, int, str]]:
+        """Return the (utc time, offset, abbreviation) changes in year, sorted by time."""
+        if self.start is None:
+            return []
+        # The start time is given in standard time and the end time in daylight time
+        start = _rule_day(self.start, year) * SECONDS_PER_DAY + self.start[-1] - self.std_offset
+        end = _rule_day(self.end, year) * SECONDS_PER_DAY + self.end[-1] - self.dst_offset
+        return sorted([(start, self.dst_offset, self.dst_name), (end, self.std_offset, self.std_name)])
+
+    @lru_cache(maxsize=64)
+    def _year_entries(self, year: int) -> List[Tuple[int, int, str]]:
+        return self.transitions(year - 1) + self.transitions(year)
+
+    def lookup(self, ts: int) -> Tuple[int, str]:
+        """Return (offset, abbreviation) in effect at ts."""
+        if self.start is None:
+            return self.std_offset, self.std_name
+        year = civil_from_days((ts + self.std_offset) // SECONDS_PER_DAY)[0]
+        result = (self.std_offset, self.std_name)
+        for when, offset, name in self._year_entries(year) + self.transitions(year + 1)[:1]:
+            if when > ts:
+                break
+            result = (offset, name)
+        return result
+
+
+def _read_tzif(name: str) -> bytes:
+    """Find a zone's TZif data in the system time zone directories or the tzdata package."""
+    if not name or name.startswith("/") or ".." in name.split("/"):
+        raise ZoneInfoNotFoundError(f"No time zone found with key {name}")
+    for root in TZPATH:
+        path = os.path.join(root, name)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                return f.read()
+    try:
+        from importlib import resources
+        package, _, resource = f"tzdata.zoneinfo.{name}".replace("/", ".").rpartition(".")
+        return resources.files(package).joinpath(resource).read_bytes()
+    except (ImportError, OSError, ValueError):
+        raise ZoneInfoNotFoundError(f"No time zone found with key {name}") from None
+
+
+def _parse_tzif(data: bytes) -> Tuple[List[int], List[int], List[str], int, str, Optional[str]]:
+    """Return (times, offsets, names, initial offset, initial name, footer rule) from TZif data."""
+    if data[:4] != b"TZif":
+        raise ValueError("not a TZif file")
+    version = data[4:5]
+    counts = struct.unpack(">6l", data[20:44])
+    time_size = 4
+    pos = 44
+    if version >= b"2":
+        # Skip the 32-bit block; the 64-bit one after it covers the full range
+        isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt = counts
+        pos += timecnt * 5 + typecnt * 6 + charcnt + leapcnt * 8 + isstdcnt + isutcnt
+        counts = struct.unpack(">6l", data[pos + 20:pos + 44])
+        pos += 44
+        time_size = 8
+    isutcnt, isstdcnt, leapcnt, timecnt, typecnt, charcnt = counts
+    times = list(struct.unpack(f">{timecnt}{'q' if time_size == 8 else 'l'}", data[pos:pos + timecnt * time_size]))
+    pos += timecnt * time_size
+    indices = data[pos:pos + timecnt]
+    pos += timecnt
+    types = [struct.unpack(">lBB", data[pos + 6 * i:pos + 6 * i + 6]) for i in range(typecnt)]
+    pos += typecnt * 6
+    chars = data[pos:pos + charcnt]
+    pos += charcnt + leapcnt * (time_size + 4) + isstdcnt + isutcnt
+
+    def name_at(index):
+        return chars[index:chars.index(b"\0", index)].decode("ascii", "replace")
+
+    offsets = [types[i][0] for i in indices]
+    names = [name_at(types[i][2]) for i in indices]
+    footer = None
+    if time_size == 8:
+        text = data[pos:].strip(b"\n").decode("ascii", "replace")
+        footer = text or None
+    return times, offsets, names, types[0][0], name_at(types[0][2]), footer
+
+
+class Zone:
+    """
+    A time zone resolved to a sorted transition table.
+
+    times[i] is the UTC time from which offsets[i] seconds east of UTC and the
+    abbreviation names[i] apply; before times[0] the zone's initial offset
+    applies, and after the table ends the zone's POSIX rule does.
+    """
+
+    def __init__(self, name: str, times: List[int], offsets: List[int], names: List[str],
+                 initial: Tuple[int, str], rule: Optional[PosixRule] = None):
+        self.name = name
+        self.initial = initial
+        self.rule = rule
+        times, offsets, names = list(times), list(offsets), list(names)
+        if rule is not None and rule.start is not None:
+            last = times[-1] if times else -2 ** 63
+            first_year = civil_from_days(last // SECONDS_PER_DAY)[0] if times else 1970
+            for year in range(first_year, TABLE_END_YEAR + 1):
+                for when, offset, abbreviation in rule.transitions(year):
+                    if when > last:
+                        times.append(when)
+                        offsets.append(offset)
+                        names.append(abbreviation)
+            self.table_end = days_from_civil(TABLE_END_YEAR + 1, 1, 1) * SECONDS_PER_DAY
+        else:
+            self.table_end = None  # The last entry holds forever
+        if rule is not None and rule.start is None and (not offsets or offsets[-1] != rule.std_offset):
+            times.append(times[-1] + 1 if times else -2 ** 63)
+            offsets.append(rule.std_offset)
+            names.append(rule.std_name)
+        self.times = times
+        self.offsets = offsets
+        self.names = names
+        self._arrays = None
+
+    def lookup(self, ts: int) -> Tuple[int, str]:
+        """Return (offset in seconds east of UTC, abbreviation) in effect at ts."""
+        if self.table_end is not None and ts >= self.table_end:
+            return self.rule.lookup(ts)
+        index = bisect_right(self.times, ts) - 1
+        if index < 0:
+            return self.initial
+        return self.offsets[index], self.names[index]
+
+    def utcoffset(self, ts: int) -> int:
+        return self.lookup(ts)[0]
+
+    def local(self, ts: int) -> int:
+        """Shift a POSIX timestamp to wall-clock seconds in this zone."""
+        return ts + self.lookup(ts)[0]
+
+    def format(self, ts: int) -> str:
+        """Format ts as 'YYYY-MM-DD HH:MM:SS ABBR' in this zone."""
+        offset, abbreviation = self.lookup(ts)
+        return f"{format_timestamp(ts + offset)} {abbreviation}"
+
+    def format_ns(self, ns: int) -> str:
+        """format() for integer nanoseconds, with the fraction of a second when there is one."""
+        offset, abbreviation = self.lookup(ns // NANOS_PER_SECOND)
+        return f"{format_timestamp_ns(ns + offset * NANOS_PER_SECOND)} {abbreviation}"
+
+    def utcoffset_many(self, timestamps) -> "np.ndarray":
+        """Offsets for an array of timestamps, with one searchsorted over the transition table."""
+        import numpy as np
+
+        values = np.asarray(timestamps, dtype=np.int64)
+        if self._arrays is None:
+            self._arrays = (np.asarray(self.times, dtype=np.int64),
+                            np.asarray([self.initial[0]] + self.offsets, dtype=np.int64))
+        times, offsets = self._arrays
+        result = offsets[np.searchsorted(times, values, side="right")]
+        if self.table_end is not None:
+            beyond = np.flatnonzero(values >= self.table_end)
+            for i in beyond.tolist():
+                result[i] = self.rule.lookup(int(values[i]))[0]
+        return result
+
+    def local_many(self, timestamps) -> "np.ndarray":
+        """Batch version of local()."""
+        import numpy as np
+
+        values = np.asarray(timestamps, dtype=np.int64)
+        return values + self.utcoffset_many(values)
+
+    def __repr__(self):
+        return f"Zone({self.name!r})"
+
+
+UTC = Zone("UTC", [], [], [], (0, "UTC"))
+
+
+@lru_cache(maxsize=None)
+def get_zone(name: str) -> Zone:
+    """
+    Return the zone for an IANA name such as 'Europe/Paris', loading it on first use.
+
+    Raises:
+        ZoneInfoNotFoundError: If no zone data exists for name.
+    """
+    if name in ("UTC", "Etc/UTC"):
+        return UTC
+    if name == "localtime":
+        return local_zone()
+    data = _read_tzif(name)
+    try:
+        times, offsets, names, initial, initial_name, footer = _parse_tzif(data)
+    except (ValueError, struct.error, IndexError) as e:
+        raise ZoneInfoNotFoundError(f"Invalid time zone data for {name}: {e}") from None
+    return Zone(name, times, offsets, names, (initial, initial_name), PosixRule(footer) if footer else None)
+
+
+@lru_cache(maxsize=None)
+def local_zone() -> Zone:
+    """
+    The system's local zone, from TZ (a zone key, a TZif path or a POSIX rule
+    such as 'EST5EDT,M3.2.0,M11.1.0') or /etc/localtime, else a fixed offset
+    from the C library.
+    """
+    name = os.environ.get("TZ", "").lstrip(":")
+    candidates = [name] if name else []
+    if os.path.exists("/etc/localtime"):
+        candidates.append("/etc/localtime")
+    for candidate in candidates:
+        try:
+            if candidate.startswith("/"):
+                with open(candidate, "rb") as f:
+                    times, offsets, names, initial, initial_name, footer = _parse_tzif(f.read())
+                return Zone("localtime", times, offsets, names, (initial, initial_name),
+                            PosixRule(footer) if footer else None)
+            try:
+                zone = get_zone(candidate)
+            except ZoneInfoNotFoundError:
+                # Not a zone key; TZ may hold a POSIX rule itself, as the C library allows. The
+                # table starts in 1970 and, as in glibc, earlier times keep the offset of 1970-01-01.
+                rule = PosixRule(candidate)
+                return Zone("localtime", [], [], [], rule.lookup(0), rule)
+            return Zone("localtime", zone.times, zone.offsets, zone.names, zone.initial, zone.rule)
+        except (OSError, ValueError, struct.error, IndexError, ZoneInfoNotFoundError):
+            continue
+    now = time.localtime()
+    return Zone("localtime", [], [], [], (now.tm_gmtoff, now.tm_zone))